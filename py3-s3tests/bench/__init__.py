@@ -0,0 +1,176 @@
+import os
+import json
+import datetime
+
+from py.xml import html
+
+from s3tests.tests import TestBaseClass, logger
+from s3tests.functional.s3_loadgen import ProcessLoadGenerator, run_closed_loop
+from s3tests.functional.s3_loadgen import gen_payload, parse_size, format_size, KB, MB, GB  # noqa
+
+REPORT_TITLE = "S3 Benchmark Report"
+
+# the SSE-C arguments of the benchmarks, boto3 sends the key base64 encoded, with its MD5.
+SSE_C_ARGS = {
+    'SSECustomerAlgorithm': 'AES256',
+    'SSECustomerKey': bytes(range(32)),
+}
+
+# the styles of report/report.html (pytest-html).
+REPORT_CSS = """
+body { font-family: Helvetica, Arial, sans-serif; font-size: 12px; min-width: 800px; color: #999; }
+h1 { font-size: 24px; color: black; }
+h2 { font-size: 16px; color: black; }
+p { color: black; }
+table { border-collapse: collapse; }
+#environment td { padding: 5px; border: 1px solid #E6E6E6; }
+#environment tr:nth-child(odd) { background-color: #f6f6f6; }
+.results-table { border: 1px solid #e6e6e6; color: #999; font-size: 12px; width: 100%; margin-bottom: 20px; }
+.results-table th, .results-table td { padding: 5px; border: 1px solid #E6E6E6; text-align: left; }
+.results-table th { font-weight: bold; }
+.results-table td.errors { color: red; }
+"""
+
+
+def parse_list(value, func=int):
+    """
+    '1,8,32' -> [1, 8, 32]
+    """
+    return [func(v) for v in str(value).split(',') if v.strip()]
+
+
+class BenchReport(object):
+    """
+    Results of the benchmark cells, written as JSON and as an HTML page styled like report/report.html.
+
+    A row is the summary of one operation in one cell (see LatencyRecorder.summary) plus the
+    parameters of the cell, rows are grouped by workload.
+    """
+
+    def __init__(self, environment=None):
+        self.environment = dict(environment or {})
+        self.rows = []
+        self.start_time = datetime.datetime.utcnow()
+
+    def add(self, workload, params, recorder):
+        """
+        Adds the summary of every operation of recorder, params are the cell parameters, e.g.: size, concurrency.
+        """
+        for op, summary in recorder.summary().items():
+            row = {'workload': workload, 'op': op}
+            row.update(params)
+            row.update(summary)
+            self.rows.append(row)
+            logger.info(f"bench {workload} {params} {op}: {summary}")
+
+    def add_row(self, workload, params, **values):
+        """
+        Adds a row of custom values (not from a LatencyRecorder).
+        """
+        row = {'workload': workload}
+        row.update(params)
+        row.update(values)
+        self.rows.append(row)
+        logger.info(f"bench {workload} {params}: {values}")
+
+    def workloads(self):
+        names = []
+        for row in self.rows:
+            if row['workload'] not in names:
+                names.append(row['workload'])
+        return names
+
+    def to_dict(self):
+        return {
+            'title': REPORT_TITLE,
+            'start_time': self.start_time.isoformat(),
+            'end_time': datetime.datetime.utcnow().isoformat(),
+            'environment': self.environment,
+            'results': self.rows,
+        }
+
+    def write_json(self, path):
+        with open(path, 'w') as fp:
+            json.dump(self.to_dict(), fp, indent=2, default=str)
+
+    def write_html(self, path):
+        data = self.to_dict()
+        body = [
+            html.h1(REPORT_TITLE),
+            html.p(f"Report generated on {data['end_time']}, started on {data['start_time']}."),
+            html.h2("Environment"),
+            html.table([html.tr(html.td(k), html.td(str(v))) for k, v in self.environment.items()],
+                       id="environment"),
+            html.h2("Results"),
+        ]
+
+        for workload in self.workloads():
+            rows = [row for row in self.rows if row['workload'] == workload]
+            columns = []
+            for row in rows:
+                columns.extend(k for k in row if k != 'workload' and k not in columns)
+
+            body.append(html.h2(workload))
+            body.append(html.table(
+                html.thead(html.tr([html.th(c) for c in columns])),
+                html.tbody([
+                    html.tr([html.td(str(row.get(c, '')), class_=c if c == 'errors' and row.get(c) else None)
+                             for c in columns])
+                    for row in rows
+                ]),
+                class_="results-table"))
+
+        doc = html.html(
+            html.head(html.meta(charset="utf-8"), html.title(REPORT_TITLE), html.style(REPORT_CSS)),
+            html.body(body))
+        with open(path, 'w') as fp:
+            fp.write("<!DOCTYPE html>" + doc.unicode(indent=2))
+
+    def write(self, path_prefix):
+        """
+        Writes <path_prefix>.json and <path_prefix>.html.
+        """
+        dirname = os.path.dirname(path_prefix)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self.write_json(path_prefix + '.json')
+        self.write_html(path_prefix + '.html')
+
+
+class BenchBaseClass(TestBaseClass):
+    """
+    Base class of the benchmarks, the bucket helpers of TestBaseClass and the closed-loop runner of s3_loadgen.
+    """
+
+    # --bench-processes, set by the bench_processes fixture.
+    processes = 1
+
+    @staticmethod
+    def gen_payload(size, seed=0, block_size=MB):
+        """
+        Returns size bytes of a (seeded) random block repeated, cheap to build even for large sizes.
+        """
+        return gen_payload(size, seed=seed, block_size=block_size)
+
+    @staticmethod
+    def ops_per_thread(bench_config, size, concurrency):
+        """
+        --bench-ops, reduced so that a cell moves at most --bench-max-bytes, None if even one op
+        per thread is over it (the cell is skipped), every process (--bench-processes) runs concurrency threads.
+        """
+        threads = concurrency * bench_config.get('processes', 1)
+        if size * threads > bench_config.max_bytes:
+            return None
+        return max(1, min(bench_config.ops, bench_config.max_bytes // max(size * threads, 1)))
+
+    def run_cell(self, operation, client_factory, config, concurrency, ops=None, duration=None, name='op'):
+        """
+        Runs one closed-loop phase of a cell, see s3_loadgen.run_closed_loop, returns its LatencyRecorder.
+
+        With --bench-processes over 1, each of the processes runs concurrency threads (s3_loadgen.ProcessLoadGenerator),
+        worker_id is then unique among all of their threads.
+        """
+        if self.processes > 1:
+            gen = ProcessLoadGenerator(config, client_factory, processes=self.processes, concurrency=concurrency)
+            return gen.run(operation, ops=ops, duration=duration, name=name)
+        return run_closed_loop(operation, client_factory, config, concurrency, ops=ops, duration=duration, name=name)
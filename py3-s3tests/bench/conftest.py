@@ -0,0 +1,148 @@
+import platform
+
+from munch import Munch
+
+import pytest
+
+from s3tests.tests import (
+    nuke_prefixed_buckets, logger, get_client, get_alt_client
+)
+from s3tests.bench import BenchBaseClass, BenchReport, parse_size, parse_list, format_size
+
+
+@pytest.fixture(scope="session", autouse=True)
+def setup_and_teardown_bench_level(s3cfg_global_unique: Munch) -> None:
+    """
+    This function will be ran only once.
+    """
+    logger.info(" Setup bench --- started ")
+    client = get_client(s3cfg_global_unique)
+    alt_client = get_alt_client(s3cfg_global_unique)
+
+    prefix = s3cfg_global_unique.bucket_prefix
+    nuke_prefixed_buckets(client=client, prefix=prefix, msg="main client")  # perhaps no need.
+    nuke_prefixed_buckets(client=alt_client, prefix=prefix, msg="alt client")  # perhaps no need.
+    logger.info(" Setup bench --- ended ")
+
+    yield
+
+    logger.info(" Teardown bench --- started ")
+    nuke_prefixed_buckets(client=client, prefix=prefix, msg="main client")
+    nuke_prefixed_buckets(client=alt_client, prefix=prefix, msg="alt client")
+    logger.info(" Teardown bench --- ended ")
+
+
+@pytest.fixture(scope="session")
+def bench_config(pytestconfig) -> Munch:
+    """
+    The sweep options (--bench-*).
+    """
+    return Munch(
+        sizes=parse_list(pytestconfig.getoption('--bench-sizes'), parse_size),
+        concurrency=parse_list(pytestconfig.getoption('--bench-concurrency')),
+        ops=pytestconfig.getoption('--bench-ops'),
+        max_bytes=parse_size(pytestconfig.getoption('--bench-max-bytes')),
+        processes=pytestconfig.getoption('--bench-processes'),
+        part_sizes=parse_list(pytestconfig.getoption('--bench-part-sizes'), parse_size),
+        mpu_size=parse_size(pytestconfig.getoption('--bench-mpu-size')),
+        mpu_uploads=pytestconfig.getoption('--bench-mpu-uploads'),
+        copy_part_size=parse_size(pytestconfig.getoption('--bench-copy-part-size')),
+        list_max_keys=parse_list(pytestconfig.getoption('--bench-list-max-keys')),
+        seed_connections=pytestconfig.getoption('--bench-seed-connections'),
+        delete_keys=pytestconfig.getoption('--bench-delete-keys'),
+        meta_objects=pytestconfig.getoption('--bench-meta-objects'),
+        version_chain=sorted(parse_list(pytestconfig.getoption('--bench-version-chain'))),
+        scaling_max=pytestconfig.getoption('--bench-scaling-max'),
+        scaling_size=parse_size(pytestconfig.getoption('--bench-scaling-size')),
+        scaling_range_size=parse_size(pytestconfig.getoption('--bench-scaling-range-size')),
+        workload_duration=pytestconfig.getoption('--bench-workload-duration'),
+        arrival=pytestconfig.getoption('--bench-arrival'),
+        open_duration=pytestconfig.getoption('--bench-open-duration'),
+        open_workers=pytestconfig.getoption('--bench-open-workers'),
+        open_size=parse_size(pytestconfig.getoption('--bench-open-size')),
+        range_object_size=parse_size(pytestconfig.getoption('--bench-range-object-size')),
+        range_reads=pytestconfig.getoption('--bench-range-reads'),
+        presigned_urls=pytestconfig.getoption('--bench-presigned-urls'),
+        presigned_size=parse_size(pytestconfig.getoption('--bench-presigned-size')),
+        encryption_modes=parse_list(pytestconfig.getoption('--bench-encryption-modes'), str.strip),
+        encryption_range_size=parse_size(pytestconfig.getoption('--bench-encryption-range-size')),
+        kms_keyid=pytestconfig.getoption('--bench-kms-keyid'),
+        policy_statements=parse_list(pytestconfig.getoption('--bench-policy-statements')),
+        policy_sizes=parse_list(pytestconfig.getoption('--bench-policy-sizes'), parse_size),
+        report=pytestconfig.getoption('--bench-report'),
+    )
+
+
+@pytest.fixture(scope="session")
+def bench_report(bench_config, s3cfg_global_unique):
+    """
+    Collects the results of every cell, written to --bench-report(.json/.html) at the end of the session.
+    """
+    report = BenchReport(environment={
+        'Endpoint': s3cfg_global_unique.default_endpoint,
+        'Sizes': ','.join(format_size(s) for s in bench_config.sizes),
+        'Concurrency': ','.join(str(c) for c in bench_config.concurrency),
+        'Ops per thread': bench_config.ops,
+        'Max bytes per cell': format_size(bench_config.max_bytes),
+        'Processes': bench_config.processes,
+        'Platform': platform.platform(),
+        'Python': platform.python_version(),
+    })
+
+    yield report
+
+    if report.rows:
+        report.write(bench_config.report)
+        logger.info(f"bench report: {bench_config.report}.json, {bench_config.report}.html")
+
+
+@pytest.fixture(autouse=True)
+def bench_processes(request, bench_config):
+    """
+    --bench-processes of the benchmarks, see BenchBaseClass.run_cell.
+    """
+    if isinstance(request.instance, BenchBaseClass):
+        request.instance.processes = bench_config.processes
+    return bench_config.processes
+
+
+def pytest_generate_tests(metafunc):
+    """
+    Benchmarks taking bench_size, bench_concurrency, bench_part_size, bench_list_keys, bench_list_dist,
+    bench_delete_batch, bench_version_keys, bench_scaling_profile, bench_workload, bench_rate and/or
+    bench_range_size run once per value of the sweep.
+    """
+    config = metafunc.config
+    if 'bench_size' in metafunc.fixturenames:
+        sizes = parse_list(config.getoption('--bench-sizes'), parse_size)
+        metafunc.parametrize('bench_size', sizes, ids=[format_size(s) for s in sizes])
+    if 'bench_concurrency' in metafunc.fixturenames:
+        concurrency = parse_list(config.getoption('--bench-concurrency'))
+        metafunc.parametrize('bench_concurrency', concurrency, ids=[f"c{c}" for c in concurrency])
+    if 'bench_part_size' in metafunc.fixturenames:
+        part_sizes = parse_list(config.getoption('--bench-part-sizes'), parse_size)
+        metafunc.parametrize('bench_part_size', part_sizes, ids=[f"part{format_size(s)}" for s in part_sizes])
+    if 'bench_list_keys' in metafunc.fixturenames:
+        list_keys = parse_list(config.getoption('--bench-list-keys'))
+        metafunc.parametrize('bench_list_keys', list_keys, ids=[f"keys{n}" for n in list_keys])
+    if 'bench_list_dist' in metafunc.fixturenames:
+        dists = parse_list(config.getoption('--bench-list-dists'), str.strip)
+        metafunc.parametrize('bench_list_dist', dists)
+    if 'bench_delete_batch' in metafunc.fixturenames:
+        batches = parse_list(config.getoption('--bench-delete-batches'))
+        metafunc.parametrize('bench_delete_batch', batches, ids=[f"batch{n}" for n in batches])
+    if 'bench_version_keys' in metafunc.fixturenames:
+        version_keys = parse_list(config.getoption('--bench-version-keys'))
+        metafunc.parametrize('bench_version_keys', version_keys, ids=[f"keys{n}" for n in version_keys])
+    if 'bench_scaling_profile' in metafunc.fixturenames:
+        profiles = parse_list(config.getoption('--bench-scaling-profiles'), str.strip)
+        metafunc.parametrize('bench_scaling_profile', profiles)
+    if 'bench_workload' in metafunc.fixturenames:
+        workloads = parse_list(config.getoption('--bench-workloads'), str.strip)
+        metafunc.parametrize('bench_workload', workloads)
+    if 'bench_rate' in metafunc.fixturenames:
+        rates = parse_list(config.getoption('--bench-rates'), float)
+        metafunc.parametrize('bench_rate', rates, ids=[f"rate{r:g}" for r in rates])
+    if 'bench_range_size' in metafunc.fixturenames:
+        range_sizes = parse_list(config.getoption('--bench-range-sizes'), parse_size)
+        metafunc.parametrize('bench_range_size', range_sizes, ids=[f"range{format_size(s)}" for s in range_sizes])
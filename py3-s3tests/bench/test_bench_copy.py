@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from s3tests.tests import get_client
+from s3tests.bench import BenchBaseClass, MB, format_size
+from s3tests.functional.s3_loadgen import LatencyRecorder
+from s3tests.functional.s3_multipart import ParallelMultipartCopier
+
+COPY_OBJECT_MAX_SIZE = 5 * 1024 * MB  # the limit of a single CopyObject
+
+
+@pytest.mark.bench
+class TestCopyBench(BenchBaseClass):
+
+    def test_copy(self, s3cfg_global_unique, bench_config, bench_report, bench_size, bench_concurrency):
+        """
+        基准-对比copy_object、并发upload_part_copy、客户端GET+PUT三种拷贝方式的时延与吞吐（对象大小 x 并发数）
+        """
+        ops = self.ops_per_thread(bench_config, bench_size, bench_concurrency)
+        if ops is None:
+            pytest.skip(f"{format_size(bench_size)} x {bench_concurrency} is over --bench-max-bytes")
+
+        client = get_client(s3cfg_global_unique)
+        src_bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        dest_bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        src_key = 'bench-src'
+        client.put_object(Bucket=src_bucket_name, Key=src_key, Body=self.gen_payload(bench_size))
+        copy_source = {'Bucket': src_bucket_name, 'Key': src_key}
+
+        def _copy_object(c, worker_id, seq):
+            c.copy_object(Bucket=dest_bucket_name, Key=f'bench-copy-object-{worker_id}-{seq}',
+                          CopySource=copy_source)
+            return bench_size
+
+        def _get_put(c, worker_id, seq):
+            response = c.get_object(Bucket=src_bucket_name, Key=src_key)
+            c.put_object(Bucket=dest_bucket_name, Key=f'bench-get-put-{worker_id}-{seq}',
+                         Body=response['Body'].read())
+            return bench_size
+
+        params = {
+            'size': format_size(bench_size),
+            'size_bytes': bench_size,
+            'concurrency': bench_concurrency,
+            'part_size': format_size(bench_config.copy_part_size),
+        }
+
+        # copy_object and GET+PUT: concurrency copies at a time.
+        if bench_size <= COPY_OBJECT_MAX_SIZE:
+            recorder = self.run_cell(_copy_object, get_client, s3cfg_global_unique, bench_concurrency, ops=ops,
+                                     name='copy_object')
+            bench_report.add('copy', params, recorder)
+        recorder = self.run_cell(_get_put, get_client, s3cfg_global_unique, bench_concurrency, ops=ops,
+                                 name='get_put')
+        bench_report.add('copy', params, recorder)
+
+        # upload_part_copy: one copy at a time, concurrency ranges of it at a time, as many copies in total.
+        recorder = LatencyRecorder()
+        copier = ParallelMultipartCopier(get_client, s3cfg_global_unique, part_size=bench_config.copy_part_size,
+                                         concurrency=bench_concurrency)
+        recorder.begin()
+        for i in range(ops * bench_concurrency):
+            t0 = time.perf_counter()
+            copier.copy(src_bucket_name, src_key, dest_bucket_name, f'bench-part-copy-{i}', size=bench_size,
+                        complete=True)
+            recorder.record('upload_part_copy', time.perf_counter() - t0, bench_size)
+        recorder.finish()
+        bench_report.add('copy', params, recorder)
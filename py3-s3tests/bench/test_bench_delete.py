@@ -0,0 +1,98 @@
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from botocore.exceptions import ClientError
+
+from s3tests.tests import get_client
+from s3tests.bench import BenchBaseClass
+from s3tests.functional import s3_async, s3_enumerate
+from s3tests.functional.s3_delete import iter_batches, to_delete_objects
+from s3tests.functional.s3_loadgen import LatencyRecorder
+
+
+@pytest.mark.bench
+class TestDeleteBench(BenchBaseClass):
+
+    def seed_objects(self, config, client, bucket_name, num, connections, versioned):
+        """
+        Uploads num empty objects with the asyncio client, returns the Objects of delete_objects deleting them
+        (with their VersionId in a versioned bucket, so they are deleted for good instead of hidden by delete markers).
+        """
+        keys = [f"bench-del-{i:08d}" for i in range(num)]
+        self.eq(s3_async.run_with_client(config, s3_async.put_objects, bucket_name, keys,
+                                         max_connections=connections), num)
+        if not versioned:
+            return to_delete_objects(keys)
+        return to_delete_objects(s3_enumerate.iter_versions(client, bucket_name, delete_markers=False))
+
+    @staticmethod
+    def delete_batches(config, bucket_name, batches, quiet, concurrency):
+        """
+        Sends a delete_objects request per batch, concurrency at a time (a client each, built beforehand).
+
+        @return (recorder, key_errors), key_errors counts the Errors of the responses.
+        """
+        clients = queue.LifoQueue()
+        for _ in range(concurrency):
+            clients.put(get_client(config))
+        recorder = LatencyRecorder()
+        lock = threading.Lock()
+        key_errors = 0
+
+        def _delete(batch):
+            nonlocal key_errors
+            client = clients.get()
+            t0 = time.perf_counter()
+            try:
+                response = client.delete_objects(Bucket=bucket_name, Delete={'Objects': batch, 'Quiet': quiet})
+                errors = response.get('Errors', [])
+                ok = quiet or len(response.get('Deleted', [])) + len(errors) == len(batch)
+            except ClientError:
+                errors, ok = [], False
+            finally:
+                clients.put(client)
+            with lock:
+                recorder.record('delete_objects', time.perf_counter() - t0, 0, ok)
+                key_errors += len(errors)
+
+        recorder.begin()
+        with ThreadPoolExecutor(max_workers=concurrency) as _exec:
+            list(_exec.map(_delete, batches))
+        recorder.finish()
+        return recorder, key_errors
+
+    def test_bulk_delete(self, s3cfg_global_unique, bench_config, bench_report, bench_delete_batch,
+                         bench_concurrency):
+        """
+        基准-批量删除：按每批key数(1-1000)、并发数、Quiet模式、多版本/非多版本桶统计delete_objects的吞吐与时延
+        """
+        client = get_client(s3cfg_global_unique)
+        num = bench_config.delete_keys
+
+        for versioned in (False, True):
+            bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+            if versioned:
+                self.check_configure_versioning_retry(client, bucket_name, "Enabled", "Enabled")
+
+            for quiet in (True, False):
+                objects = self.seed_objects(s3cfg_global_unique, client, bucket_name, num,
+                                            bench_config.seed_connections, versioned)
+                batches = list(iter_batches(objects, bench_delete_batch))
+                recorder, key_errors = self.delete_batches(s3cfg_global_unique, bucket_name, batches, quiet,
+                                                           bench_concurrency)
+                seconds = recorder.seconds
+
+                summary = recorder.summary()['delete_objects']
+                params = {'keys': num, 'batch': bench_delete_batch, 'concurrency': bench_concurrency,
+                          'quiet': quiet, 'versioned': versioned}
+                bench_report.add_row(
+                    'bulk_delete', params, requests=len(batches), request_errors=summary['errors'],
+                    key_errors=key_errors, seconds=round(seconds, 3), keys_per_sec=round(num / seconds, 2),
+                    **{k: summary[k] for k in ('ops_per_sec', 'mean_ms', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms')})
+
+                self.eq((summary['errors'], key_errors), (0, 0))
+                remaining = sum(1 for _ in s3_enumerate.iter_versions(client, bucket_name))
+                self.eq(remaining, 0)
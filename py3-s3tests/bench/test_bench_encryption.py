@@ -0,0 +1,101 @@
+import pytest
+
+from s3tests.tests import get_client
+from s3tests.bench import BenchBaseClass, SSE_C_ARGS, MB, format_size
+
+ENCRYPTION_MODES = ('plaintext', 'sse-s3', 'sse-kms', 'sse-c')
+MIN_PART_SIZE = 5 * MB
+
+
+@pytest.mark.bench
+class TestEncryptionBench(BenchBaseClass):
+
+    @staticmethod
+    def encryption_args(mode, kms_keyid):
+        """
+        Returns (the arguments of the writes, the arguments of the reads) of an encryption mode.
+        """
+        if mode == 'sse-s3':
+            return {'ServerSideEncryption': 'AES256'}, {}
+        if mode == 'sse-kms':
+            return {'ServerSideEncryption': 'aws:kms', 'SSEKMSKeyId': kms_keyid}, {}
+        if mode == 'sse-c':
+            return dict(SSE_C_ARGS), dict(SSE_C_ARGS)
+        if mode == 'plaintext':
+            return {}, {}
+        raise ValueError(f"Unknown encryption mode: {mode}, one of {ENCRYPTION_MODES}.")
+
+    def test_encryption_overhead(self, s3cfg_global_unique, bench_config, bench_report, bench_size,
+                                 bench_concurrency):
+        """
+        基准-加密开销：明文、SSE-S3、SSE-KMS、SSE-C四种模式下PUT、GET、范围GET、分段上传的吞吐与时延
+        （对象大小 x 并发数），并给出相对明文的吞吐与时延差值
+        """
+        ops = self.ops_per_thread(bench_config, bench_size, bench_concurrency)
+        if ops is None:
+            pytest.skip(f"{format_size(bench_size)} x {bench_concurrency} is over --bench-max-bytes")
+
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        payload = self.gen_payload(bench_size)
+        range_size = min(bench_config.encryption_range_size, bench_size)
+        part_size = max(bench_config.part_sizes[0], MIN_PART_SIZE)
+        kms_keyid = bench_config.kms_keyid or s3cfg_global_unique.main_kms_keyid or 'testkey-1'
+        modes = ['plaintext'] + [m for m in bench_config.encryption_modes if m != 'plaintext']
+
+        params = {'size': format_size(bench_size), 'size_bytes': bench_size, 'concurrency': bench_concurrency}
+        summaries = {}
+        for mode in modes:
+            write_args, read_args = self.encryption_args(mode, kms_keyid)
+
+            def _key(worker_id, seq, kind='put'):
+                return f"bench-enc-{mode}-{kind}-{worker_id}-{seq}"
+
+            def _put(c, worker_id, seq):
+                c.put_object(Bucket=bucket_name, Key=_key(worker_id, seq), Body=payload, **write_args)
+                return bench_size
+
+            def _get(c, worker_id, seq):
+                response = c.get_object(Bucket=bucket_name, Key=_key(worker_id, seq), **read_args)
+                return sum(len(data) for data in response['Body'].iter_chunks(MB))
+
+            def _get_range(c, worker_id, seq):
+                # the ranges of a thread walk its objects, so the starts move across the object.
+                start = seq * range_size % bench_size
+                end = min(start + range_size, bench_size) - 1
+                response = c.get_object(Bucket=bucket_name, Key=_key(worker_id, seq), Range=f'bytes={start}-{end}',
+                                        **read_args)
+                return len(response['Body'].read())
+
+            def _multipart(c, worker_id, seq):
+                key = _key(worker_id, seq, 'mpu')
+                upload_id = c.create_multipart_upload(Bucket=bucket_name, Key=key, **write_args)['UploadId']
+                parts = []
+                for part_num, offset in enumerate(range(0, bench_size, part_size), 1):
+                    response = c.upload_part(Bucket=bucket_name, Key=key, UploadId=upload_id, PartNumber=part_num,
+                                             Body=payload[offset:offset + part_size], **read_args)
+                    parts.append({'ETag': response['ETag'], 'PartNumber': part_num})
+                c.complete_multipart_upload(Bucket=bucket_name, Key=key, UploadId=upload_id,
+                                            MultipartUpload={'Parts': parts})
+                return bench_size
+
+            # the puts go first, so the gets read objects which exist.
+            for name, operation in (('PUT', _put), ('GET', _get), ('GET_RANGE', _get_range),
+                                    ('MULTIPART', _multipart)):
+                recorder = self.run_cell(operation, get_client, s3cfg_global_unique, bench_concurrency, ops=ops,
+                                         name=name)
+                bench_report.add('encryption', dict(params, encryption=mode), recorder)
+                summaries[mode, name] = recorder.summary()[name]
+                self.eq(recorder.errors[name], 0)
+
+        for (mode, name), summary in summaries.items():
+            if mode == 'plaintext':
+                continue
+            base = summaries['plaintext', name]
+            bench_report.add_row(
+                'encryption_overhead', dict(params, encryption=mode), op=name,
+                ops_per_sec=summary['ops_per_sec'], plaintext_ops_per_sec=base['ops_per_sec'],
+                throughput_delta_pct=round((summary['ops_per_sec'] / base['ops_per_sec'] - 1) * 100, 2)
+                if base['ops_per_sec'] else None,
+                p50_delta_ms=round(summary['p50_ms'] - base['p50_ms'], 3),
+                p99_delta_ms=round(summary['p99_ms'] - base['p99_ms'], 3))
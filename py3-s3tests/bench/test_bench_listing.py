@@ -0,0 +1,180 @@
+import time
+import hashlib
+
+import pytest
+
+from s3tests.tests import get_client
+from s3tests.bench import BenchBaseClass
+from s3tests.functional import s3_async, s3_enumerate
+from s3tests.functional.s3_loadgen import LatencyRecorder, percentile
+
+# key name distributions: name -> (key of index i, a prefix to walk).
+KEY_DISTS = {
+    'sequential': (lambda i: f"obj-{i:010d}", "obj-000000"),
+    'random': (lambda i: f"{hashlib.md5(str(i).encode()).hexdigest()[:16]}-{i}", "a"),
+    'prefixed': (lambda i: f"dir-{i % 100:03d}/obj-{i:010d}", "dir-001/"),
+    'deep': (lambda i: f"a{i % 10}/b{i // 10 % 10}/c{i // 100 % 10}/obj-{i:010d}", "a1/"),
+}
+
+
+def expected_listing(keys, prefix='', delimiter=''):
+    """
+    The keys and common prefixes a listing of keys should return.
+    """
+    entries = set()
+    for key in keys:
+        if not key.startswith(prefix):
+            continue
+        pos = key.find(delimiter, len(prefix)) if delimiter else -1
+        entries.add(key if pos < 0 else key[:pos + len(delimiter)])
+    return entries
+
+
+def page_latency_series(page_latencies, buckets=10):
+    """
+    Splits the latencies (seconds) of a walk, in page order, into at most buckets runs of consecutive pages,
+    so a slowdown of the deep pages shows up, returns a dict per run: first_page, last_page and its latencies.
+    """
+    step = max(1, -(-len(page_latencies) // buckets))
+    series = []
+    for start in range(0, len(page_latencies), step):
+        values = sorted(page_latencies[start:start + step])
+        series.append({
+            'first_page': start + 1,
+            'last_page': start + len(values),
+            'mean_ms': round(sum(values) / len(values) * 1000, 3),
+            'p50_ms': round(percentile(values, 50) * 1000, 3),
+            'p99_ms': round(percentile(values, 99) * 1000, 3),
+            'max_ms': round(values[-1] * 1000, 3),
+        })
+    return series
+
+
+@pytest.mark.bench
+class TestListingBench(BenchBaseClass):
+
+    @staticmethod
+    def walk_listing(client, bucket_name, api, max_keys, prefix='', delimiter='', recorder=None,
+                     page_latencies=None):
+        """
+        Lists the bucket page by page with list_objects (api='v1') or list_objects_v2 (api='v2'),
+        the latency of every page goes to recorder, and is appended to page_latencies (in page order).
+
+        @return (entries, pages, out_of_order), entries are the keys and common prefixes in listing order,
+                out_of_order counts the pages which do not start after the last entry of the page before.
+        """
+        kwargs = {'Bucket': bucket_name, 'MaxKeys': max_keys, 'Prefix': prefix, 'Delimiter': delimiter}
+        entries = []
+        pages = 0
+        out_of_order = 0
+        while True:
+            t0 = time.perf_counter()
+            if api == 'v2':
+                response = client.list_objects_v2(**kwargs)
+            else:
+                response = client.list_objects(**kwargs)
+            latency = time.perf_counter() - t0
+            if recorder is not None:
+                recorder.record('list_page', latency)
+            if page_latencies is not None:
+                page_latencies.append(latency)
+            pages += 1
+
+            # keys and common prefixes of a page are interleaved in lexicographic order.
+            page = sorted([obj['Key'] for obj in response.get('Contents', [])] +
+                          [p['Prefix'] for p in response.get('CommonPrefixes', [])])
+            if page and entries and page[0] <= entries[-1]:
+                out_of_order += 1
+            entries.extend(page)
+
+            if not response['IsTruncated']:
+                return entries, pages, out_of_order
+            if api == 'v2':
+                kwargs['ContinuationToken'] = response['NextContinuationToken']
+            else:
+                # NextMarker is only returned with a delimiter.
+                kwargs['Marker'] = response.get('NextMarker') or page[-1]
+
+    def seed_bucket(self, config, bucket_name, keys, connections):
+        """
+        Uploads an empty object per key with the asyncio client, returns the seconds it took.
+        """
+        t0 = time.perf_counter()
+        count = s3_async.run_with_client(config, s3_async.put_objects, bucket_name, keys, max_connections=connections)
+        self.eq(count, len(keys))
+        return time.perf_counter() - t0
+
+    def test_listing(self, s3cfg_global_unique, bench_config, bench_report, bench_list_keys, bench_list_dist):
+        """
+        基准-大桶列举：并发灌入大量对象后，按不同MaxKeys、Prefix、Delimiter翻页列举，
+        统计每页时延（整体及按页序号分段的时延曲线）和总耗时，并检查翻页结果是否有重复、遗漏或乱序
+        """
+        key_name, walk_prefix = KEY_DISTS[bench_list_dist]
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+
+        keys = [key_name(i) for i in range(bench_list_keys)]
+        seconds = self.seed_bucket(s3cfg_global_unique, bucket_name, keys, bench_config.seed_connections)
+        bench_report.add_row('listing_seed', {'keys': bench_list_keys, 'dist': bench_list_dist},
+                             seconds=round(seconds, 3), objs_per_sec=round(bench_list_keys / seconds, 2))
+
+        problems = []
+        for prefix, delimiter in (('', ''), (walk_prefix, ''), ('', '/')):
+            expected = expected_listing(keys, prefix, delimiter)
+            for api in ('v1', 'v2'):
+                for max_keys in bench_config.list_max_keys:
+                    recorder = LatencyRecorder()
+                    page_latencies = []
+                    recorder.begin()
+                    entries, pages, out_of_order = self.walk_listing(
+                        client, bucket_name, api, max_keys, prefix=prefix, delimiter=delimiter, recorder=recorder,
+                        page_latencies=page_latencies)
+                    recorder.finish()
+
+                    listed = set(entries)
+                    result = {
+                        'pages': pages,
+                        'entries': len(entries),
+                        'walk_seconds': round(recorder.seconds, 3),
+                        'duplicates': len(entries) - len(listed),
+                        'gaps': len(expected - listed),
+                        'unexpected': len(listed - expected),
+                        'out_of_order': out_of_order,
+                    }
+                    summary = recorder.summary()['list_page']
+                    result.update({k: summary[k] for k in ('mean_ms', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms')})
+
+                    params = {'keys': bench_list_keys, 'dist': bench_list_dist, 'api': api, 'max_keys': max_keys,
+                              'prefix': prefix, 'delimiter': delimiter}
+                    bench_report.add_row('listing', params, **result)
+                    # latency against the page index: do the deep pages of the walk get slower?
+                    for point in page_latency_series(page_latencies):
+                        bench_report.add_row('listing_pages', params, **point)
+                    if result['duplicates'] or result['gaps'] or result['unexpected'] or result['out_of_order']:
+                        problems.append((params, result))
+
+        # the whole bucket by s3_enumerate, one cursor, then the key space split among concurrent listers.
+        expected = set(keys)
+        for listers in [0] + bench_config.concurrency:
+            t0 = time.perf_counter()
+            if listers:
+                listed = [obj['Key'] for obj in s3_enumerate.iter_objects_parallel(
+                    get_client, s3cfg_global_unique, bucket_name, concurrency=listers)]
+            else:
+                listed = [obj['Key'] for obj in s3_enumerate.iter_objects(client, bucket_name)]
+            seconds = time.perf_counter() - t0
+
+            result = {
+                'entries': len(listed),
+                'walk_seconds': round(seconds, 3),
+                'objs_per_sec': round(len(listed) / seconds, 2),
+                'duplicates': len(listed) - len(set(listed)),
+                'gaps': len(expected - set(listed)),
+                'unexpected': len(set(listed) - expected),
+            }
+            params = {'keys': bench_list_keys, 'dist': bench_list_dist, 'listers': listers or 'serial'}
+            bench_report.add_row('listing_enumerate', params, **result)
+            if result['duplicates'] or result['gaps'] or result['unexpected']:
+                problems.append((params, result))
+
+        self.eq(problems, [])
@@ -0,0 +1,58 @@
+import pytest
+
+from s3tests.tests import get_client
+from s3tests.bench import BenchBaseClass
+from s3tests.functional import s3_async
+from s3tests.functional.policy import make_json_policy
+
+
+@pytest.mark.bench
+class TestMetadataBench(BenchBaseClass):
+
+    def test_metadata_ops(self, s3cfg_global_unique, bench_config, bench_report, bench_concurrency):
+        """
+        基准-元数据操作：对预置对象并发执行HEAD、对象标签读写、对象ACL读写、桶ACL和桶策略读取，统计每种操作的吞吐与尾部时延
+        """
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        keys = [f"bench-meta-{i:08d}" for i in range(bench_config.meta_objects)]
+        self.eq(s3_async.run_with_client(s3cfg_global_unique, s3_async.put_objects, bucket_name, keys, body=b'bar',
+                                         max_connections=bench_config.seed_connections), len(keys))
+        client.put_bucket_policy(Bucket=bucket_name, Policy=make_json_policy(
+            "s3:GetObject", self.make_arn_resource(f"{bucket_name}/*")))
+        tag_set = {'TagSet': [{'Key': 'bench', 'Value': 'metadata'}, {'Key': 'tier', 'Value': 'hot'}]}
+
+        def _key(worker_id, seq):
+            # every thread walks its own slice of the seeded keys, wrapping around.
+            return keys[(worker_id * bench_config.ops + seq) % len(keys)]
+
+        def _head_object(c, worker_id, seq):
+            c.head_object(Bucket=bucket_name, Key=_key(worker_id, seq))
+
+        def _put_object_tagging(c, worker_id, seq):
+            c.put_object_tagging(Bucket=bucket_name, Key=_key(worker_id, seq), Tagging=tag_set)
+
+        def _get_object_tagging(c, worker_id, seq):
+            c.get_object_tagging(Bucket=bucket_name, Key=_key(worker_id, seq))
+
+        def _put_object_acl(c, worker_id, seq):
+            c.put_object_acl(Bucket=bucket_name, Key=_key(worker_id, seq), ACL='public-read')
+
+        def _get_object_acl(c, worker_id, seq):
+            c.get_object_acl(Bucket=bucket_name, Key=_key(worker_id, seq))
+
+        def _get_bucket_acl(c, worker_id, seq):
+            c.get_bucket_acl(Bucket=bucket_name)
+
+        def _get_bucket_policy(c, worker_id, seq):
+            c.get_bucket_policy(Bucket=bucket_name)
+
+        params = {'objects': len(keys), 'concurrency': bench_concurrency}
+        # the puts go first, so the gets read tags and ACLs which are set.
+        for operation in (_head_object, _put_object_tagging, _get_object_tagging, _put_object_acl, _get_object_acl,
+                          _get_bucket_acl, _get_bucket_policy):
+            name = operation.__name__.lstrip('_')
+            recorder = self.run_cell(operation, get_client, s3cfg_global_unique, bench_concurrency,
+                                     ops=bench_config.ops, name=name)
+            bench_report.add('metadata_ops', params, recorder)
+            self.eq(recorder.errors[name], 0)
@@ -0,0 +1,49 @@
+import itertools
+
+import pytest
+
+from s3tests.tests import get_client
+from s3tests.bench import BenchBaseClass, format_size
+from s3tests.functional.s3_loadgen import LatencyRecorder
+from s3tests.functional.s3_multipart import ParallelMultipartUploader
+
+
+@pytest.mark.bench
+class TestMultipartBench(BenchBaseClass):
+
+    def test_multipart_upload(self, s3cfg_global_unique, bench_config, bench_report, bench_part_size,
+                              bench_concurrency):
+        """
+        基准-并发分段上传的聚合吞吐，以及CompleteMultipartUpload时延随分段数的变化（分段大小 x 并发数）
+        """
+        size = bench_config.mpu_size
+        if size * bench_config.mpu_uploads > bench_config.max_bytes:
+            pytest.skip(f"{bench_config.mpu_uploads} x {format_size(size)} is over --bench-max-bytes")
+
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+
+        part_count, last_size = divmod(size, bench_part_size)
+        part = self.gen_payload(bench_part_size)
+        last_part = part[:last_size]
+
+        recorder = LatencyRecorder()
+        # every part is the same bytes object, so parts in flight cost no memory, let the pool fill up.
+        uploader = ParallelMultipartUploader(get_client, s3cfg_global_unique, part_size=bench_part_size,
+                                             concurrency=bench_concurrency,
+                                             max_in_flight_bytes=2 * bench_concurrency * bench_part_size,
+                                             recorder=recorder)
+        recorder.begin()
+        for i in range(bench_config.mpu_uploads):
+            source = itertools.chain(itertools.repeat(part, part_count), [last_part] if last_size else [])
+            upload_id, parts = uploader.upload(bucket_name, f"bench-mpu-{i}", source, complete=True)
+            self.eq(len(parts), part_count + (1 if last_size else 0))
+        recorder.finish()
+
+        params = {
+            'size': format_size(size),
+            'part_size': format_size(bench_part_size),
+            'part_count': part_count + (1 if last_size else 0),
+            'concurrency': bench_concurrency,
+        }
+        bench_report.add('multipart_upload', params, recorder)
@@ -0,0 +1,83 @@
+import pytest
+
+from s3tests.tests import get_client
+from s3tests.bench import BenchBaseClass, MB, format_size
+from s3tests.functional.s3_loadgen import ProcessLoadGenerator, SharedPayload
+
+
+@pytest.mark.bench
+class TestObjectOpsBench(BenchBaseClass):
+
+    @staticmethod
+    def key_name(worker_id, seq):
+        return f"bench-{worker_id}-{seq}"
+
+    def test_object_ops(self, s3cfg_global_unique, bench_config, bench_report, bench_size, bench_concurrency):
+        """
+        基准-对象PUT/GET/HEAD/DELETE的吞吐与时延（对象大小 x 并发数）
+        """
+        ops = self.ops_per_thread(bench_config, bench_size, bench_concurrency)
+        if ops is None:
+            pytest.skip(f"{format_size(bench_size)} x {bench_concurrency} is over --bench-max-bytes")
+
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        payload = self.gen_payload(bench_size)
+
+        def _put(c, worker_id, seq):
+            c.put_object(Bucket=bucket_name, Key=self.key_name(worker_id, seq), Body=payload)
+            return bench_size
+
+        def _get(c, worker_id, seq):
+            response = c.get_object(Bucket=bucket_name, Key=self.key_name(worker_id, seq))
+            return sum(len(data) for data in response['Body'].iter_chunks(MB))
+
+        def _head(c, worker_id, seq):
+            c.head_object(Bucket=bucket_name, Key=self.key_name(worker_id, seq))
+
+        def _delete(c, worker_id, seq):
+            c.delete_object(Bucket=bucket_name, Key=self.key_name(worker_id, seq))
+
+        params = {'size': format_size(bench_size), 'size_bytes': bench_size, 'concurrency': bench_concurrency}
+        # the same keys go through every phase, so GET/HEAD/DELETE only touch objects which exist.
+        for name, operation in (('PUT', _put), ('GET', _get), ('HEAD', _head), ('DELETE', _delete)):
+            recorder = self.run_cell(operation, get_client, s3cfg_global_unique, bench_concurrency, ops=ops, name=name)
+            bench_report.add('object_ops', params, recorder)
+            self.eq(recorder.errors[name], 0)
+
+    def test_object_ops_processes(self, s3cfg_global_unique, bench_config, bench_report, bench_concurrency):
+        """
+        基准-多进程PUT/GET：负载载荷放在共享内存中，由多个进程（每个进程bench_concurrency个线程）并发PUT与GET，
+        校验每个进程写入的对象数量与内容
+        """
+        processes = max(2, self.processes)
+        size = 64 * 1024
+        ops = min(bench_config.ops, 20)
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        payload = SharedPayload.create(size, seed=1)
+        expected = bytes(payload.view())
+
+        def _put(c, worker_id, seq):
+            c.put_object(Bucket=bucket_name, Key=self.key_name(worker_id, seq), Body=bytes(payload.view()))
+            return size
+
+        def _get(c, worker_id, seq):
+            data = c.get_object(Bucket=bucket_name, Key=self.key_name(worker_id, seq))['Body'].read()
+            if data != expected:
+                raise RuntimeError(f"{self.key_name(worker_id, seq)} differs.")
+            return len(data)
+
+        gen = ProcessLoadGenerator(s3cfg_global_unique, get_client, processes=processes, concurrency=bench_concurrency)
+        params = {'size': format_size(size), 'size_bytes': size, 'concurrency': bench_concurrency,
+                  'processes': processes}
+        try:
+            for name, operation in (('PUT', _put), ('GET', _get)):
+                recorder = gen.run(operation, ops=ops, name=name)
+                bench_report.add('object_ops_processes', params, recorder)
+                self.eq(recorder.errors[name], 0)
+                self.eq(len(recorder.latencies[name]), processes * bench_concurrency * ops)
+        finally:
+            payload.unlink()
+
+        self.eq(len(self.get_objects_list(client, bucket_name)), processes * bench_concurrency * ops)
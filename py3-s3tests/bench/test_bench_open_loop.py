@@ -0,0 +1,37 @@
+import pytest
+
+from s3tests.tests import get_client
+from s3tests.bench import BenchBaseClass, format_size
+from s3tests.functional.s3_loadgen import run_open_loop
+
+
+@pytest.mark.bench
+class TestOpenLoopBench(BenchBaseClass):
+
+    def test_open_loop(self, s3cfg_global_unique, bench_config, bench_report, bench_rate):
+        """
+        基准-开环恒定到达率：按目标速率（固定间隔或泊松到达）发起GET/PUT，不等待前一请求完成，
+        时延从计划发送时刻算起（修正协调遗漏），统计错过发送时刻的请求数
+        """
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        size = bench_config.open_size
+        payload = self.gen_payload(size)
+        client.put_object(Bucket=bucket_name, Key='bench-open-src', Body=payload)
+
+        def _get(c, worker_id, seq):
+            return len(c.get_object(Bucket=bucket_name, Key='bench-open-src')['Body'].read())
+
+        def _put(c, worker_id, seq):
+            c.put_object(Bucket=bucket_name, Key=f'bench-open-{seq % 1000}', Body=payload)
+            return size
+
+        params = {'rate': bench_rate, 'arrival': bench_config.arrival, 'workers': bench_config.open_workers,
+                  'size': format_size(size)}
+        for name, operation in (('get', _get), ('put', _put)):
+            recorder, schedule = run_open_loop(operation, get_client, s3cfg_global_unique, bench_rate,
+                                               duration=bench_config.open_duration, arrival=bench_config.arrival,
+                                               workers=bench_config.open_workers, name=name)
+            bench_report.add('open_loop', params, recorder)
+            bench_report.add_row('open_loop_schedule', dict(params, op=name), **schedule)
+            self.eq(recorder.errors[name], 0)
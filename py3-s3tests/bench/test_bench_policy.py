@@ -0,0 +1,73 @@
+import pytest
+
+from s3tests.tests import get_client, get_alt_client
+from s3tests.bench import BenchBaseClass
+from s3tests.functional.policy import iter_policy_complexity
+
+
+@pytest.mark.bench
+class TestPolicyBench(BenchBaseClass):
+
+    def run_alt_ops(self, config, bucket_name, prefix, concurrency, ops):
+        """
+        The alt user PUTs, GETs (its own objects) and LISTs under prefix, returns {op: summary}.
+        """
+        def _key(worker_id, seq):
+            return f"{prefix}{worker_id}-{seq}"
+
+        def _put(c, worker_id, seq):
+            c.put_object(Bucket=bucket_name, Key=_key(worker_id, seq), Body=b'bar')
+
+        def _get(c, worker_id, seq):
+            return len(c.get_object(Bucket=bucket_name, Key=_key(worker_id, seq))['Body'].read())
+
+        def _list(c, worker_id, seq):
+            c.list_objects_v2(Bucket=bucket_name, Prefix=prefix, MaxKeys=100)
+
+        summaries = {}
+        # the puts go first, so the gets read objects which exist.
+        for name, operation in (('PUT', _put), ('GET', _get), ('LIST', _list)):
+            recorder = self.run_cell(operation, get_alt_client, config, concurrency, ops=ops, name=name)
+            summaries[name] = recorder.summary()[name]
+            self.eq(recorder.errors[name], 0)
+        return summaries
+
+    def test_policy_evaluation(self, s3cfg_global_unique, bench_config, bench_report, bench_concurrency):
+        """
+        基准-桶策略评估开销：用policy.py生成复杂度递增的桶策略（语句数、通配符资源、aws:SourceIp/s3:prefix/
+        s3:ExistingObjectTag条件块、直至20KB），统计alt用户GET/PUT/LIST的时延，并与无策略（ACL授权）基线对比
+        """
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        alt_user = f"id={s3cfg_global_unique.alt_user_id}"
+        ops = bench_config.ops
+
+        # the baseline: no policy, the alt user is granted by the bucket ACL.
+        client.put_bucket_acl(Bucket=bucket_name, GrantRead=alt_user, GrantWrite=alt_user,
+                              GrantFullControl=f"id={s3cfg_global_unique.main_user_id}")
+        baseline = self.run_alt_ops(s3cfg_global_unique, bucket_name, 'bench-policy-none/', bench_concurrency, ops)
+        params = {'policy': 'none', 'statements': 0, 'wildcards': False, 'conditions': 'none', 'bytes': 0,
+                  'concurrency': bench_concurrency}
+        for name, summary in baseline.items():
+            bench_report.add_row('policy', params, op=name, **summary)
+        client.put_bucket_acl(Bucket=bucket_name, ACL='private')
+
+        levels = iter_policy_complexity(bucket_name, statements=bench_config.policy_statements,
+                                        sizes=bench_config.policy_sizes)
+        for level, (policy_params, policy_json) in enumerate(levels, 1):
+            client.put_bucket_policy(Bucket=bucket_name, Policy=policy_json)
+            summaries = self.run_alt_ops(s3cfg_global_unique, bucket_name, f'bench-policy-{level}/',
+                                         bench_concurrency, ops)
+
+            params = dict(policy_params, policy=f'level-{level}', concurrency=bench_concurrency)
+            for name, summary in summaries.items():
+                base = baseline[name]
+                throughput_delta = round((summary['ops_per_sec'] / base['ops_per_sec'] - 1) * 100, 2) \
+                    if base['ops_per_sec'] else None
+                bench_report.add_row('policy', params, op=name, **summary)
+                bench_report.add_row('policy_overhead', params, op=name,
+                                     p50_delta_ms=round(summary['p50_ms'] - base['p50_ms'], 3),
+                                     p99_delta_ms=round(summary['p99_ms'] - base['p99_ms'], 3),
+                                     throughput_delta_pct=throughput_delta)
+
+        client.delete_bucket_policy(Bucket=bucket_name)
@@ -0,0 +1,82 @@
+import hashlib
+
+import pytest
+
+from s3tests.tests import get_client, get_http_session
+from s3tests.bench import BenchBaseClass, format_size
+from s3tests.functional.s3_sigv4 import AWS4Signer, AWS4SignerForQueryString
+
+
+@pytest.mark.bench
+class TestPresignedBench(BenchBaseClass):
+
+    @staticmethod
+    def sign_headers(signer, http_method, urls, payload_hash):
+        """
+        Header-signed requests of urls, signed up front (valid for 15 minutes) so the signing is not timed,
+        as the presigned urls.
+        """
+        return [signer.sign_request(http_method, url, payload_hash=payload_hash) for url in urls]
+
+    def test_presigned_request_rate(self, s3cfg_global_unique, bench_config, bench_report, bench_concurrency):
+        """
+        基准-预签名URL请求速率：预先批量生成预签名GET/PUT URL，通过连接复用的HTTP会话按并发发送，
+        与同样预先签名的Authorization头请求对比，统计查询串签名与头签名认证路径的时延差异
+        """
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        config = s3cfg_global_unique
+        size = bench_config.presigned_size
+        payload = self.gen_payload(size)
+        payload_hash = hashlib.sha256(payload).hexdigest()
+        empty_hash = hashlib.sha256(b'').hexdigest()
+
+        keys = [f"bench-presigned-{i:08d}" for i in range(bench_config.presigned_urls)]
+        endpoint = config.default_endpoint.rstrip('/')
+        plain_urls = [f"{endpoint}/{bucket_name}/{key}" for key in keys]
+        query_signer = AWS4SignerForQueryString(config.main_access_key, config.main_secret_key, endpoint)
+        header_signer = AWS4Signer(config.main_access_key, config.main_secret_key)
+
+        # the puts go first, so the gets read keys which exist.
+        requests_of = {
+            'query_put': query_signer.presign_urls([('PUT', bucket_name, key, 3600) for key in keys]),
+            'header_put': self.sign_headers(header_signer, 'PUT', plain_urls, payload_hash),
+            'query_get': query_signer.presign_urls([('GET', bucket_name, key, 3600) for key in keys]),
+            'header_get': self.sign_headers(header_signer, 'GET', plain_urls, empty_hash),
+        }
+
+        def _request(name):
+            method = name.split('_')[1].upper()
+            signed = requests_of[name]
+
+            def _operation(session, worker_id, seq):
+                # every thread walks its own slice of the urls, wrapping around.
+                index = (worker_id * bench_config.ops + seq) % len(keys)
+                if name.startswith('query'):
+                    url, headers = signed[index], None
+                else:
+                    url, headers = plain_urls[index], signed[index]
+                response = session.request(method, url, headers=headers, data=payload if method == 'PUT' else None)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{name} {keys[index]}: {response.status_code} {response.text[:200]}")
+                return size if method == 'PUT' else len(response.content)
+            return _operation
+
+        params = {'size': format_size(size), 'urls': len(keys), 'concurrency': bench_concurrency}
+        summaries = {}
+        for name in requests_of:
+            recorder = self.run_cell(_request(name), get_http_session, config, bench_concurrency,
+                                     ops=bench_config.ops, name=name)
+            bench_report.add('presigned', params, recorder)
+            summaries[name] = recorder.summary()[name]
+            self.eq(recorder.errors[name], 0)
+
+        for method in ('get', 'put'):
+            query, header = summaries[f'query_{method}'], summaries[f'header_{method}']
+            bench_report.add_row('presigned_auth_split', params, method=method.upper(),
+                                 query_p50_ms=query['p50_ms'], header_p50_ms=header['p50_ms'],
+                                 p50_delta_ms=round(query['p50_ms'] - header['p50_ms'], 3),
+                                 query_p99_ms=query['p99_ms'], header_p99_ms=header['p99_ms'],
+                                 p99_delta_ms=round(query['p99_ms'] - header['p99_ms'], 3),
+                                 ops_per_sec_ratio=round(query['ops_per_sec'] / header['ops_per_sec'], 3)
+                                 if header['ops_per_sec'] else None)
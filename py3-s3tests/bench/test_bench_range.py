@@ -0,0 +1,50 @@
+import pytest
+
+from s3tests.tests import get_client
+from s3tests.bench import BenchBaseClass, SSE_C_ARGS, MB, format_size
+from s3tests.functional.s3_range import SeededContent, RangeReader, plan_ranges
+from s3tests.functional.s3_loadgen import LatencyRecorder
+from s3tests.functional.s3_multipart import ParallelMultipartUploader
+
+
+@pytest.mark.bench
+class TestRangeReadBench(BenchBaseClass):
+
+    @staticmethod
+    def upload_content(config, bucket_name, key, content, sse_args):
+        uploader = ParallelMultipartUploader(get_client, config, part_size=16 * MB, concurrency=8)
+        uploader.upload(bucket_name, key, content.iter_chunks(16 * MB), part_args=sse_args, complete=True,
+                        **sse_args)
+
+    def test_range_read(self, s3cfg_global_unique, bench_config, bench_report, bench_range_size):
+        """
+        基准-范围读取：按范围大小、对齐方式、并发数（含SSE-C加密对象）并发发起范围GET，
+        统计吞吐与时延，并按种子生成的预期内容校验每段数据
+        """
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        content = SeededContent(bench_config.range_object_size, seed=bench_range_size)
+        reads = bench_config.range_reads
+
+        problems = []
+        for encryption, sse_args in (('none', {}), ('sse-c', SSE_C_ARGS)):
+            key = f'bench-range-{encryption}'
+            self.upload_content(s3cfg_global_unique, bucket_name, key, content, sse_args)
+
+            for alignment in ('aligned', 'unaligned'):
+                ranges = plan_ranges(content.size, bench_range_size, alignment=alignment, count=reads,
+                                     seed=alignment)
+                for concurrency in bench_config.concurrency:
+                    recorder = LatencyRecorder()
+                    reader = RangeReader(get_client, s3cfg_global_unique, concurrency=concurrency, recorder=recorder)
+                    recorder.begin()
+                    mismatches = reader.read_ranges(bucket_name, key, ranges, content=content, get_args=sse_args)
+                    recorder.finish()
+
+                    params = {'object_size': format_size(content.size), 'range_size': format_size(bench_range_size),
+                              'alignment': alignment, 'concurrency': concurrency, 'encryption': encryption}
+                    bench_report.add('range_read', params, recorder)
+                    if mismatches:
+                        problems.append((params, mismatches[:10]))
+
+        self.eq(problems, [])
@@ -0,0 +1,72 @@
+import pytest
+
+from s3tests.tests import get_client
+from s3tests.bench import BenchBaseClass, format_size
+from s3tests.functional.s3_loadgen import percentile, run_scaling_sweep
+
+
+@pytest.mark.bench
+class TestScalingBench(BenchBaseClass):
+
+    def test_percentile(self):
+        """
+        基准-验证最近秩百分位数（p50/p99/p999）在已知样本上的取值，报告与拐点检测均基于它
+        """
+        self.eq(percentile([], 99), 0.0)
+        self.eq(percentile([7], 99.9), 7)
+        ten = list(range(1, 11))
+        self.eq([percentile(ten, p) for p in (0, 10, 50, 90, 99, 100)], [1, 1, 5, 9, 10, 10])
+        hundred = list(range(1, 101))
+        self.eq([percentile(hundred, p) for p in (1, 50, 90, 99, 99.9, 100)], [1, 50, 90, 99, 100, 100])
+        thousand = list(range(1, 1001))
+        self.eq([percentile(thousand, p) for p in (50, 99, 99.9)], [500, 990, 999])
+        self.eq([percentile(list(range(1, 10001)), p) for p in (99.9, 99.99)], [9990, 9999])
+
+    def test_scaling(self, s3cfg_global_unique, bench_config, bench_report, bench_scaling_profile):
+        """
+        基准-并发扩展曲线：单一操作（PUT、GET、范围GET）按并发1、2、4…N运行，记录每步吞吐与p99，
+        找出吞吐不再增长而时延开始上升的拐点，曲线输出为JSON/CSV
+        """
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        size = bench_config.scaling_size
+        range_size = min(bench_config.scaling_range_size, size)
+        payload = self.gen_payload(size)
+        client.put_object(Bucket=bucket_name, Key='bench-scaling-src', Body=payload)
+
+        def _put(c, worker_id, seq):
+            # as do_create_object, one key per thread.
+            c.put_object(Bucket=bucket_name, Key=f'bench-scaling-{worker_id}', Body=payload)
+            return size
+
+        def _get(c, worker_id, seq):
+            return len(c.get_object(Bucket=bucket_name, Key='bench-scaling-src')['Body'].read())
+
+        def _get_range(c, worker_id, seq):
+            # as check_content_using_range, the ranges of a thread walk the object.
+            start = (worker_id + seq) * range_size % size
+            end = min(start + range_size, size) - 1
+            body = c.get_object(Bucket=bucket_name, Key='bench-scaling-src', Range=f'bytes={start}-{end}')['Body']
+            data = body.read()
+            if data != payload[start:end + 1]:
+                raise RuntimeError(f"bytes {start}-{end} differ.")
+            return len(data)
+
+        operation = {'put': _put, 'get': _get, 'get_range': _get_range}[bench_scaling_profile]
+        curve = run_scaling_sweep(operation, get_client, s3cfg_global_unique, bench_config.scaling_max,
+                                  ops=bench_config.ops, name=bench_scaling_profile)
+
+        params = {'profile': bench_scaling_profile, 'size': format_size(size)}
+        if bench_scaling_profile == 'get_range':
+            params['range_size'] = format_size(range_size)
+        for point in curve.points:
+            bench_report.add_row('scaling', params, **point)
+        knee = curve.knee()
+        bench_report.add_row('scaling_knee', params, knee_concurrency=knee['concurrency'] if knee else None,
+                             knee_ops_per_sec=knee['ops_per_sec'] if knee else None,
+                             knee_p99_ms=knee['p99_ms'] if knee else None,
+                             max_ops_per_sec=max(p['ops_per_sec'] for p in curve.points))
+
+        curve.write_json(f"{bench_config.report}_scaling_{bench_scaling_profile}.json")
+        curve.write_csv(f"{bench_config.report}_scaling_{bench_scaling_profile}.csv")
+        self.eq([p['errors'] for p in curve.points], [0] * len(curve.points))
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from s3tests.tests import get_client
+from s3tests.bench import BenchBaseClass
+from s3tests.functional import s3_async, s3_delete, s3_enumerate
+from s3tests.functional.s3_loadgen import LatencyRecorder
+
+
+@pytest.mark.bench
+class TestVersionChainBench(BenchBaseClass):
+
+    @staticmethod
+    def walk_versions(client, bucket_name, recorder):
+        """
+        Lists every version of the bucket (pages of 1000), the latency of every page goes to recorder,
+        returns {key: [version_id, ...]}, newest first.
+        """
+        versions = {}
+        pages = s3_enumerate.iter_pages(client, bucket_name, versions=True)
+        while True:
+            t0 = time.perf_counter()
+            response = next(pages, None)
+            if response is None:
+                return versions
+            recorder.record('list_object_versions', time.perf_counter() - t0)
+            for v in response.get('Versions', []):
+                versions.setdefault(v['Key'], []).append(v['VersionId'])
+
+    def test_version_chain(self, s3cfg_global_unique, bench_config, bench_report, bench_version_keys):
+        """
+        基准-版本链增长：并发为若干对象构建10^3-10^5个版本，在各检查点统计list_object_versions翻页时延、
+        按VersionId读取与读取最新版本的时延对比，以及创建删除标记的耗时
+        """
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        self.check_configure_versioning_retry(client, bucket_name, "Enabled", "Enabled")
+        keys = [f"bench-chain-{i:06d}" for i in range(bench_version_keys)]
+        ops = bench_config.ops
+
+        chain = 0
+        for checkpoint in bench_config.version_chain:
+            # grow every chain to checkpoint versions, all the keys at once.
+            t0 = time.perf_counter()
+            added = s3_async.run_with_client(
+                s3cfg_global_unique, s3_async.put_objects, bucket_name,
+                (key for _ in range(checkpoint - chain) for key in keys), body=b'v',
+                max_connections=bench_config.seed_connections)
+            seconds = time.perf_counter() - t0
+            chain = checkpoint
+
+            params = {'keys': len(keys), 'versions_per_key': chain, 'versions': chain * len(keys)}
+            bench_report.add_row('version_chain_build', params, added=added, seconds=round(seconds, 3),
+                                 versions_per_sec=round(added / seconds, 2))
+
+            recorder = LatencyRecorder()
+            recorder.begin()
+            versions = self.walk_versions(client, bucket_name, recorder)
+            recorder.finish()
+            bench_report.add('version_chain', params, recorder)
+            self.eq(sorted(len(v) for v in versions.values()), [chain] * len(keys))
+
+            # the same number of reads, spread over the whole chains (oldest included) or on the latest.
+            version_list = [(key, vid) for key, vids in versions.items() for vid in vids]
+            stride = max(1, len(version_list) // max(ops, 1))
+
+            def _get_by_version_id(c, worker_id, seq):
+                key, version_id = version_list[(seq * stride) % len(version_list)]
+                return len(c.get_object(Bucket=bucket_name, Key=key, VersionId=version_id)['Body'].read())
+
+            def _get_latest(c, worker_id, seq):
+                return len(c.get_object(Bucket=bucket_name, Key=keys[seq % len(keys)])['Body'].read())
+
+            def _delete_marker(c, worker_id, seq):
+                c.delete_object(Bucket=bucket_name, Key=keys[seq % len(keys)])
+
+            for name, operation in (('get_by_version_id', _get_by_version_id), ('get_latest', _get_latest),
+                                    ('delete_marker', _delete_marker)):
+                recorder = self.run_cell(operation, get_client, s3cfg_global_unique, 1, ops=ops, name=name)
+                bench_report.add('version_chain', params, recorder)
+                self.eq(recorder.errors[name], 0)
+
+            # remove the delete markers, so the next checkpoint reads the latest versions again.
+            markers = [v for v in s3_enumerate.iter_versions(client, bucket_name) if 'Size' not in v]
+            self.eq(len(markers), ops * self.processes)
+            self.eq(s3_delete.delete_keys(client, bucket_name, markers), [])
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from s3tests.tests import get_client
+from s3tests.bench import BenchBaseClass
+from s3tests.functional.s3_workload import Workload
+
+WORKLOADS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'workloads')
+
+
+def workload_path(name):
+    """
+    A workload file path, or the name of one in bench/workloads.
+    """
+    if os.path.exists(name):
+        return name
+    return os.path.join(WORKLOADS_PATH, name if name.endswith('.yaml') else f'{name}.yaml')
+
+
+@pytest.mark.bench
+class TestWorkloadBench(BenchBaseClass):
+
+    def test_workload(self, s3cfg_global_unique, bench_config, bench_report, bench_workload):
+        """
+        基准-混合负载：按YAML定义的操作比例、对象大小分布、key热度、时长与速率/并发运行，统计每种操作的吞吐与时延
+        """
+        workload = Workload.load(workload_path(bench_workload))
+        client = get_client(s3cfg_global_unique)
+        bucket_name = workload.bucket_name(s3cfg_global_unique) or self.get_new_bucket(client, s3cfg_global_unique)
+
+        preloaded = workload.preload(get_client, s3cfg_global_unique, bucket_name,
+                                     concurrency=min(bench_config.seed_connections, 64))
+        duration = bench_config.workload_duration
+        params = {'workload': workload.name, 'concurrency': workload.concurrency, 'rate': workload.rate,
+                  'keys': workload.keys.count, 'popularity': workload.keys.popularity, 'preloaded': preloaded}
+        if workload.arrival:
+            recorder, schedule = workload.run_open_loop(get_client, s3cfg_global_unique, bucket_name,
+                                                        duration=duration)
+            params.update({'arrival': workload.arrival, 'concurrency': workload.workers})
+            bench_report.add_row('mixed_workload_schedule', params, **schedule)
+        else:
+            recorder = workload.run(get_client, s3cfg_global_unique, bucket_name, duration=duration,
+                                    processes=bench_config.processes)
+            params['processes'] = bench_config.processes
+        bench_report.add('mixed_workload', params, recorder)
+        self.eq({op: n for op, n in recorder.errors.items() if n}, {})
@@ -8,6 +8,8 @@ import string
 import itertools
 from datetime import datetime
 import os
+import sys
+import tracemalloc
 from pathlib2 import Path
 
 import pytest
@@ -154,10 +156,330 @@ def pytest_addoption(parser: Any) -> None:
         default=CFG_PATH,
         help="s3tests.conf path, defaults to s3tests/s3tests.conf",
     )
+    group.addoption(
+        "--mem-track",
+        action="store_true",
+        default=False,
+        help="track the memory high-water (tracemalloc peak and RSS peak) of every test.",
+    )
+    group.addoption(
+        "--mem-budget",
+        type=float,
+        default=None,
+        help="per-test memory budget in MB, tests whose tracemalloc peak exceeds it fail. implies --mem-track.",
+    )
+
+    group = parser.getgroup("bench", "S3 Benchmark")
+    group.addoption(
+        "--bench-sizes",
+        default="4KB,64KB,1MB,16MB,128MB,1GB",
+        help="object sizes of the benchmark sweep, defaults to 4KB,64KB,1MB,16MB,128MB,1GB",
+    )
+    group.addoption(
+        "--bench-concurrency",
+        default="1,8,32",
+        help="concurrency(threads) of the benchmark sweep, defaults to 1,8,32",
+    )
+    group.addoption(
+        "--bench-ops",
+        type=int,
+        default=50,
+        help="operations per thread of each benchmark phase, defaults to 50",
+    )
+    group.addoption(
+        "--bench-max-bytes",
+        default="4GB",
+        help="bytes moved per benchmark phase at most, --bench-ops is reduced to fit, "
+             "cells over it with one op per thread are skipped, defaults to 4GB",
+    )
+    group.addoption(
+        "--bench-processes",
+        type=int,
+        default=1,
+        help="processes of the closed-loop phases and of the mixed workloads, each runs the concurrency threads "
+             "of the cell, defaults to 1 (threads only)",
+    )
+    group.addoption(
+        "--bench-part-sizes",
+        default="5MB,16MB,64MB,128MB,512MB",
+        help="part sizes of the multipart benchmark sweep, defaults to 5MB,16MB,64MB,128MB,512MB",
+    )
+    group.addoption(
+        "--bench-mpu-size",
+        default="1GB",
+        help="object size of the multipart benchmark, defaults to 1GB",
+    )
+    group.addoption(
+        "--bench-mpu-uploads",
+        type=int,
+        default=3,
+        help="multipart uploads per cell of the multipart benchmark, defaults to 3",
+    )
+    group.addoption(
+        "--bench-copy-part-size",
+        default="64MB",
+        help="range size of the parallel upload_part_copy in the copy benchmark, defaults to 64MB",
+    )
+    group.addoption(
+        "--bench-list-keys",
+        default="100000",
+        help="keys seeded in the bucket of the listing benchmark, a sweep as 100000,1000000,10000000, "
+             "defaults to 100000",
+    )
+    group.addoption(
+        "--bench-list-dists",
+        default="sequential,random,prefixed,deep",
+        help="key name distributions of the listing benchmark, defaults to sequential,random,prefixed,deep",
+    )
+    group.addoption(
+        "--bench-list-max-keys",
+        default="100,1000",
+        help="MaxKeys of the listing benchmark walks, defaults to 100,1000",
+    )
+    group.addoption(
+        "--bench-seed-connections",
+        type=int,
+        default=256,
+        help="concurrent requests (asyncio) when seeding the benchmark buckets, defaults to 256",
+    )
+    group.addoption(
+        "--bench-delete-keys",
+        type=int,
+        default=10000,
+        help="keys deleted per cell of the bulk delete benchmark, defaults to 10000",
+    )
+    group.addoption(
+        "--bench-delete-batches",
+        default="1,10,100,1000",
+        help="keys per delete_objects request of the bulk delete benchmark sweep (1-1000), defaults to 1,10,100,1000",
+    )
+    group.addoption(
+        "--bench-meta-objects",
+        type=int,
+        default=1000,
+        help="objects seeded for the metadata ops benchmark, defaults to 1000",
+    )
+    group.addoption(
+        "--bench-version-chain",
+        default="1000,10000",
+        help="versions per key at which the version chain benchmark measures, the chain grows through them, "
+             "a sweep as 1000,10000,100000, defaults to 1000,10000",
+    )
+    group.addoption(
+        "--bench-version-keys",
+        default="1",
+        help="keys whose version chains grow together in the version chain benchmark sweep, defaults to 1",
+    )
+    group.addoption(
+        "--bench-scaling-profiles",
+        default="put,get,get_range",
+        help="operations of the concurrency scaling benchmark (put, get, get_range), defaults to put,get,get_range",
+    )
+    group.addoption(
+        "--bench-scaling-max",
+        type=int,
+        default=64,
+        help="highest concurrency of the scaling benchmark, it runs at 1, 2, 4 ... up to it, defaults to 64",
+    )
+    group.addoption(
+        "--bench-scaling-size",
+        default="1MB",
+        help="object size of the scaling benchmark, defaults to 1MB",
+    )
+    group.addoption(
+        "--bench-scaling-range-size",
+        default="64KB",
+        help="range size of the get_range profile of the scaling benchmark, defaults to 64KB",
+    )
+    group.addoption(
+        "--bench-workloads",
+        default="mixed",
+        help="workload files (YAML) of the mixed workload benchmark, paths or names in bench/workloads, "
+             "defaults to mixed",
+    )
+    group.addoption(
+        "--bench-workload-duration",
+        type=float,
+        default=None,
+        help="seconds each workload runs, overrides the duration/ops of the workload files",
+    )
+    group.addoption(
+        "--bench-rates",
+        default="50,100,200",
+        help="requests/s of the open loop benchmark sweep, defaults to 50,100,200",
+    )
+    group.addoption(
+        "--bench-arrival",
+        default="poisson",
+        choices=("poisson", "fixed"),
+        help="arrivals of the open loop benchmark, poisson or fixed(interval), defaults to poisson",
+    )
+    group.addoption(
+        "--bench-open-duration",
+        type=float,
+        default=30,
+        help="seconds of each open loop run, defaults to 30",
+    )
+    group.addoption(
+        "--bench-open-workers",
+        type=int,
+        default=64,
+        help="threads running the requests of the open loop benchmark, defaults to 64",
+    )
+    group.addoption(
+        "--bench-open-size",
+        default="4KB",
+        help="object size of the open loop benchmark, defaults to 4KB",
+    )
+    group.addoption(
+        "--bench-range-sizes",
+        default="4KB,64KB,1MB,8MB",
+        help="range sizes of the range read benchmark sweep, defaults to 4KB,64KB,1MB,8MB",
+    )
+    group.addoption(
+        "--bench-range-object-size",
+        default="256MB",
+        help="object size of the range read benchmark, defaults to 256MB",
+    )
+    group.addoption(
+        "--bench-range-reads",
+        type=int,
+        default=1000,
+        help="ranged GETs per cell of the range read benchmark, defaults to 1000",
+    )
+    group.addoption(
+        "--bench-presigned-urls",
+        type=int,
+        default=10000,
+        help="presigned urls (and header-signed requests) generated up front per method, defaults to 10000",
+    )
+    group.addoption(
+        "--bench-presigned-size",
+        default="4KB",
+        help="object size of the presigned url benchmark, defaults to 4KB",
+    )
+    group.addoption(
+        "--bench-encryption-modes",
+        default="plaintext,sse-s3,sse-kms,sse-c",
+        help="encryption modes of the encryption overhead benchmark, plaintext is always run as the baseline, "
+             "defaults to plaintext,sse-s3,sse-kms,sse-c",
+    )
+    group.addoption(
+        "--bench-encryption-range-size",
+        default="1MB",
+        help="ranged GET size of the encryption overhead benchmark, defaults to 1MB",
+    )
+    group.addoption(
+        "--bench-kms-keyid",
+        default=None,
+        help="SSE-KMS key id of the encryption overhead benchmark, "
+             "defaults to kms_keyid of [s3 main], else testkey-1 (a testing KMS backend key)",
+    )
+    group.addoption(
+        "--bench-policy-statements",
+        default="1,10,100",
+        help="statement counts of the bucket policy evaluation benchmark, defaults to 1,10,100",
+    )
+    group.addoption(
+        "--bench-policy-sizes",
+        default="4KB,10KB,20KB",
+        help="policy sizes of the bucket policy evaluation benchmark, at most 20KB, defaults to 4KB,10KB,20KB",
+    )
+    group.addoption(
+        "--bench-report",
+        default="report/bench",
+        help="benchmark results path, without extension (.json and .html are written), defaults to report/bench",
+    )
 
 # -------------------------------------------- Gen s3cfg from s3tests.conf end ---------------------------- #
 
 
+# -------------------------------------------- Memory tracking start -------------------------- #
+MB = 1024 * 1024
+MEM_TRACK = Munch(enabled=False, budget=None, peaks=[])  # filled in pytest_configure
+
+
+def _rss_peak() -> int:
+    """Return the RSS high-water of this process in bytes, 0 if it can not be read."""
+    try:
+        with open('/proc/self/status') as fp:
+            for line in fp:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        import resource
+    except ImportError:  # e.g.: windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # bytes on macOS, KB on linux
+
+
+def _reset_rss_peak() -> None:
+    """Reset VmHWM (linux only), otherwise the RSS peak is the peak of the whole process."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as fp:
+            fp.write('5')
+    except OSError:
+        pass
+
+
+def _setup_mem_track(config) -> None:
+    MEM_TRACK.budget = config.getoption('--mem-budget')
+    MEM_TRACK.enabled = config.getoption('--mem-track') or MEM_TRACK.budget is not None
+
+    if MEM_TRACK.enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def _check_mem_budget(report) -> None:
+    """Fail a passed test whose tracemalloc peak is over --mem-budget."""
+    peak = dict(report.user_properties).get("mem_peak_bytes")
+    if MEM_TRACK.budget is None or peak is None or not report.passed:
+        return
+
+    if peak > MEM_TRACK.budget * MB:
+        report.outcome = "failed"
+        report.longrepr = f"Memory budget exceeded: tracemalloc peak is {peak / MB:.1f} MB, " \
+                          f"budget is {MEM_TRACK.budget} MB"
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    if not MEM_TRACK.enabled:
+        yield
+        return
+
+    _reset_rss_peak()
+    tracemalloc.clear_traces()  # also resets the traced peak
+    yield
+    _, traced_peak = tracemalloc.get_traced_memory()
+
+    # user_properties are copied to the report, so they end up in the HTML/JSON/junitxml output.
+    item.user_properties.append(("mem_peak_bytes", traced_peak))
+    item.user_properties.append(("rss_peak_bytes", _rss_peak()))
+
+
+def pytest_runtest_logreport(report):
+    """ Collect the peaks, runs on the controller when using pytest-xdist. """
+    props = dict(report.user_properties)
+    if report.when == "call" and "mem_peak_bytes" in props:
+        MEM_TRACK.peaks.append((props["mem_peak_bytes"], props["rss_peak_bytes"], report.nodeid))
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not MEM_TRACK.peaks:
+        return
+
+    terminalreporter.write_sep("=", "memory high-water (top 10)")
+    for traced_peak, rss_peak, nodeid in sorted(MEM_TRACK.peaks, reverse=True)[:10]:
+        terminalreporter.write_line(f"{traced_peak / MB:10.1f} MB traced {rss_peak / MB:10.1f} MB rss  {nodeid}")
+
+# -------------------------------------------- Memory tracking end ---------------------------- #
+
+
 # -------------------------------------------- Enhancing report start -------------------------- #
 # modify header section
 REPORT_TITLE = "S3 Compatibility Automation Test Report"
@@ -173,7 +495,7 @@ def pytest_html_report_title(report):
 def pytest_configure(config):
     # config._metadata["Tester"] = "PTC Automation Test"
     # config._metadata.pop("JAVA_HOME")
-    pass
+    _setup_mem_track(config)
 
 
 # To modify the Environment section after tests are run, use pytest_sessionfinish:
@@ -196,6 +518,8 @@ def pytest_html_results_table_header(cells):
     """ Called after building results table header. """
     cells.insert(2, html.th('TestCase Description'))
     cells.insert(1, html.th('Start Time', class_='sortable time', col='time'))
+    if MEM_TRACK.enabled:
+        cells.insert(4, html.th('Peak Mem (MB)', class_='sortable numeric', col='mem'))
     cells.pop()
 
 
@@ -203,6 +527,9 @@ def pytest_html_results_table_row(report, cells):
     """ Called after building results table row. """
     cells.insert(2, html.td(report.description))
     cells.insert(1, html.td(datetime.utcnow(), class_='col-time'))
+    if MEM_TRACK.enabled:
+        peak = dict(report.user_properties).get("mem_peak_bytes")
+        cells.insert(4, html.td('' if peak is None else f"{peak / MB:.1f}", class_='col-mem'))
     cells.pop()
 
 
@@ -214,6 +541,9 @@ def pytest_runtest_makereport(item, call):
     setattr(report, "duration_formatter", "%H:%M:%S.%f")  # Formatting the Duration Column
     report.description = str(item.function.__doc__)  # case docs
 
+    if MEM_TRACK.enabled and call.when == "call":
+        _check_mem_budget(report)
+
     # report.nodeid = report.nodeid.encode("utf-8").decode("unicode_escape")  # resolve Chinese
 
 
@@ -48,3 +48,90 @@ def make_json_policy(action, resource, principal={"AWS": "*"}, effect='Allow', c
     s = Statement(action, resource, principal, effect=effect, condition=conditions)
     p = Policy()
     return p.add_statement(s).to_json()
+
+
+# the largest bucket policy S3 accepts.
+MAX_BUCKET_POLICY_SIZE = 20 * 1024
+POLICY_CONDITION_KEYS = ('aws:SourceIp', 's3:prefix', 's3:ExistingObjectTag')
+
+
+def _filler_condition(index, condition_keys):
+    """
+    A Condition block of condition_keys which never holds (TEST-NET-1 addresses, prefixes and tags nobody uses).
+    """
+    condition = {}
+    for key in condition_keys:
+        if key == 'aws:SourceIp':
+            condition.setdefault("IpAddress", {})["aws:SourceIp"] = f"192.0.2.{index % 256}/32"
+        elif key == 's3:prefix':
+            condition.setdefault("StringEquals", {})["s3:prefix"] = f"policy-filler-{index}/"
+        elif key == 's3:ExistingObjectTag':
+            condition.setdefault("StringEquals", {})[f"s3:ExistingObjectTag/filler-{index}"] = "never"
+        else:
+            raise ValueError(f"Unknown condition key: {key}, one of {POLICY_CONDITION_KEYS}.")
+    return condition
+
+
+def make_complex_policy(bucket, statements=1, wildcards=False, conditions=(), size=None,
+                        principal={"AWS": "*"}):
+    """
+    Makes a policy granting principal s3:GetObject, s3:PutObject and s3:ListBucket on bucket,
+    padded with statements which never grant anything more but are as costly to evaluate as asked.
+
+    @param statements
+        the number of statements, the last one grants the access, the others are fillers,
+        at least 2 with wildcards or conditions, so that a filler carries them.
+    @param wildcards
+        the resources of the fillers are wildcard patterns (e.g.: bucket/*/filler-1-*?) instead of exact keys.
+    @param conditions
+        keys of POLICY_CONDITION_KEYS, every filler gets a Condition block of them, its resources then
+        match every object, so only the (never true) conditions keep it out.
+    @param size
+        fillers are added until the policy is about size bytes (more statements than statements if needed),
+        at most MAX_BUCKET_POLICY_SIZE.
+    @return the Policy.
+    """
+    if size is not None and size > MAX_BUCKET_POLICY_SIZE:
+        raise ValueError(f"A bucket policy is at most {MAX_BUCKET_POLICY_SIZE} bytes, got {size}.")
+    if wildcards or conditions:
+        statements = max(statements, 2)
+    actions = ["s3:GetObject", "s3:PutObject", "s3:ListBucket"]
+    bucket_arn = f"arn:aws:s3:::{bucket}"
+
+    def _filler(index):
+        resource = [bucket_arn, f"{bucket_arn}/*/filler-{index}-*?" if wildcards else f"{bucket_arn}/filler-{index}"]
+        if conditions:
+            resource.append(f"{bucket_arn}/*")
+            return Statement(actions, resource, principal, condition=_filler_condition(index, conditions))
+        return Statement(actions, resource[1:], principal)
+
+    grant = Statement(actions, [bucket_arn, f"{bucket_arn}/*"], principal)
+    policy = Policy()
+    policy.statements = [_filler(i) for i in range(statements - 1)] + [grant]
+    if size is not None:
+        while len(policy.to_json()) < size:
+            policy.statements.insert(-1, _filler(len(policy.statements) - 1))
+        if len(policy.to_json()) > size and len(policy.statements) > statements:
+            policy.statements.pop(-2)
+    return policy
+
+
+def iter_policy_complexity(bucket, statements=(1, 10, 100), sizes=(4 * 1024, 10 * 1024, MAX_BUCKET_POLICY_SIZE),
+                           principal={"AWS": "*"}):
+    """
+    Yields (params, policy json) of policies of increasing evaluation cost, all granting the same access:
+    statements only, then wildcard resources, then wildcards and every condition key, then those padded to sizes.
+    Levels over MAX_BUCKET_POLICY_SIZE (many statements with conditions) are skipped.
+    """
+    levels = [dict(statements=n) for n in statements] + \
+        [dict(statements=n, wildcards=True) for n in statements] + \
+        [dict(statements=n, wildcards=True, conditions=POLICY_CONDITION_KEYS) for n in statements] + \
+        [dict(statements=1, wildcards=True, conditions=POLICY_CONDITION_KEYS, size=s) for s in sizes]
+
+    for level in levels:
+        policy = make_complex_policy(bucket, principal=principal, **level)
+        policy_json = policy.to_json()
+        if len(policy_json) > MAX_BUCKET_POLICY_SIZE:
+            continue
+        yield {'statements': len(policy.statements), 'wildcards': level.get('wildcards', False),
+               'conditions': '+'.join(level.get('conditions', ())) or 'none', 'bytes': len(policy_json)}, policy_json
@@ -0,0 +1,331 @@
+
+import ssl
+import asyncio
+import itertools
+import collections
+from typing import Dict
+from urllib.parse import urlparse
+from xml.etree import ElementTree
+
+from s3tests.functional.s3_raw import S3RawEngine
+from s3tests.functional.s3_sigv4 import AWS4Signer
+
+
+class AsyncResponse(object):
+    """
+    status, headers (lower-cased names) and the whole body of an async request.
+    """
+
+    def __init__(self, status, headers: Dict, content):
+        self.status = status
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+
+class _AsyncConnection(object):
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class _StaleConnectionError(ConnectionResetError):
+    """
+    The connection failed before any byte of the response arrived (e.g. the server closed an idle
+    keep-alive connection), the only case a request is safe to send again.
+    """
+
+
+async def _read_response(reader, http_method):
+    """
+    Reads one HTTP/1.1 response, returns (status, headers, content, keep_alive).
+    """
+    try:
+        line = await reader.readline()
+    except ConnectionError as e:
+        raise _StaleConnectionError(f"The connection failed before the response: {e}") from e
+    if not line:
+        raise _StaleConnectionError("The connection was closed by the server.")
+    if not line.endswith(b'\n'):
+        raise ConnectionResetError("The connection was closed in the middle of the status line.")
+    version, status = line.decode('latin-1').split(None, 2)[:2]
+    status = int(status)
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, value = line.decode('latin-1').split(':', 1)
+        headers[name.strip().lower()] = value.strip()
+
+    keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+    if http_method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+        content = b''
+    elif 'chunked' in headers.get('transfer-encoding', '').lower():
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';', 1)[0], 16)
+            if not size:
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)  # CRLF
+        while (await reader.readline()) not in (b'\r\n', b'\n', b''):  # trailers
+            pass
+        content = b''.join(chunks)
+    elif 'content-length' in headers:
+        content = await reader.readexactly(int(headers['content-length']))
+    else:
+        content = await reader.read()
+        keep_alive = False
+
+    return status, headers, content, keep_alive
+
+
+class AsyncConnectionPool(object):
+    """
+    Keep-alive HTTP/1.1 connections to one host, on asyncio streams.
+
+    At most maxsize requests are in flight (each on its own connection), the other callers wait
+    for a free connection, so any number of coroutines can share the pool.
+    The pool belongs to the event loop it was first used in.
+    """
+
+    def __init__(self, host, port, ssl_context=None, maxsize=100, timeout=60):
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._idle = collections.deque()
+        self._slots = None
+
+    async def _get_conn(self):
+        """
+        Returns (connection, reused).
+        """
+        if self._idle:
+            return self._idle.pop(), True
+
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=self.ssl_context,
+                                    server_hostname=self.host if self.ssl_context else None),
+            self.timeout)
+        return _AsyncConnection(reader, writer), False
+
+    async def send(self, http_method, path, headers: Dict, body=b''):
+        """
+        Sends one request, returns an AsyncResponse.
+        A request failing on a reused connection before any byte of the response (the server closed the idle
+        connection) is sent again on a new one, any later failure is raised, the request may have been applied.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.maxsize)
+
+        head = f"{http_method} {path} HTTP/1.1\r\n" + \
+               ''.join(f"{k}: {v}\r\n" for k, v in headers.items()) + "\r\n"
+        data = head.encode('latin-1') + body
+
+        async def _exchange(conn):
+            try:
+                conn.writer.write(data)
+                await conn.writer.drain()
+            except ConnectionError as e:
+                raise _StaleConnectionError(f"The connection failed while sending the request: {e}") from e
+            return await _read_response(conn.reader, http_method)
+
+        async with self._slots:
+            while True:
+                conn, reused = await self._get_conn()
+                try:
+                    # the timeout also covers drain, a server not reading the body would block it forever
+                    status, res_headers, content, keep_alive = await asyncio.wait_for(_exchange(conn), self.timeout)
+                except _StaleConnectionError:
+                    conn.close()
+                    if reused:
+                        continue
+                    raise
+                except BaseException:
+                    conn.close()
+                    raise
+
+                if keep_alive:
+                    self._idle.append(conn)
+                else:
+                    conn.close()
+                return AsyncResponse(status, res_headers, content)
+
+    async def close(self):
+        while self._idle:
+            conn = self._idle.pop()
+            conn.close()
+            try:
+                await conn.writer.wait_closed()
+            except (ConnectionError, ssl.SSLError):
+                pass
+
+
+class AsyncS3Client(object):
+    """
+    asyncio S3 requests, signed by s3_sigv4.AWS4Signer and sent over an AsyncConnectionPool,
+    for the high fan-out cases (thousands of concurrent requests from one process) where a thread
+    per request does not scale.
+
+    Bodies are bytes (or str), responses are read whole, see AsyncResponse.
+
+    Usage:
+        async with AsyncS3Client.from_config(config, max_connections=512) as client:
+            await asyncio.gather(*(client.put_object(bucket, f'obj-{i}', b'bar') for i in range(10000)))
+    """
+
+    def __init__(self, endpoint_url, aws_access_key, aws_secret_key, region_name='us-east-1',
+                 verify=True, max_connections=100, timeout=60):
+        self.endpoint_url = endpoint_url.rstrip('/')
+        self.signer = AWS4Signer(aws_access_key, aws_secret_key, region_name=region_name)
+
+        parsed = urlparse(self.endpoint_url)
+        ssl_context = None
+        if parsed.scheme == 'https':
+            ssl_context = ssl.create_default_context()
+            if not verify:
+                ssl_context.check_hostname = False
+                ssl_context.verify_mode = ssl.CERT_NONE
+        self.pool = AsyncConnectionPool(parsed.hostname, parsed.port or (443 if ssl_context else 80),
+                                        ssl_context=ssl_context, maxsize=max_connections, timeout=timeout)
+
+    @classmethod
+    def from_config(cls, config, alt=False, **kwargs):
+        """
+        Returns the client of the main (or alt) user of S3CFG.
+        """
+        return cls(
+            config.default_endpoint,
+            config.alt_access_key if alt else config.main_access_key,
+            config.alt_secret_key if alt else config.main_secret_key,
+            verify=config.default_ssl_verify,
+            **kwargs
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.pool.close()
+
+    async def request(self, http_method, bucket=None, key=None, query: Dict = None, headers: Dict = None, body=b''):
+        """
+        Signs and sends one request, returns an AsyncResponse.
+        """
+        path = S3RawEngine.get_path(bucket, key, query)
+        body = body.encode('utf-8') if isinstance(body, str) else bytes(body or b'')
+        headers = dict(headers or {})
+        if body or http_method in ('PUT', 'POST'):
+            headers['Content-Length'] = str(len(body))
+
+        headers = self.signer.sign_request(http_method, self.endpoint_url + path, headers, payload=body)
+        return await self.pool.send(http_method, path, headers, body)
+
+    @staticmethod
+    def check_status(response, *expected):
+        if response.status not in expected:
+            raise RuntimeError(f"Unexpected status: {response.status}, {response.content[:1024]}")
+        return response
+
+    async def put_object(self, bucket, key, body, headers: Dict = None):
+        return self.check_status(await self.request('PUT', bucket, key, headers=headers, body=body), 200)
+
+    async def delete_object(self, bucket, key, version_id=None):
+        query = None if version_id is None else {'versionId': version_id}
+        return self.check_status(await self.request('DELETE', bucket, key, query=query), 204)
+
+    async def put_bucket_acl(self, bucket, canned_acl):
+        return self.check_status(
+            await self.request('PUT', bucket, query={'acl': None}, headers={'x-amz-acl': canned_acl}), 200)
+
+    async def list_object_versions(self, bucket, prefix=None, max_keys=1000):
+        """
+        Returns [(key, version_id, is_delete_marker), ...] of every version in the bucket, page by page.
+        """
+        versions = []
+        query = {'versions': None, 'max-keys': max_keys}
+        if prefix:
+            query['prefix'] = prefix
+
+        while True:
+            res = self.check_status(await self.request('GET', bucket, query=query), 200)
+            root = ElementTree.fromstring(res.content)
+            for elem in root:
+                tag = elem.tag.rsplit('}', 1)[-1]
+                if tag in ('Version', 'DeleteMarker'):
+                    versions.append((elem.findtext('{*}Key'), elem.findtext('{*}VersionId'), tag == 'DeleteMarker'))
+
+            if root.findtext('{*}IsTruncated') != 'true':
+                return versions
+            query['key-marker'] = root.findtext('{*}NextKeyMarker')
+            query['version-id-marker'] = root.findtext('{*}NextVersionIdMarker')
+
+
+async def create_versioned_obj(client: AsyncS3Client, bucket_name, key, num):
+    """
+    Uploads num versions of key concurrently (bodies 'data {i}'), returns their version ids.
+    """
+    responses = await asyncio.gather(
+        *(client.put_object(bucket_name, key, 'data {i}'.format(i=i)) for i in range(num)))
+    return [res.headers.get('x-amz-version-id') for res in responses]
+
+
+async def put_objects(client: AsyncS3Client, bucket_name, keys, body=b'', window=10000):
+    """
+    Uploads body as every key of keys (any iterable) concurrently, window keys at a time, so the number
+    of pending coroutines stays bounded for millions of keys, returns how many were uploaded.
+    """
+    count = 0
+    keys = iter(keys)
+    while True:
+        batch = list(itertools.islice(keys, window))
+        if not batch:
+            return count
+        await asyncio.gather(*(client.put_object(bucket_name, key, body) for key in batch))
+        count += len(batch)
+
+
+async def clear_versioned_bucket(client: AsyncS3Client, bucket_name):
+    """
+    Deletes every version and delete marker of the bucket concurrently, returns how many were deleted.
+    """
+    versions = await client.list_object_versions(bucket_name)
+    await asyncio.gather(
+        *(client.delete_object(bucket_name, key, version_id=version_id) for key, version_id, _ in versions))
+    return len(versions)
+
+
+async def set_bucket_canned_acl(client: AsyncS3Client, bucket_name, canned_acl, num):
+    """
+    Sets the canned acl of the bucket num times concurrently, returns the result (True/False) of each request.
+    """
+    results = await asyncio.gather(
+        *(client.put_bucket_acl(bucket_name, canned_acl) for _ in range(num)), return_exceptions=True)
+    return [not isinstance(r, BaseException) for r in results]
+
+
+def run_with_client(config, func, *args, alt=False, max_connections=100, **kwargs):
+    """
+    Runs await func(client, *args, **kwargs) in a new event loop, with a new AsyncS3Client of the config.
+
+    e.g.: run_with_client(config, create_versioned_obj, bucket_name, 'foo', 1000, max_connections=256)
+    """
+    async def _run():
+        async with AsyncS3Client.from_config(config, alt=alt, max_connections=max_connections) as client:
+            return await func(client, *args, **kwargs)
+
+    return asyncio.run(_run())
@@ -0,0 +1,116 @@
+
+import threading
+
+MAX_DELETE_KEYS = 1000  # the limit of a single delete_objects request
+
+
+def iter_batches(objects, batch_size=MAX_DELETE_KEYS):
+    """
+    Yields lists of at most batch_size items of objects (any iterable).
+    """
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def to_delete_objects(objects):
+    """
+    keys (str), (key, version_id) tuples or {'Key', 'VersionId'} dicts -> the Objects of delete_objects.
+    """
+    result = []
+    for obj in objects:
+        if isinstance(obj, str):
+            result.append({'Key': obj})
+        elif isinstance(obj, dict):
+            result.append({k: obj[k] for k in ('Key', 'VersionId') if obj.get(k) is not None})
+        else:
+            key, version_id = obj
+            result.append({'Key': key} if version_id is None else {'Key': key, 'VersionId': version_id})
+    return result
+
+
+class BatchedDeleter(object):
+    """
+    Coalesces per-key deletes into delete_objects requests of batch_size (up to 1000) keys.
+
+    Keys failing to delete are kept in errors (the Errors of the responses), whether Quiet is set or not.
+
+    Usage:
+        with BatchedDeleter(client, bucket_name) as deleter:
+            for key in keys:
+                deleter.delete(key)
+        assert not deleter.errors
+    """
+
+    def __init__(self, client, bucket, batch_size=MAX_DELETE_KEYS, quiet=True, **delete_args):
+        if not 0 < batch_size <= MAX_DELETE_KEYS:
+            raise ValueError(f"batch_size must be in 1-{MAX_DELETE_KEYS}, got {batch_size}.")
+        self.client = client
+        self.bucket = bucket
+        self.batch_size = batch_size
+        self.quiet = quiet
+        self.delete_args = delete_args  # e.g.: BypassGovernanceRetention=True
+        self.deleted = 0
+        self.requests = 0
+        self.errors = []
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def delete(self, key, version_id=None):
+        """
+        Queues a delete, a delete_objects request is sent once batch_size are queued.
+        """
+        obj = {'Key': key} if version_id is None else {'Key': key, 'VersionId': version_id}
+        with self._lock:
+            self._pending.append(obj)
+            if len(self._pending) < self.batch_size:
+                return
+            batch, self._pending = self._pending, []
+        self.delete_batch(batch)
+
+    def delete_many(self, objects):
+        """
+        Queues keys, (key, version_id) tuples or {'Key', 'VersionId'} dicts.
+        """
+        for obj in to_delete_objects(objects):
+            self.delete(obj['Key'], obj.get('VersionId'))
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self.delete_batch(batch)
+
+    def delete_batch(self, objects):
+        """
+        Sends one delete_objects request of objects (dicts), returns its response.
+        """
+        response = self.client.delete_objects(Bucket=self.bucket, Delete={'Objects': objects, 'Quiet': self.quiet},
+                                              **self.delete_args)
+        errors = response.get('Errors', [])
+        with self._lock:
+            self.requests += 1
+            self.deleted += len(objects) - len(errors)
+            self.errors.extend(errors)
+        return response
+
+
+def delete_keys(client, bucket, objects, batch_size=MAX_DELETE_KEYS, quiet=True, **delete_args):
+    """
+    Deletes objects (see to_delete_objects) by batch_size at a time, returns the Errors of the responses.
+    """
+    with BatchedDeleter(client, bucket, batch_size=batch_size, quiet=quiet, **delete_args) as deleter:
+        deleter.delete_many(objects)
+    return deleter.errors
+
@@ -0,0 +1,190 @@
+
+import queue
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# split points when the bucket has no (or one) common prefix, any key falls in one of the ranges anyway.
+DEFAULT_SPLIT_CHARS = string.digits + string.ascii_uppercase + string.ascii_lowercase
+
+
+def iter_pages(client, bucket, versions=False, api='v2', prefix=None, delimiter=None, start_after=None,
+               page_size=1000):
+    """
+    Yields every page (response) of a listing, following the truncation markers.
+
+    @param versions
+        list_object_versions instead of list_objects.
+    @param api
+        'v1' (list_objects) or 'v2' (list_objects_v2), for objects only.
+    @param start_after
+        only keys greater than it are listed (Marker, StartAfter or KeyMarker).
+    """
+    kwargs = {'Bucket': bucket, 'MaxKeys': page_size}
+    if prefix:
+        kwargs['Prefix'] = prefix
+    if delimiter:
+        kwargs['Delimiter'] = delimiter
+
+    if versions:
+        if start_after:
+            kwargs['KeyMarker'] = start_after
+        while True:
+            response = client.list_object_versions(**kwargs)
+            yield response
+            if not response['IsTruncated']:
+                return
+            kwargs['KeyMarker'] = response['NextKeyMarker']
+            kwargs['VersionIdMarker'] = response.get('NextVersionIdMarker', '')
+
+    elif api == 'v2':
+        if start_after:
+            kwargs['StartAfter'] = start_after
+        while True:
+            response = client.list_objects_v2(**kwargs)
+            yield response
+            if not response['IsTruncated']:
+                return
+            kwargs['ContinuationToken'] = response['NextContinuationToken']
+
+    else:
+        if start_after:
+            kwargs['Marker'] = start_after
+        while True:
+            response = client.list_objects(**kwargs)
+            yield response
+            if not response['IsTruncated']:
+                return
+            # NextMarker is only returned with a delimiter.
+            last = [obj['Key'] for obj in response.get('Contents', [])] + \
+                   [p['Prefix'] for p in response.get('CommonPrefixes', [])]
+            kwargs['Marker'] = response.get('NextMarker') or max(last)
+
+
+def _page_entries(response, versions, delete_markers):
+    if not versions:
+        return response.get('Contents', [])
+    if delete_markers:
+        return response.get('Versions', []) + response.get('DeleteMarkers', [])
+    return response.get('Versions', [])
+
+
+def iter_entry_pages(client, bucket, versions=False, prefix=None, start_after=None, end=None, delete_markers=True,
+                     api='v2', page_size=1000):
+    """
+    Yields the entries (Contents, or Versions and DeleteMarkers) of the key range (start_after, end], page by page.
+    """
+    for response in iter_pages(client, bucket, versions=versions, api=api, prefix=prefix, start_after=start_after,
+                               page_size=page_size):
+        entries = _page_entries(response, versions, delete_markers)
+        if end is not None and entries and max(e['Key'] for e in entries) > end:
+            yield [e for e in entries if e['Key'] <= end]
+            return
+        yield entries
+
+
+def iter_objects(client, bucket, prefix=None, start_after=None, end=None, api='v2', page_size=1000):
+    """
+    Yields the object dicts (Key, Size, ETag...) of the bucket, in key order, however many they are.
+    """
+    for entries in iter_entry_pages(client, bucket, prefix=prefix, start_after=start_after, end=end, api=api,
+                                    page_size=page_size):
+        yield from entries
+
+
+def iter_versions(client, bucket, prefix=None, start_after=None, end=None, delete_markers=True, page_size=1000):
+    """
+    Yields the version dicts (Key, VersionId...) of the bucket, then its delete markers (no 'Size') page by page.
+    """
+    for entries in iter_entry_pages(client, bucket, versions=True, prefix=prefix, start_after=start_after, end=end,
+                                    delete_markers=delete_markers, page_size=page_size):
+        yield from entries
+
+
+def split_ranges(split_points):
+    """
+    [p1, p2, ..., pn] -> [(None, p1), (p1, p2), ..., (pn, None)], the key ranges (start_after, end]
+    cover every key once, whatever the split points are.
+    """
+    bounds = [None] + sorted(set(split_points)) + [None]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def discover_split_points(client, bucket, prefix=None, delimiter='/', max_pages=10, max_partitions=64):
+    """
+    Returns split points for a parallel enumeration: the common prefixes found in the first max_pages
+    pages of a delimiter listing, or prefix + [0-9A-Za-z] if there are less than two of them,
+    at most max_partitions - 1 of them, evenly picked.
+    """
+    points = []
+    for i, response in enumerate(iter_pages(client, bucket, api='v2', prefix=prefix, delimiter=delimiter)):
+        points.extend(p['Prefix'] for p in response.get('CommonPrefixes', []))
+        if i + 1 >= max_pages:
+            break
+
+    if len(points) < 2:
+        points = [(prefix or '') + c for c in DEFAULT_SPLIT_CHARS]
+
+    points = sorted(set(points))
+    step = max(1, -(-len(points) // max(max_partitions - 1, 1)))
+    return points[step - 1::step] if step > 1 else points
+
+
+_DONE = object()
+
+
+def iter_objects_parallel(client_factory, config, bucket, prefix=None, split_points=None, versions=False,
+                          delete_markers=True, concurrency=8, page_size=1000):
+    """
+    Yields every object (or version) of the bucket, the key space being split in ranges (see split_ranges)
+    walked by concurrency listers at once, entries are yielded as their pages arrive, not in key order.
+
+    @param split_points
+        defaults to discover_split_points() (4 ranges per lister), known prefixes of the bucket make a good split.
+    """
+    client = client_factory(config)
+    if split_points is None:
+        split_points = discover_split_points(client, bucket, prefix=prefix, max_partitions=concurrency * 4)
+    ranges = split_ranges(split_points)
+
+    pages = queue.Queue(maxsize=concurrency * 4)  # bounds the pages read ahead of the consumer
+    stop = threading.Event()
+
+    def _put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _walk(start_after, end):
+        try:
+            c = client_factory(config)
+            for entries in iter_entry_pages(c, bucket, versions=versions, prefix=prefix, start_after=start_after,
+                                            end=end, delete_markers=delete_markers, page_size=page_size):
+                if stop.is_set():
+                    return
+                _put(entries)
+        except Exception as e:
+            _put(e)
+        finally:
+            _put(_DONE)
+
+    _exec = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        for start_after, end in ranges:
+            _exec.submit(_walk, start_after, end)
+
+        done = 0
+        while done < len(ranges):
+            item = pages.get()
+            if item is _DONE:
+                done += 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield from item
+    finally:
+        stop.set()
+        _exec.shutdown(wait=True)
@@ -0,0 +1,515 @@
+
+import os
+import re
+import csv
+import json
+import math
+import time
+import queue
+import random
+import logging
+import itertools
+import threading
+import multiprocessing
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+KB = 1024
+MB = 1024 * KB
+GB = 1024 * MB
+
+
+def parse_size(size):
+    """
+    '4KB' -> 4096, '1GB' -> 1073741824, plain numbers are bytes.
+    """
+    m = re.fullmatch(r'\s*(\d+)\s*([KMG]?)B?\s*', str(size).upper())
+    if not m:
+        raise ValueError(f"Invalid size: {size!r}, e.g.: 4KB, 16MB, 1GB.")
+    return int(m.group(1)) * {'': 1, 'K': KB, 'M': MB, 'G': GB}[m.group(2)]
+
+
+def format_size(nbytes):
+    for unit, base in (('GB', GB), ('MB', MB), ('KB', KB)):
+        if nbytes >= base and nbytes % base == 0:
+            return f"{nbytes // base}{unit}"
+    return f"{nbytes}B"
+
+
+def gen_payload(size, seed=0, block_size=MB):
+    """
+    Returns size bytes of a (seeded) random block repeated, cheap to build even for large sizes:
+    the result is allocated once, no oversized intermediate (about 2x size at peak) is built and sliced.
+    """
+    block_size = min(block_size, size) or 1
+    block = random.Random(seed).getrandbits(8 * block_size).to_bytes(block_size, 'little')
+    count, rest = divmod(size, block_size)
+    return b''.join(itertools.chain(itertools.repeat(block, count), (block[:rest],)))
+
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an already sorted sequence, 0 if it is empty.
+    """
+    if not sorted_values:
+        return 0.0
+    n = len(sorted_values)
+    # rounded first, 99.9 * 1000 / 100.0 is not exactly 999 in floating point
+    rank = math.ceil(round(pct * n / 100.0, 9)) - 1
+    return sorted_values[max(0, min(n - 1, rank))]
+
+
+class LatencyRecorder(object):
+    """
+    Latency samples (seconds), bytes and errors per operation, plus the wall-clock window of the run.
+
+    A recorder is not thread safe, give each thread its own and merge() them, it is picklable,
+    so recorders of worker processes are merged the same way.
+    """
+
+    def __init__(self):
+        self.latencies = {}  # op: array of seconds
+        self.nbytes = {}
+        self.errors = {}
+        self.start_time = None
+        self.end_time = None
+
+    def begin(self):
+        self.start_time = time.time()
+
+    def finish(self):
+        self.end_time = time.time()
+
+    def record(self, op, latency, nbytes=0, ok=True):
+        if op not in self.latencies:
+            self.latencies[op] = array('d')
+            self.nbytes[op] = 0
+            self.errors[op] = 0
+
+        if ok:
+            self.latencies[op].append(latency)
+            self.nbytes[op] += nbytes
+        else:
+            self.errors[op] += 1
+
+    def merge(self, other):
+        for op, latencies in other.latencies.items():
+            if op not in self.latencies:
+                self.latencies[op] = array('d')
+                self.nbytes[op] = 0
+                self.errors[op] = 0
+            self.latencies[op].extend(latencies)
+            self.nbytes[op] += other.nbytes[op]
+            self.errors[op] += other.errors[op]
+
+        if other.start_time is not None:
+            self.start_time = other.start_time if self.start_time is None else min(self.start_time, other.start_time)
+        if other.end_time is not None:
+            self.end_time = other.end_time if self.end_time is None else max(self.end_time, other.end_time)
+        return self
+
+    @property
+    def seconds(self):
+        if self.start_time is None or self.end_time is None:
+            return 0.0
+        return self.end_time - self.start_time
+
+    def summary(self):
+        """
+        Returns {op: {count, errors, seconds, ops_per_sec, mb_per_sec, mean_ms, p50_ms ... max_ms}}.
+        """
+        result = {}
+        seconds = self.seconds
+        for op, latencies in self.latencies.items():
+            values = sorted(latencies)
+            result[op] = {
+                'count': len(values),
+                'errors': self.errors[op],
+                'seconds': round(seconds, 3),
+                'ops_per_sec': round(len(values) / seconds, 2) if seconds else 0.0,
+                'mb_per_sec': round(self.nbytes[op] / seconds / 1024 / 1024, 2) if seconds else 0.0,
+                'mean_ms': round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+                'p50_ms': round(percentile(values, 50) * 1000, 3),
+                'p90_ms': round(percentile(values, 90) * 1000, 3),
+                'p99_ms': round(percentile(values, 99) * 1000, 3),
+                'p999_ms': round(percentile(values, 99.9) * 1000, 3),
+                'max_ms': round(values[-1] * 1000, 3) if values else 0.0,
+            }
+        return result
+
+
+class SharedPayload(object):
+    """
+    Payload bytes in multiprocessing.shared_memory.
+
+    The parent creates (and finally unlinks) it, only its name is pickled, so worker processes
+    attach to the same pages instead of receiving a copy.
+
+    Usage:
+        payload = SharedPayload.create(64 * 1024 * 1024, seed=1)
+        ... payload.view(4096) is a memoryview of the first 4KB ...
+        payload.unlink()
+    """
+
+    def __init__(self, name, size, create=False):
+        # imported here, multiprocessing.shared_memory is only in python 3.8+.
+        from multiprocessing import shared_memory
+
+        self.name = name
+        self.size = size
+        self._owner = create
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            # the workers share the resource tracker of the parent, which unlinks it if the parent dies.
+            self.shm = shared_memory.SharedMemory(name=name)
+
+    @classmethod
+    def create(cls, size, seed=None, block_size=1024 * 1024):
+        """
+        Creates a payload of size bytes, filled with a (seeded) random block repeated.
+        """
+        payload = cls(None, size, create=True)
+        payload.name = payload.shm.name
+
+        block = random.Random(seed).getrandbits(8 * block_size).to_bytes(block_size, 'little')
+        buf = payload.shm.buf
+        for offset in range(0, size, block_size):
+            n = min(block_size, size - offset)
+            buf[offset:offset + n] = block[:n]
+        return payload
+
+    def __getstate__(self):
+        return {'name': self.name, 'size': self.size}
+
+    def __setstate__(self, state):
+        self.__init__(state['name'], state['size'])
+
+    def view(self, nbytes=None, offset=0):
+        """
+        Returns a memoryview of nbytes (defaults to the rest of the payload) from offset, nothing is copied.
+        """
+        end = self.size if nbytes is None else offset + nbytes
+        if end > self.size:
+            raise ValueError(f"The payload is {self.size} bytes, {end} bytes asked.")
+        return self.shm.buf[offset:end]
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        """
+        Frees the shared memory, called by the creator once the workers are done.
+        """
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def _picklable_config(config):
+    # S3CFG.bucket_counter is an itertools.count, it is not sent to the workers.
+    return type(config)({k: v for k, v in config.items() if k != 'bucket_counter'})
+
+
+def _unpack_result(result, name):
+    """
+    The (op name, bytes, ok) of what an operation returned: bytes (or None), (op name, bytes) or (op name, bytes, ok).
+    """
+    if not isinstance(result, tuple):
+        return name, result or 0, True
+    if len(result) == 2:
+        return result[0], result[1], True
+    return result
+
+
+def run_closed_loop(operation, client_factory, config, concurrency, ops=None, duration=None, name='op',
+                    worker_offset=0, pacing=None):
+    """
+    Runs operation in concurrency threads, each thread calls it again as soon as it returns,
+    until it was called ops times (per thread) or for duration seconds.
+
+    @param operation
+        operation(client, worker_id, seq), returns the number of bytes transferred (or None), (op name, bytes)
+        or (op name, bytes, ok) to be recorded as another op, exceptions are counted as errors of name.
+    @param client_factory
+        client_factory(config) is called once per thread, e.g.: get_client.
+    @param worker_offset
+        added to the thread index to make worker_id, so it is unique among processes.
+    @param pacing
+        pacing(worker_id, seq) is called (not timed) before each call, e.g.: to sleep until a time slot.
+    @return A LatencyRecorder of the run.
+    """
+    if ops is None and duration is None:
+        raise ValueError("ops or duration is required.")
+
+    clients = [client_factory(config) for _ in range(concurrency)]  # not timed
+    recorders = [LatencyRecorder() for _ in range(concurrency)]
+    deadline = None if duration is None else time.perf_counter() + duration
+
+    def _worker(index):
+        client, recorder = clients[index], recorders[index]
+        seq = 0
+        while (ops is None or seq < ops) and (deadline is None or time.perf_counter() < deadline):
+            if pacing is not None:
+                pacing(worker_offset + index, seq)
+            t0 = time.perf_counter()
+            try:
+                op, nbytes, ok = _unpack_result(operation(client, worker_offset + index, seq), name)
+            except Exception as e:
+                logger.debug(f"{name} failed: {e}")
+                op, nbytes, ok = name, 0, False
+            recorder.record(op, time.perf_counter() - t0, nbytes, ok)
+            seq += 1
+
+    recorder = LatencyRecorder()
+    recorder.begin()
+    threads = [threading.Thread(target=_worker, args=(i,)) for i in range(concurrency)]
+    for thr in threads:
+        thr.start()
+    for thr in threads:
+        thr.join()
+    recorder.finish()
+
+    for r in recorders:
+        recorder.merge(r)
+    return recorder
+
+
+# (operation, client_factory, pacing) of the running ProcessLoadGenerator, inherited by the forked workers.
+_FORKED_RUNS = {}
+
+
+def _run_forked_closed_loop(run_id, config, concurrency, ops=None, duration=None, name='op', worker_offset=0):
+    operation, client_factory, pacing = _FORKED_RUNS[run_id]
+    return run_closed_loop(operation, client_factory, config, concurrency, ops=ops, duration=duration, name=name,
+                           worker_offset=worker_offset, pacing=pacing)
+
+
+class ProcessLoadGenerator(object):
+    """
+    Runs a closed-loop workload in several processes, so signing, hashing and XML parsing are not bound
+    to the GIL of a single process.
+
+    Each process builds its own clients (one per thread), payloads are passed as SharedPayload,
+    the latency samples of every process are merged at the end, worker_id goes from 0 to processes * concurrency.
+
+    Usage:
+        payload = SharedPayload.create(4 * 1024 * 1024)
+        gen = ProcessLoadGenerator(config, get_client, processes=8, concurrency=16)
+        recorder = gen.run(functools.partial(put_op, bucket=bucket_name, payload=payload), duration=60, name='put')
+        payload.unlink()
+
+    Where fork is available (Linux), the workers are forked, so operation may be any callable (e.g.: a closure
+    of a benchmark), else operation and client_factory are pickled, they must be module level functions
+    (or partials of them).
+    """
+
+    def __init__(self, config, client_factory, processes=None, concurrency=4):
+        self.config = _picklable_config(config)
+        self.client_factory = client_factory
+        self.processes = processes or os.cpu_count()
+        self.concurrency = concurrency
+
+    def run(self, operation, ops=None, duration=None, name='op', pacing=None):
+        """
+        ops is per thread, see run_closed_loop, returns the merged LatencyRecorder.
+        """
+        recorder = LatencyRecorder()
+        run_id = id(operation)
+        if 'fork' in multiprocessing.get_all_start_methods():
+            _FORKED_RUNS[run_id] = (operation, self.client_factory, pacing)
+            mp_context, target = multiprocessing.get_context('fork'), _run_forked_closed_loop
+            args, kwargs = (run_id, self.config, self.concurrency), {}
+        else:
+            mp_context, target = None, run_closed_loop
+            args, kwargs = (operation, self.client_factory, self.config, self.concurrency), {'pacing': pacing}
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.processes, mp_context=mp_context) as _exec:
+                _futures_tasks = [
+                    _exec.submit(target, *args, ops=ops, duration=duration, name=name,
+                                 worker_offset=p * self.concurrency, **kwargs)
+                    for p in range(self.processes)
+                ]
+                for task in _futures_tasks:
+                    recorder.merge(task.result())
+        finally:
+            _FORKED_RUNS.pop(run_id, None)
+        return recorder
+
+
+def concurrency_steps(max_concurrency):
+    """
+    1, 2, 4, ... up to max_concurrency (included, even if it is not a power of 2).
+    """
+    steps = []
+    c = 1
+    while c < max_concurrency:
+        steps.append(c)
+        c *= 2
+    steps.append(max_concurrency)
+    return steps
+
+
+class ScalingCurve(object):
+    """
+    Throughput and latency of one operation at increasing concurrency, and the knee of the curve.
+
+    Usage:
+        curve = run_scaling_sweep(put_op, get_client, config, 64, ops=100, name='put')
+        curve.knee()  # {'concurrency': 16, 'ops_per_sec': ..., 'p99_ms': ...} or None
+        curve.write_csv('report/scaling_put.csv')
+    """
+
+    FIELDS = ['concurrency', 'count', 'errors', 'seconds', 'ops_per_sec', 'mb_per_sec', 'mean_ms', 'p50_ms',
+              'p90_ms', 'p99_ms', 'p999_ms', 'max_ms']
+
+    def __init__(self, name='op'):
+        self.name = name
+        self.points = []
+
+    def add(self, concurrency, recorder: LatencyRecorder):
+        point = {'concurrency': concurrency}
+        point.update(recorder.summary().get(self.name, {}))
+        self.points.append(point)
+        return point
+
+    def knee(self, min_gain=0.1):
+        """
+        Returns the point where throughput plateaus and latency starts climbing: the last point before
+        a step raising ops/s by less than min_gain (10%) while raising p99 by more than min_gain.
+        None if throughput still scales at the last step.
+        """
+        for point, after in zip(self.points, self.points[1:]):
+            if after['ops_per_sec'] < point['ops_per_sec'] * (1 + min_gain) and \
+                    after['p99_ms'] > point['p99_ms'] * (1 + min_gain):
+                return point
+        return None
+
+    def to_dict(self, min_gain=0.1):
+        return {'op': self.name, 'knee': self.knee(min_gain), 'points': self.points}
+
+    def write_json(self, path, min_gain=0.1):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(min_gain), f, indent=2)
+
+    def write_csv(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(self.points)
+
+
+def run_scaling_sweep(operation, client_factory, config, max_concurrency, ops=None, duration=None, name='op',
+                      steps=None):
+    """
+    Runs operation (see run_closed_loop) at each concurrency of steps (defaults to 1, 2, 4 ... max_concurrency),
+    returns the ScalingCurve.
+    """
+    curve = ScalingCurve(name)
+    for concurrency in steps or concurrency_steps(max_concurrency):
+        recorder = run_closed_loop(operation, client_factory, config, concurrency, ops=ops, duration=duration,
+                                   name=name)
+        point = curve.add(concurrency, recorder)
+        logger.info(f"scaling {name} c{concurrency}: {point.get('ops_per_sec')} ops/s, p99 {point.get('p99_ms')} ms")
+    return curve
+
+
+def arrival_times(rate, arrival='fixed', duration=None, ops=None, seed=None):
+    """
+    Yields the intended send times (seconds from the start) of an open loop at rate requests/s,
+    'fixed' every 1 / rate, or 'poisson' (exponential gaps of mean 1 / rate), for duration seconds or ops requests.
+    """
+    if arrival not in ('fixed', 'poisson'):
+        raise ValueError(f"Unknown arrival: {arrival}, fixed or poisson.")
+    if ops is None and duration is None:
+        raise ValueError("ops or duration is required.")
+    rng = random.Random(seed)
+    t = 0.0
+    for i in itertools.count():
+        if ops is not None and i >= ops:
+            return
+        t = i / rate if arrival == 'fixed' else t + rng.expovariate(rate)
+        if duration is not None and t >= duration:
+            return
+        yield t
+
+
+def run_open_loop(operation, client_factory, config, rate, duration=None, ops=None, arrival='fixed', workers=64,
+                  name='op', slack=0.001, seed=None):
+    """
+    Sends requests at rate requests/s whatever their completions (an open loop), each request is run by
+    one of workers threads (a client each), requests wait in a queue while all the workers are busy.
+
+    Latencies are measured from the intended send time, so the time spent waiting for a worker is counted
+    (corrected for coordinated omission), the service time alone is recorded as '<name>_service'.
+
+    @param operation
+        operation(client, worker_id, seq), returns the bytes transferred, (op name, bytes) or (op name, bytes, ok).
+    @param slack
+        a request starting more than slack seconds after its intended time missed its slot.
+    @return (recorder, schedule), schedule counts the scheduled requests, the ones which missed their slot
+            and the start delays (ms).
+    """
+    clients = [client_factory(config) for _ in range(workers)]  # not timed
+    recorders = [LatencyRecorder() for _ in range(workers)]
+    delays = [array('d') for _ in range(workers)]
+    requests = queue.Queue()
+
+    def _worker(index):
+        client, recorder = clients[index], recorders[index]
+        while True:
+            item = requests.get()
+            if item is None:
+                return
+            seq, intended = item
+            t0 = time.perf_counter()
+            delays[index].append(t0 - intended)
+            try:
+                op, nbytes, ok = _unpack_result(operation(client, index, seq), name)
+            except Exception as e:
+                logger.debug(f"{name} failed: {e}")
+                op, nbytes, ok = name, 0, False
+            t1 = time.perf_counter()
+            recorder.record(op, t1 - intended, nbytes, ok)
+            if ok:
+                recorder.record(f'{op}_service', t1 - t0, nbytes)
+
+    recorder = LatencyRecorder()
+    threads = [threading.Thread(target=_worker, args=(i,)) for i in range(workers)]
+    for thr in threads:
+        thr.start()
+
+    recorder.begin()
+    start = time.perf_counter()
+    scheduled = 0
+    for seq, offset in enumerate(arrival_times(rate, arrival, duration=duration, ops=ops, seed=seed)):
+        intended = start + offset
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        requests.put((seq, intended))
+        scheduled += 1
+    for _ in threads:
+        requests.put(None)
+    for thr in threads:
+        thr.join()
+    recorder.finish()
+
+    for r in recorders:
+        recorder.merge(r)
+    start_delays = sorted(d for values in delays for d in values)
+    schedule = {
+        'rate': rate,
+        'arrival': arrival,
+        'scheduled': scheduled,
+        'missed': sum(1 for d in start_delays if d > slack),
+        'start_delay_p50_ms': round(percentile(start_delays, 50) * 1000, 3),
+        'start_delay_p99_ms': round(percentile(start_delays, 99) * 1000, 3),
+        'start_delay_max_ms': round(start_delays[-1] * 1000, 3) if start_delays else 0.0,
+    }
+    return recorder, schedule
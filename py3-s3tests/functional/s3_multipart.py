@@ -0,0 +1,243 @@
+
+import time
+import queue
+import logging
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+from s3tests.functional.s3_loadgen import LatencyRecorder
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def iter_parts(source, part_size):
+    """
+    Yields the parts of source, one at a time:
+        bytes-like (bytes, bytearray, memoryview, mmap): slices of part_size (bytes);
+        file-like: read(part_size) until it is exhausted;
+        any other iterable: each item is one part (str items are utf-8 encoded by boto3).
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)) or hasattr(source, 'madvise'):  # mmap
+        with memoryview(source) as view:
+            view = view.cast('B')
+            for offset in range(0, len(view), part_size):
+                yield bytes(view[offset:offset + part_size])
+            view.release()
+    elif hasattr(source, 'read'):
+        for data in iter(lambda: source.read(part_size), b''):
+            if not data:  # text mode
+                break
+            yield data
+    else:
+        for data in source:
+            yield data
+
+
+class _ParallelMultipartBase(object):
+    """
+    Clients, latency recording, create/complete/abort of the parallel multipart engines.
+
+    Concurrent requests use their own client (client_factory(config)), because the connection pool of
+    a boto3 client is as small as 10 connections, the clients are kept for the next uploads/copies.
+    """
+
+    def __init__(self, client_factory, config, part_size=8 * MB, concurrency=4, recorder: LatencyRecorder = None):
+        self.client_factory = client_factory
+        self.config = config
+        self.part_size = part_size
+        self.concurrency = concurrency
+        self.recorder = recorder or LatencyRecorder()
+
+        self.client = client_factory(config)
+        self._clients = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _borrow_client(self):
+        try:
+            client = self._clients.get_nowait()
+        except queue.Empty:
+            client = self.client_factory(self.config)
+        try:
+            yield client
+        finally:
+            self._clients.put(client)
+
+    def _record(self, op, latency, nbytes):
+        with self._lock:
+            self.recorder.record(op, latency, nbytes)
+
+    def create(self, bucket, key, **create_args):
+        """
+        create_args are passed to create_multipart_upload, e.g.: Metadata, ContentType, SSECustomerKey.
+        """
+        t0 = time.perf_counter()
+        response = self.client.create_multipart_upload(Bucket=bucket, Key=key, **create_args)
+        self._record('create_multipart_upload', time.perf_counter() - t0, 0)
+        return response['UploadId']
+
+    def complete(self, bucket, key, upload_id, parts):
+        t0 = time.perf_counter()
+        response = self.client.complete_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id,
+                                                         MultipartUpload={'Parts': parts})
+        self._record('complete_multipart_upload', time.perf_counter() - t0, 0)
+        return response
+
+    def abort(self, bucket, key, upload_id):
+        self.client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+
+
+class ParallelMultipartUploader(_ParallelMultipartBase):
+    """
+    Uploads the parts of a multipart upload concurrently.
+
+    Parts are read from the source only when there is room for them: at most max_in_flight_bytes
+    (at least one part) are held in memory, whatever the object size. ETags are returned in part order.
+
+    Usage:
+        uploader = ParallelMultipartUploader(get_client, config, part_size=16 * MB, concurrency=8)
+        upload_id, parts = uploader.upload(bucket_name, key, open(path, 'rb'))
+        uploader.complete(bucket_name, key, upload_id, parts)
+    """
+
+    def __init__(self, client_factory, config, part_size=8 * MB, concurrency=4, max_in_flight_bytes=512 * MB,
+                 recorder: LatencyRecorder = None):
+        super().__init__(client_factory, config, part_size=part_size, concurrency=concurrency, recorder=recorder)
+        # parts waiting to be sent count too, so a full pool never reads ahead more than this.
+        self.max_in_flight = max(1, min(concurrency * 2, max_in_flight_bytes // max(part_size, 1)))
+
+    def upload_part(self, bucket, key, upload_id, part_num, data, resend=False, **part_args):
+        with self._borrow_client() as client:
+            t0 = time.perf_counter()
+            response = client.upload_part(UploadId=upload_id, Bucket=bucket, Key=key, PartNumber=part_num,
+                                          Body=data, **part_args)
+            self._record('upload_part', time.perf_counter() - t0, len(data))
+            if resend:
+                client.upload_part(UploadId=upload_id, Bucket=bucket, Key=key, PartNumber=part_num, Body=data,
+                                   **part_args)
+        return {'ETag': response['ETag'].strip('"'), 'PartNumber': part_num}
+
+    def upload_parts(self, bucket, key, upload_id, source, resend_parts=(), part_args=None):
+        """
+        Uploads the parts of source (see iter_parts) to upload_id, returns the parts list, in order.
+
+        @param resend_parts
+            indexes (from 0) of the parts uploaded twice, as TestBaseClass.multipart_upload does.
+        @param part_args
+            passed to every upload_part, e.g.: the SSECustomer* arguments.
+        """
+        part_args = part_args or {}
+        slots = threading.BoundedSemaphore(self.max_in_flight)
+        failed = threading.Event()
+        futures = []
+
+        def _release(_):
+            slots.release()
+
+        def _upload(part_num, data, resend):
+            try:
+                return self.upload_part(bucket, key, upload_id, part_num, data, resend=resend, **part_args)
+            except Exception:
+                failed.set()
+                raise
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as _exec, \
+                contextlib.closing(iter_parts(source, self.part_size)) as parts:
+            part_num = 0
+            while True:
+                # a slot is taken before the part is read, so at most max_in_flight parts are in memory.
+                slots.acquire()  # blocks until a part in flight is done
+                data = None if failed.is_set() else next(parts, None)
+                if data is None:
+                    slots.release()
+                    break
+                part_num += 1
+                task = _exec.submit(_upload, part_num, data, part_num - 1 in resend_parts)
+                task.add_done_callback(_release)
+                futures.append(task)
+                del data
+
+        return [task.result() for task in futures]  # raises the first error
+
+    def upload(self, bucket, key, source, resend_parts=(), part_args=None, complete=False, **create_args):
+        """
+        Creates the upload and uploads the parts of source, the upload is aborted if a part fails.
+
+        @return (upload_id, parts), completed first if complete is set.
+        """
+        upload_id = self.create(bucket, key, **create_args)
+        try:
+            parts = self.upload_parts(bucket, key, upload_id, source, resend_parts=resend_parts, part_args=part_args)
+        except Exception:
+            logger.warning(f"upload {upload_id} of {bucket}/{key} failed, aborting it.")
+            self.abort(bucket, key, upload_id)
+            raise
+
+        if complete:
+            self.complete(bucket, key, upload_id, parts)
+        return upload_id, parts
+
+
+class ParallelMultipartCopier(_ParallelMultipartBase):
+    """
+    Server-side copy of an object (or a version of it) with concurrent upload_part_copy calls,
+    one per range of part_size.
+
+    Usage:
+        copier = ParallelMultipartCopier(get_client, config, part_size=64 * MB, concurrency=8)
+        copier.copy(src_bucket_name, src_key, dest_bucket_name, dest_key, complete=True)
+    """
+
+    def upload_part_copy(self, bucket, key, upload_id, part_num, copy_source, start, end, **part_args):
+        with self._borrow_client() as client:
+            t0 = time.perf_counter()
+            response = client.upload_part_copy(
+                Bucket=bucket, Key=key, CopySource=copy_source, PartNumber=part_num, UploadId=upload_id,
+                CopySourceRange=f'bytes={start}-{end}', **part_args)
+        self._record('upload_part_copy', time.perf_counter() - t0, end - start + 1)
+        return {'ETag': response['CopyPartResult']['ETag'], 'PartNumber': part_num}
+
+    def copy_parts(self, src_bucket, src_key, bucket, key, upload_id, size, version_id=None, part_args=None):
+        """
+        Copies the first size bytes of the source to upload_id, returns the parts list, in order.
+        """
+        copy_source = {'Bucket': src_bucket, 'Key': src_key}
+        if version_id is not None:
+            copy_source['VersionId'] = version_id
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as _exec:
+            _futures_tasks = [
+                _exec.submit(self.upload_part_copy, bucket, key, upload_id, i + 1, copy_source,
+                             start, min(start + self.part_size, size) - 1, **(part_args or {}))
+                for i, start in enumerate(range(0, size, self.part_size))
+            ]
+            return [task.result() for task in _futures_tasks]  # raises the first error
+
+    def copy(self, src_bucket, src_key, bucket, key, size=None, version_id=None, part_args=None, complete=False,
+             **create_args):
+        """
+        Creates the upload and copies the source to it, the upload is aborted if a part fails.
+
+        @param size
+            bytes to copy from the start of the source, defaults to its size.
+        @return (upload_id, parts), completed first if complete is set.
+        """
+        if size is None:
+            head_args = {} if version_id is None else {'VersionId': version_id}
+            size = self.client.head_object(Bucket=src_bucket, Key=src_key, **head_args)['ContentLength']
+
+        upload_id = self.create(bucket, key, **create_args)
+        try:
+            parts = self.copy_parts(src_bucket, src_key, bucket, key, upload_id, size, version_id=version_id,
+                                    part_args=part_args)
+        except Exception:
+            logger.warning(f"copy {upload_id} of {src_bucket}/{src_key} to {bucket}/{key} failed, aborting it.")
+            self.abort(bucket, key, upload_id)
+            raise
+
+        if complete:
+            self.complete(bucket, key, upload_id, parts)
+        return upload_id, parts
@@ -0,0 +1,166 @@
+
+import time
+import queue
+import random
+import functools
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+from s3tests.functional.s3_loadgen import LatencyRecorder
+
+ALIGNMENTS = ('aligned', 'unaligned')
+
+
+@functools.lru_cache(maxsize=256)
+def _seeded_block(seed, index, block_size):
+    return random.Random(f"{seed}-{index}").getrandbits(8 * block_size).to_bytes(block_size, 'little')
+
+
+class SeededContent(object):
+    """
+    The expected content of an object of size bytes, made of seeded random blocks which all differ,
+    so any slice of it is computed on its own (a misplaced range does not match) without holding the object.
+
+    Usage:
+        content = SeededContent(256 * MB, seed=1)
+        uploader.upload(bucket_name, key, content.iter_chunks(16 * MB), complete=True)
+        assert body == content.slice(start, end)
+    """
+
+    def __init__(self, size, seed=0, block_size=64 * 1024):
+        self.size = size
+        self.seed = seed
+        self.block_size = block_size
+
+    def slice(self, start, end):
+        """
+        Bytes start-end (included, as a Range header), end is cut to the size.
+        """
+        end = min(end, self.size - 1)
+        chunks = []
+        for index in range(start // self.block_size, end // self.block_size + 1):
+            block = _seeded_block(self.seed, index, self.block_size)
+            offset = index * self.block_size
+            chunks.append(block[max(start - offset, 0):end - offset + 1])
+        return b''.join(chunks)
+
+    def iter_chunks(self, chunk_size):
+        for start in range(0, self.size, chunk_size):
+            yield self.slice(start, start + chunk_size - 1)
+
+    def data(self):
+        return self.slice(0, self.size - 1) if self.size else b''
+
+
+def plan_ranges(size, range_size, alignment='aligned', count=None, seed=0):
+    """
+    Returns [(start, end), ...] ranges of at most range_size bytes of an object of size bytes.
+
+    @param alignment
+        'aligned': starts are multiples of range_size;
+        'unaligned': starts are off any 4KB boundary.
+    @param count
+        None walks the whole object (unaligned: a short first range, then range_size steps from an odd offset),
+        else count ranges at random starts.
+    """
+    if alignment not in ALIGNMENTS:
+        raise ValueError(f"Unknown alignment: {alignment}, one of {ALIGNMENTS}.")
+    rng = random.Random(seed)
+
+    if count is None:
+        if alignment == 'aligned' or size <= 1:
+            offset = 0
+        elif min(range_size, size) <= 1:
+            offset = 1  # 1 byte ranges, only the second one starts off 0.
+        else:
+            offset = rng.randrange(1, min(range_size, size)) | 1
+        ranges = [(0, offset - 1)] if offset else []
+        return ranges + [(start, min(start + range_size, size) - 1) for start in range(offset, size, range_size)]
+
+    ranges = []
+    for _ in range(count):
+        if alignment == 'aligned':
+            start = rng.randrange(-(-size // range_size)) * range_size
+        else:
+            start = rng.randrange(size) | 1  # odd, so never on a 4KB boundary
+            start = min(start, size - 1)
+        ranges.append((start, min(start + range_size, size) - 1))
+    return ranges
+
+
+class RangeReader(object):
+    """
+    Concurrent ranged GETs of an object, each slice checked against a SeededContent.
+
+    Concurrent requests use their own client (client_factory(config)), kept for the next reads.
+
+    Usage:
+        reader = RangeReader(get_client, config, concurrency=16)
+        mismatches = reader.verify(bucket_name, key, content, 1024 * 1024)
+        assert not mismatches
+    """
+
+    def __init__(self, client_factory, config, concurrency=8, recorder: LatencyRecorder = None):
+        self.client_factory = client_factory
+        self.config = config
+        self.concurrency = concurrency
+        self.recorder = recorder or LatencyRecorder()
+        self._clients = queue.LifoQueue()
+
+    @contextlib.contextmanager
+    def _borrow_client(self):
+        try:
+            client = self._clients.get_nowait()
+        except queue.Empty:
+            client = self.client_factory(self.config)
+        try:
+            yield client
+        finally:
+            self._clients.put(client)
+
+    def get_range(self, bucket, key, start, end, **get_args):
+        """
+        Returns the body of bytes start-end, get_args are passed to get_object, e.g.: the SSECustomer* arguments.
+        """
+        with self._borrow_client() as client:
+            t0 = time.perf_counter()
+            response = client.get_object(Bucket=bucket, Key=key, Range=f'bytes={start}-{end}', **get_args)
+            body = response['Body'].read()
+            latency = time.perf_counter() - t0
+        return body, latency
+
+    def read_ranges(self, bucket, key, ranges, content: SeededContent = None, get_args=None):
+        """
+        Reads ranges (see plan_ranges) concurrency at a time, the latency of each goes to recorder ('get_range').
+
+        @return the mismatches [(start, end, reason), ...], empty if every slice is content's (or content is None).
+        """
+        get_args = get_args or {}
+
+        def _read(r):
+            start, end = r
+            body, latency = self.get_range(bucket, key, start, end, **get_args)
+            if content is None:
+                return latency, len(body), None
+            expected = content.slice(start, end)
+            if len(body) != len(expected):
+                return latency, len(body), f"{len(body)} bytes read, {len(expected)} expected"
+            if body != expected:
+                return latency, len(body), "content differs"
+            return latency, len(body), None
+
+        mismatches = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as _exec:
+            # results come in order, recorder is only used by this thread.
+            for (start, end), (latency, nbytes, reason) in zip(ranges, _exec.map(_read, ranges)):
+                self.recorder.record('get_range', latency, nbytes)
+                if reason:
+                    mismatches.append((start, end, reason))
+        return mismatches
+
+    def verify(self, bucket, key, content: SeededContent, range_size, alignment='aligned', get_args=None):
+        """
+        Reads the whole object by ranges of range_size and checks it against content, returns the mismatches.
+        """
+        ranges = plan_ranges(content.size, range_size, alignment=alignment)
+        return self.read_ranges(bucket, key, ranges, content=content, get_args=get_args)
@@ -0,0 +1,442 @@
+
+import io
+import os
+import ssl
+import mmap
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+from urllib.parse import quote, urlparse
+
+import urllib3
+
+from s3tests.functional.s3_sigv4 import AWS4Signer, AWS4SignerBase, AWS4SignerForChunkedUpload
+
+
+class _TLSSessionReuseContext(ssl.SSLContext):
+    """
+    SSLContext which resumes the last TLS session on new connections, so the full handshake is done once.
+    """
+    tls_session = None
+
+    def wrap_socket(self, *args, **kwargs):
+        if self.tls_session is not None:
+            kwargs.setdefault('session', self.tls_session)
+        sock = super().wrap_socket(*args, **kwargs)
+        self.tls_session = sock.session
+        return sock
+
+
+def _body_length(body):
+    """
+    Returns the number of bytes left in body, None if it is unknown (e.g.: generators).
+    str bodies must be encoded first, see S3RawEngine.request.
+    """
+    if body is None:
+        return 0
+    if isinstance(body, memoryview):
+        return body.nbytes
+    if isinstance(body, (list, tuple)):  # pieces of bytes
+        return sum(piece.nbytes if isinstance(piece, memoryview) else len(piece) for piece in body)
+    if hasattr(body, '__len__'):
+        return len(body)
+    if hasattr(body, 'getbuffer'):  # io.BytesIO
+        return body.getbuffer().nbytes - body.tell()
+    if hasattr(body, 'fileno'):
+        try:
+            return os.fstat(body.fileno()).st_size - body.tell()
+        except (OSError, io.UnsupportedOperation):
+            return None
+    return None
+
+
+class FileBody(object):
+    """
+    length bytes of a file from offset, sent to the socket without copying them into python objects:
+    with os.sendfile over http, with memoryview slices of a mmap of the file over https.
+
+    file is a path or a binary file object, its position is not used, it is restored after a send.
+    """
+
+    def __init__(self, file, offset=0, length=None):
+        self._own_file = isinstance(file, (str, bytes, os.PathLike))
+        self.file = open(file, 'rb') if self._own_file else file
+        self.offset = offset
+        size = os.fstat(self.file.fileno()).st_size
+        self.length = size - offset if length is None else min(length, size - offset)
+
+    def __len__(self):
+        return self.length
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._own_file:
+            self.file.close()
+
+    def send(self, sock, block_size):
+        if not self.length:
+            return
+
+        if not isinstance(sock, ssl.SSLSocket):
+            # os.sendfile, honours the socket timeout, it moves the file position to the last byte sent.
+            position = self.file.tell()
+            try:
+                sock.sendfile(self.file, self.offset, self.length)
+            finally:
+                self.file.seek(position)
+            return
+
+        # mmap offsets must be aligned.
+        start = self.offset - self.offset % mmap.ALLOCATIONGRANULARITY
+        with mmap.mmap(self.file.fileno(), self.length + self.offset - start, offset=start,
+                       access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                _send_view(sock, view[self.offset - start:], block_size)
+
+
+def _send_view(sock, view, block_size):
+    for i in range(0, len(view), block_size):
+        sock.sendall(view[i:i + block_size])
+
+
+
+class RawResponse(object):
+    """
+    status, headers and a lazy body of a raw request.
+
+    Nothing is read until asked for, the connection goes back to the pool once the body is
+    fully read or the response is closed (use it as a context manager).
+    """
+
+    def __init__(self, response, release=None):
+        self._response = response
+        self._release = release or response.release_conn
+        self._content = None
+
+        self.status = response.status
+        self.headers = response.headers  # case-insensitive
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def read(self, amt=None):
+        return self._response.read(amt)
+
+    def readinto(self, buf):
+        # urllib3 1.26 fills buf through read(), one copy per call, but no whole-body bytes object is built.
+        return self._response.readinto(buf)
+
+    def read_all_into(self, buf):
+        """
+        Reads the whole body into buf (bytearray, mmap, memoryview...), returns the number of bytes read,
+        raises ValueError if the body does not fit in buf (checked by reading one more byte if there is
+        no Content-Length), RuntimeError if the body ends before its Content-Length.
+        """
+        with memoryview(buf) as view:
+            view = view.cast('B')
+            length = self.headers.get('Content-Length')
+            if length is not None and int(length) > len(view):
+                raise ValueError(f"The body is {length} bytes, the buffer is only {len(view)} bytes.")
+
+            size = len(view)
+            total = 0
+            while total < size:
+                n = self.readinto(view[total:])
+                if not n:
+                    break
+                total += n
+            view.release()
+
+        if length is not None and total < int(length):
+            self.close()
+            raise RuntimeError(f"The body ended after {total} of {length} bytes.")
+        if length is None and total == size and self._response.read(1):  # a chunked body may go on
+            self.close()
+            raise ValueError(f"The body is larger than the buffer ({total} bytes).")
+
+        self.close()
+        return total
+
+    def stream(self, chunk_size=1024 * 1024):
+        """
+        Yields the body in pieces of at most chunk_size bytes.
+        """
+        for data in iter(lambda: self._response.read(chunk_size), b''):
+            yield data
+        self.close()
+
+    @property
+    def content(self):
+        """
+        The whole body, read once.
+        """
+        if self._content is None:
+            self._content = self._response.read()
+            self.close()
+        return self._content
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def close(self):
+        """
+        Drains what is left of the body, so the connection can be reused, and releases the connection.
+        """
+        if self._release is None:
+            return
+
+        try:
+            for _ in iter(lambda: self._response.read(1024 * 1024), b''):
+                pass
+        except Exception:  # noqa, the connection is broken, it is dropped by the pool.
+            pass
+        self._release()
+        self._release = None
+
+
+class S3RawEngine(object):
+    """
+    Protocol level S3 requests, signed by s3_sigv4.AWS4Signer and sent over a pool of keep-alive
+    connections to one endpoint.
+
+    Bodies are streamed both ways: a request body can be bytes, str (sent utf-8 encoded), a file-like object,
+    a s3_sigv4.ChunkedUploadBody or an iterable of bytes (a list or tuple is sent with its total Content-Length,
+    other iterables with Transfer-Encoding: chunked), the response body is read lazily.
+
+    Usage:
+        engine = S3RawEngine.from_config(config)
+        engine.put_object(bucket, 'foo', b'bar')
+        with engine.get_object(bucket, 'foo') as res:
+            for data in res.stream():
+                ...
+    """
+
+    def __init__(self, endpoint_url, aws_access_key, aws_secret_key, region_name='us-east-1',
+                 verify=True, pool_maxsize=10, timeout=60, tls_session_reuse=False):
+        self.endpoint_url = endpoint_url.rstrip('/')
+        self.signer = AWS4Signer(aws_access_key, aws_secret_key, region_name=region_name)
+
+        conn_kw = {}
+        if urlparse(self.endpoint_url).scheme == 'https':
+            conn_kw['cert_reqs'] = 'CERT_REQUIRED' if verify else 'CERT_NONE'
+            if tls_session_reuse:
+                ctx = _TLSSessionReuseContext(ssl.PROTOCOL_TLS_CLIENT)
+                if verify:
+                    ctx.load_default_certs()
+                else:
+                    ctx.check_hostname = False
+                    ctx.verify_mode = ssl.CERT_NONE
+                conn_kw['ssl_context'] = ctx
+
+        # block: never open more than pool_maxsize connections, wait for a free one instead.
+        self.pool = urllib3.connection_from_url(
+            self.endpoint_url, maxsize=pool_maxsize, block=True, timeout=timeout, retries=False, **conn_kw)
+
+    @classmethod
+    def from_config(cls, config, alt=False, **kwargs):
+        """
+        Returns the engine of the main (or alt) user of S3CFG.
+        """
+        return cls(
+            config.default_endpoint,
+            config.alt_access_key if alt else config.main_access_key,
+            config.alt_secret_key if alt else config.main_secret_key,
+            verify=config.default_ssl_verify,
+            **kwargs
+        )
+
+    def close(self):
+        self.pool.close()
+
+    def _get_conn(self):
+        """
+        Borrows a connection of the pool, for the requests sent by hand (send_zero_copy).
+
+        urllib3 has no public API for it, this relies on HTTPConnectionPool._get_conn/_put_conn and
+        HTTPConnection.putrequest(skip_host=...) of urllib3 1.26 (pinned in requirements.txt, <2 in setup.py).
+        """
+        if not hasattr(self.pool, '_get_conn') or not urllib3.__version__.startswith('1.'):
+            raise RuntimeError(f"send_zero_copy needs urllib3 1.x, {urllib3.__version__} is installed.")
+        return self.pool._get_conn()
+
+    def _put_conn(self, conn):
+        """
+        Gives a connection of _get_conn back to the pool (a closed one is replaced on the next use).
+        """
+        self.pool._put_conn(conn)
+
+    @staticmethod
+    def get_path(bucket=None, key=None, query: Dict = None):
+        """
+        Returns the encoded (path-style) path of bucket/key, query values of None are sent without '='.
+        """
+        path = '/'
+        if bucket:
+            path += bucket
+            if key is not None:
+                path += '/' + key
+        path = quote(path, safe='/~')
+
+        if query:
+            path += '?' + '&'.join(
+                quote(k, safe='-_.~') if v is None else f"{quote(k, safe='-_.~')}={quote(str(v), safe='-_.~')}"
+                for k, v in query.items()
+            )
+        return path
+
+    def request(self, http_method, bucket=None, key=None, query: Dict = None, headers: Dict = None, body=None,
+                payload_hash=None, unsigned_payload=False):
+        """
+        Signs and sends one request, returns a RawResponse.
+        Requests whose headers hold an 'Authorization' already (e.g.: chunked uploads) are not signed again.
+
+        The payload is hashed for the signature unless payload_hash is given or unsigned_payload is set,
+        iterators can not be hashed without being consumed, so they are always sent as UNSIGNED-PAYLOAD
+        if no payload_hash is given.
+        """
+        path = self.get_path(bucket, key, query)
+        headers = dict(headers or {})
+
+        # encoded once for both the Content-Length and the body, http.client would send str as latin-1
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        elif isinstance(body, (list, tuple)):
+            body = [piece.encode('utf-8') if isinstance(piece, str) else piece for piece in body]
+
+        if body is not None and not hasattr(body, 'read') and iter(body) is body:
+            unsigned_payload = True  # a generator
+
+        length = _body_length(body)
+        if body is not None and length is not None and 'content-length' not in (k.lower() for k in headers):
+            headers['Content-Length'] = str(length)
+
+        if 'authorization' not in (k.lower() for k in headers):
+            headers = self.signer.sign_request(http_method, self.endpoint_url + path, headers, payload=body,
+                                               unsigned_payload=unsigned_payload, payload_hash=payload_hash)
+
+        response = self.pool.urlopen(http_method, path, body=body, headers=headers, chunked=length is None,
+                                     preload_content=False, decode_content=False, redirect=False)
+        return RawResponse(response)
+
+    def send_zero_copy(self, http_method, bucket, key, body, query: Dict = None, headers: Dict = None,
+                       payload_hash=None, unsigned_payload=True, block_size=1024 * 1024):
+        """
+        Sends a FileBody or a bytes-like body (mmap, memoryview, bytearray) straight to the socket,
+        see FileBody, bytes-like bodies are sent as memoryview slices of block_size.
+
+        The payload is UNSIGNED-PAYLOAD by default, hashing it means reading it once, pass payload_hash
+        if it is known already, or unsigned_payload=False to hash it.
+        """
+        path = self.get_path(bucket, key, query)
+        headers = dict(headers or {})
+        headers['Content-Length'] = str(len(body))
+
+        if not unsigned_payload and payload_hash is None:
+            if not len(body):
+                payload_hash = AWS4SignerBase.EMPTY_BODY_SHA256  # an empty file can not be mmap-ed.
+            elif isinstance(body, FileBody):
+                with mmap.mmap(body.file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as view:
+                        payload_hash = AWS4SignerBase.get_body_hash(view[body.offset:body.offset + body.length])
+            else:
+                payload_hash = AWS4SignerBase.get_body_hash(body)
+        headers = self.signer.sign_request(http_method, self.endpoint_url + path, headers,
+                                           unsigned_payload=unsigned_payload, payload_hash=payload_hash)
+
+        # the request is sent by hand, on a connection borrowed from the pool.
+        conn = self._get_conn()
+        try:
+            conn.timeout = self.pool.timeout.connect_timeout
+            conn.putrequest(http_method, path, skip_host=True, skip_accept_encoding=True)
+            for k, v in headers.items():
+                conn.putheader(k, v)
+            conn.endheaders()  # connects if needed
+
+            conn.sock.settimeout(self.pool.timeout.read_timeout)
+            if isinstance(body, FileBody):
+                body.send(conn.sock, block_size)
+            else:
+                with memoryview(body) as view:
+                    _send_view(conn.sock, view.cast('B'), block_size)
+
+            response = conn.getresponse()
+        except Exception:
+            conn.close()
+            self._put_conn(conn)
+            raise
+
+        return RawResponse(response, release=lambda: self._put_conn(conn))
+
+    def put_file(self, bucket, key, file, offset=0, length=None, headers: Dict = None, **kwargs):
+        """
+        Uploads length bytes of file (a path or a binary file object) from offset, see send_zero_copy.
+        """
+        with FileBody(file, offset=offset, length=length) as body:
+            return self.send_zero_copy('PUT', bucket, key, body, headers=headers, **kwargs)
+
+    def put_object(self, bucket, key, body, headers: Dict = None, **kwargs):
+        return self.request('PUT', bucket, key, headers=headers, body=body, **kwargs)
+
+    def put_object_chunked(self, bucket, key, source, length, chunk_size=AWS4SignerForChunkedUpload.DEFAULT_CHUNK_SIZE,
+                           headers: Dict = None):
+        """
+        Uploads length bytes of source as an aws-chunked body, see s3_sigv4.ChunkedUploadBody for the sources.
+        """
+        signer = AWS4SignerForChunkedUpload(self.endpoint_url + self.get_path(bucket, key), 'PUT',
+                                            self.signer.service_name, self.signer.region_name)
+        headers = signer.compute_signature_headers(dict(headers or {}), length, self.signer.aws_access_key,
+                                                   self.signer.aws_secret_key, chunk_size=chunk_size)
+        return self.request('PUT', bucket, key, headers=headers, body=signer.chunked_body(source))
+
+    def get_object(self, bucket, key, byte_range=None, headers: Dict = None, **kwargs):
+        headers = dict(headers or {})
+        if byte_range is not None:
+            headers['Range'] = 'bytes={}-{}'.format(*byte_range)
+        return self.request('GET', bucket, key, headers=headers, **kwargs)
+
+    def get_object_into(self, bucket, key, buf, byte_range=None, headers: Dict = None, **kwargs):
+        """
+        Reads the object (or byte_range of it) into buf (bytearray, mmap, memoryview...) with readinto,
+        no bytes object of the whole body is built, returns the number of bytes read.
+        """
+        with self.get_object(bucket, key, byte_range=byte_range, headers=headers, **kwargs) as res:
+            if res.status not in (200, 206):
+                raise RuntimeError(f"GET {bucket}/{key} failed, status: {res.status}, {res.content[:1024]}")
+            return res.read_all_into(buf)
+
+    def get_object_ranges_into(self, bucket, key, buf, size=None, range_size=8 * 1024 * 1024, concurrency=4,
+                               headers: Dict = None, **kwargs):
+        """
+        Reads the first size bytes (defaults to the buffer size) of the object into buf with concurrent
+        ranged GETs of range_size, each range lands in place in its slice of buf.
+
+        @return The number of bytes read.
+        """
+        with memoryview(buf) as view:
+            view = view.cast('B')
+            size = len(view) if size is None else size
+
+            with ThreadPoolExecutor(max_workers=concurrency) as _exec:
+                _futures_tasks = [
+                    _exec.submit(self.get_object_into, bucket, key, view[start:min(start + range_size, size)],
+                                 byte_range=(start, min(start + range_size, size) - 1), headers=headers, **kwargs)
+                    for start in range(0, size, range_size)
+                ]
+                total = sum(task.result() for task in _futures_tasks)
+            view.release()
+
+        return total
+
+    def head_object(self, bucket, key, headers: Dict = None, **kwargs):
+        return self.request('HEAD', bucket, key, headers=headers, **kwargs)
+
+    def delete_object(self, bucket, key, headers: Dict = None, **kwargs):
+        return self.request('DELETE', bucket, key, headers=headers, **kwargs)
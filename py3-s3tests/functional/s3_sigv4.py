@@ -1,10 +1,60 @@
 
 from typing import Dict
 import datetime
+import functools
 import hmac
 import hashlib
+import mmap
 
-from urllib.parse import urlparse
+from urllib.parse import urlparse, quote, unquote, parse_qsl
+
+# number of signing keys kept by get_signature_key, one per (secret key, date, region, service).
+SIGNING_KEY_CACHE_SIZE = 1024
+# file-like payloads are hashed in blocks of this size.
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+# Key derivation functions. See:
+# http://docs.aws.amazon.com/general/latest/gr/signature-v4-examples.html#signature-v4-examples-python
+def sign(key, msg):
+    return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+
+
+@functools.lru_cache(maxsize=SIGNING_KEY_CACHE_SIZE)
+def get_signature_key(key, datestamp, region_name, service_name):
+    """
+    Derive the signing key, it only changes once a day per credential,
+    so the 4-step HMAC chain is cached.
+    """
+    k_date = sign(('AWS4' + key).encode('utf-8'), datestamp)
+    k_region = sign(k_date, region_name)
+    k_service = sign(k_region, service_name)
+    k_signing = sign(k_service, 'aws4_request')
+    return k_signing
+
+
+def _canonical_uri(path):
+    # S3 does not normalize the path, every segment is encoded once.
+    return quote(unquote(path), safe='/~') if path else "/"
+
+
+def _canonical_querystring(query):
+    params = sorted(
+        (quote(k, safe='-_.~'), quote(v, safe='-_.~')) for k, v in parse_qsl(query, keep_blank_values=True)
+    )
+    return '&'.join(f"{k}={v}" for k, v in params)
+
+
+def _canonical_headers(headers: Dict):
+    canonical_headers = ''
+    for k, v in sorted((k.lower(), ' '.join(str(v).split())) for k, v in headers.items()):
+        canonical_headers += f"{k}:{v}\n"
+
+    return canonical_headers
+
+
+def _signed_headers(headers: Dict):
+    return ';'.join(sorted(k.lower() for k in headers.keys()))
 
 
 class AWS4SignerBase(object):
@@ -39,9 +89,7 @@ class AWS4SignerBase(object):
         """
         Returns the canonicalized resource path for the service endpoint.
         """
-        path = self.parsed_endpoint.path
-
-        return path if path else "/"
+        return _canonical_uri(self.parsed_endpoint.path)
 
     def get_canonical_querystring(self):
         """
@@ -50,7 +98,7 @@ class AWS4SignerBase(object):
         string parameters, then URI encoding both the key and value and then
         joining them, in order, separating key value pairs with an '&'.
         """
-        return self.parsed_endpoint.query
+        return _canonical_querystring(self.parsed_endpoint.query)
 
     @staticmethod
     def get_signed_header(headers: Dict):
@@ -59,9 +107,7 @@ class AWS4SignerBase(object):
         the signature. For AWS4, all header names must be included in the process
         in sorted canonicalized order.
         """
-        sorted_keys = sorted(headers.keys())
-
-        return ';'.join(sorted_keys).lower()
+        return _signed_headers(headers)
 
     @staticmethod
     def get_canonical_headers(headers: Dict):
@@ -69,23 +115,45 @@ class AWS4SignerBase(object):
         Computes the canonical headers with values for the request. For AWS4, all
         headers must be included in the signing process.
         """
+        return _canonical_headers(headers)  # must be trimmed and lowercase
 
-        canonical_headers = ''
+    @classmethod
+    def get_body_hash(cls, payload, unsigned_payload=False):
+        """
+        Returns the hex SHA256 of the payload, UNSIGNED-PAYLOAD if unsigned_payload.
+
+        The payload can be:
+            str (utf-8 encoded), bytes-like (bytes, bytearray, memoryview, mmap),
+            a file-like object, hashed in blocks from its current position, which is restored afterwards,
+            an iterable of str/bytes, an iterator is consumed by hashing it.
+        """
+        if unsigned_payload:
+            return cls.UNSIGNED_PAYLOAD
 
-        sorted_headers = sorted(headers.items(), key=lambda x: x[0])
-        for k, v in dict(sorted_headers).items():
-            canonical_headers += f"{k.lower()}:{v}\n"  # must be trimmed and lowercase
+        if payload is None:
+            return cls.EMPTY_BODY_SHA256
 
-        return canonical_headers
+        if isinstance(payload, str):
+            return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
-    def get_body_hash(self, payload):
-        # Converts byte data to a Hex-encoded string.
-        if not payload:
-            return self.EMPTY_BODY_SHA256
+        if isinstance(payload, (bytes, bytearray, memoryview, mmap.mmap)):
+            return hashlib.sha256(payload).hexdigest()
 
-        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        sha256 = hashlib.sha256()
+        if hasattr(payload, 'read'):
+            position = payload.tell()
+            for block in iter(lambda: payload.read(HASH_BLOCK_SIZE), b''):
+                if not block:  # '' of files opened in text mode
+                    break
+                sha256.update(block.encode('utf-8') if isinstance(block, str) else block)
+            payload.seek(position)
+        else:
+            for piece in payload:
+                sha256.update(piece.encode('utf-8') if isinstance(piece, str) else piece)
 
-    def get_canonical_request(self, headers: Dict, payload):
+        return sha256.hexdigest()
+
+    def get_canonical_request(self, headers: Dict, payload, payload_hash=None):
         """
         Returns the canonical request string to go into the signer process; this
         consists of several canonical sub-parts.
@@ -96,7 +164,7 @@ class AWS4SignerBase(object):
             self.get_canonical_querystring() + "\n" + \
             self.get_canonical_headers(headers) + "\n" + \
             self.get_signed_header(headers) + "\n" + \
-            self.get_body_hash(payload=payload)
+            (payload_hash or self.get_body_hash(payload=payload))
 
         return canonical_request
 
@@ -132,7 +200,8 @@ class AWS4SignerForAuthorizationHeader(AWS4SignerBase):
             region_name=region_name
         )
 
-    def compute_signature_headers(self, headers: Dict, payload, aws_access_key, aws_secret_key):
+    def compute_signature_headers(self, headers: Dict, payload, aws_access_key, aws_secret_key,
+                                  unsigned_payload=False):
         """
         Computes an AWS4 signature for a request, ready for inclusion as an
         'Authorization' header.
@@ -146,6 +215,8 @@ class AWS4SignerForAuthorizationHeader(AWS4SignerBase):
             The user's AWS Access Key.
         @param aws_secret_key
             The user's AWS Secret Key.
+        @param unsigned_payload
+            Sign 'UNSIGNED-PAYLOAD' instead of the hash of the payload.
         @return The computed authorization string for the request.
             This value needs to be set as the header 'Authorization' on the subsequent HTTP request.
         """
@@ -153,25 +224,13 @@ class AWS4SignerForAuthorizationHeader(AWS4SignerBase):
         # Python note: The 'host' header is added automatically by the Python 'requests' library.
         headers['Host'] = self.host
         headers['X-Amz-Date'] = self.datetime_format
-        headers['X-Amz-Content-Sha256'] = self.get_body_hash(payload)
-
-        # Key derivation functions. See:
-        # http://docs.aws.amazon.com/general/latest/gr/signature-v4-examples.html#signature-v4-examples-python
-        def sign(key, msg):
-            return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+        headers['X-Amz-Content-Sha256'] = self.get_body_hash(payload, unsigned_payload=unsigned_payload)
 
-        def get_signature_key(key, datestamp, region_name, service_name):
-            k_date = sign(('AWS4' + key).encode('utf-8'), datestamp)
-            k_region = sign(k_date, region_name)
-            k_service = sign(k_region, service_name)
-            k_signing = sign(k_service, 'aws4_request')
-            return k_signing
-
-        # Create the signing key using the function defined above.
+        # Create the signing key, it is cached by get_signature_key.
         signature_key = get_signature_key(aws_secret_key, self.datestamp_format, self.region_name, self.service_name)
 
         # Sign the string_to_sign using the signing_key
-        canonical_request = self.get_canonical_request(headers, payload)
+        canonical_request = self.get_canonical_request(headers, payload, payload_hash=headers['X-Amz-Content-Sha256'])
         string_to_sign = self.get_string_to_sign(canonical_request)
         credential_scope = self.get_canonical_scope()
         signed_headers = self.get_signed_header(headers)
@@ -187,9 +246,192 @@ class AWS4SignerForAuthorizationHeader(AWS4SignerBase):
         return headers
 
 
+class AWS4Signer(object):
+    """
+    Long-lived AWS4 signer of one credential, signs any number of requests with an 'Authorization' header.
+
+    Unlike AWS4SignerForAuthorizationHeader, nothing about the request is kept in the instance,
+    so one signer can be shared by many requests (and threads).
+    """
+
+    def __init__(self, aws_access_key, aws_secret_key, region_name='us-east-1', service_name='s3'):
+        self.aws_access_key = aws_access_key
+        self.aws_secret_key = aws_secret_key
+        self.region_name = region_name
+        self.service_name = service_name
+
+    @staticmethod
+    def get_timestamps(now=None):
+        """
+        Returns the (X-Amz-Date, datestamp) pair of now (or of the given utc datetime).
+        """
+        _t = now or datetime.datetime.utcnow()
+        return _t.strftime(AWS4SignerBase.ISO8601BasicFormat), _t.strftime(AWS4SignerBase.DateStringFormat)
+
+    def get_canonical_scope(self, datestamp):
+        return datestamp + '/' + self.region_name + '/' + self.service_name + '/' + AWS4SignerBase.TERMINATOR
+
+    def get_signing_key(self, datestamp):
+        return get_signature_key(self.aws_secret_key, datestamp, self.region_name, self.service_name)
+
+    def compute_signature(self, http_method, parsed_url, headers: Dict, payload_hash, amz_date, datestamp):
+        """
+        Returns the hex signature of a request, headers must already hold every header to be signed.
+        """
+        canonical_request = \
+            http_method + "\n" + \
+            _canonical_uri(parsed_url.path) + "\n" + \
+            _canonical_querystring(parsed_url.query) + "\n" + \
+            _canonical_headers(headers) + "\n" + \
+            _signed_headers(headers) + "\n" + \
+            payload_hash
+
+        string_to_sign = \
+            AWS4SignerBase.SCHEME + '-' + AWS4SignerBase.ALGORITHM + '\n' + \
+            amz_date + '\n' + self.get_canonical_scope(datestamp) + '\n' + \
+            hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
+
+        return hmac.new(self.get_signing_key(datestamp), string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    def sign_request(self, http_method, url, headers: Dict = None, payload='', now=None,
+                     unsigned_payload=False, payload_hash=None):
+        """
+        Signs one request.
+
+        @param http_method
+            e.g.: GET, PUT.
+        @param url
+            The full request url, e.g.: http://host:port/bucket/key?uploads
+        @param headers
+            The request headers to be signed, it is not modified.
+        @param payload
+            The request body content, see AWS4SignerBase.get_body_hash for the supported types.
+        @param now
+            utc datetime of the request, defaults to now.
+        @param unsigned_payload
+            Sign 'UNSIGNED-PAYLOAD' instead of the hash of the payload.
+        @param payload_hash
+            The precomputed hex SHA256 of the payload, the payload is not hashed again.
+        @return A new headers dict holding 'Host', 'X-Amz-Date', 'X-Amz-Content-Sha256' and 'Authorization'.
+        """
+        parsed_url = urlparse(url)
+        amz_date, datestamp = self.get_timestamps(now)
+
+        headers = dict(headers or {})
+        headers['Host'] = parsed_url.netloc
+        headers['X-Amz-Date'] = amz_date
+        headers['X-Amz-Content-Sha256'] = \
+            payload_hash or AWS4SignerBase.get_body_hash(payload, unsigned_payload=unsigned_payload)
+
+        signature = self.compute_signature(
+            http_method, parsed_url, headers, headers['X-Amz-Content-Sha256'], amz_date, datestamp)
+
+        headers['Authorization'] = \
+            AWS4SignerBase.SCHEME + '-' + AWS4SignerBase.ALGORITHM + ' ' + \
+            'Credential=' + self.aws_access_key + '/' + self.get_canonical_scope(datestamp) + ', ' + \
+            'SignedHeaders=' + _signed_headers(headers) + ', ' + 'Signature=' + signature
+
+        return headers
+
+
+class AWS4SignerForQueryString(AWS4Signer):
+    """
+    Long-lived AWS4 signer of one credential, signs presigned urls (authentication in the query string).
+
+    Usage:
+        signer = AWS4SignerForQueryString(ak, sk, 'http://host:port')
+        url = signer.presign('GET', bucket, key, expires=3600)
+        urls = signer.presign_urls([('GET', bucket, key, 3600), ('PUT', bucket, key2, 600), ...])
+    """
+
+    def __init__(self, aws_access_key, aws_secret_key, endpoint_url, region_name='us-east-1', service_name='s3'):
+        super().__init__(
+            aws_access_key=aws_access_key,
+            aws_secret_key=aws_secret_key,
+            region_name=region_name,
+            service_name=service_name
+        )
+        self.endpoint_url = endpoint_url.rstrip('/')
+        self.parsed_endpoint = urlparse(self.endpoint_url)
+
+    def _get_query_prefix(self, amz_date, datestamp):
+        """
+        Returns the (sorted and encoded) query parameters before X-Amz-Expires, they are the same for every url
+        signed at the same time.
+        """
+        credential = quote(self.aws_access_key + '/' + self.get_canonical_scope(datestamp), safe='-_.~')
+        return 'X-Amz-Algorithm=' + AWS4SignerBase.SCHEME + '-' + AWS4SignerBase.ALGORITHM + \
+            '&X-Amz-Credential=' + credential + '&X-Amz-Date=' + amz_date
+
+    def _sign_string(self, canonical_request, amz_date, datestamp, signing_key):
+        string_to_sign = \
+            AWS4SignerBase.SCHEME + '-' + AWS4SignerBase.ALGORITHM + '\n' + \
+            amz_date + '\n' + self.get_canonical_scope(datestamp) + '\n' + \
+            hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()
+        return hmac.new(signing_key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    def presign_url(self, http_method, url, expires=3600, now=None):
+        """
+        Returns the presigned url of http_method on url, it may already hold query parameters(e.g.: versionId).
+        """
+        parsed_url = urlparse(url)
+        amz_date, datestamp = self.get_timestamps(now)
+
+        query = self._get_query_prefix(amz_date, datestamp) + f'&X-Amz-Expires={expires}&X-Amz-SignedHeaders=host'
+        if parsed_url.query:
+            query = _canonical_querystring(parsed_url.query + '&' + query)
+
+        canonical_request = \
+            http_method + '\n' + \
+            _canonical_uri(parsed_url.path) + '\n' + \
+            query + '\n' + \
+            'host:' + parsed_url.netloc + '\n\n' + \
+            'host\n' + \
+            AWS4SignerBase.UNSIGNED_PAYLOAD
+        signature = self._sign_string(canonical_request, amz_date, datestamp, self.get_signing_key(datestamp))
+
+        return f"{parsed_url.scheme}://{parsed_url.netloc}{_canonical_uri(parsed_url.path)}?" \
+               f"{query}&X-Amz-Signature={signature}"
+
+    def presign(self, http_method, bucket, key, expires=3600, now=None):
+        """
+        Returns the (path-style) presigned url of http_method on bucket/key.
+        """
+        return self.presign_urls([(http_method, bucket, key, expires)], now=now)[0]
+
+    def presign_urls(self, presign_requests, now=None):
+        """
+        Presigns many (http_method, bucket, key, expires) tuples at once, all of them are signed at
+        the same time, so the credential scope, the signing key and the common query parameters are computed once.
+
+        @return The (path-style) presigned urls, in the order of presign_requests.
+        """
+        amz_date, datestamp = self.get_timestamps(now)
+        signing_key = self.get_signing_key(datestamp)
+        query_prefix = self._get_query_prefix(amz_date, datestamp)
+        host = self.parsed_endpoint.netloc
+        base_path = self.parsed_endpoint.path.rstrip('/')
+
+        urls = []
+        for http_method, bucket, key, expires in presign_requests:
+            path = quote(f"{base_path}/{bucket}/{key}", safe='/~')
+            query = f'{query_prefix}&X-Amz-Expires={expires}&X-Amz-SignedHeaders=host'
+            canonical_request = \
+                f'{http_method}\n{path}\n{query}\nhost:{host}\n\nhost\n{AWS4SignerBase.UNSIGNED_PAYLOAD}'
+            signature = self._sign_string(canonical_request, amz_date, datestamp, signing_key)
+            urls.append(f'{self.endpoint_url}{path[len(base_path):]}?{query}&X-Amz-Signature={signature}')
+
+        return urls
+
+
 class AWS4SignerForChunkedUpload(AWS4SignerBase):
     """
     Sample AWS4 signer demonstrating how to sign 'chunked' uploads
+
+    Usage:
+        signer = AWS4SignerForChunkedUpload(url, 'PUT', 's3', 'us-east-1')
+        headers = signer.compute_signature_headers({}, size, ak, sk, chunk_size=64 * 1024)
+        requests.put(url, headers=headers, data=signer.chunked_body(fp))
     """
 
     # SHA256 substitute marker used in place of x-amz-content-sha256 when employing chunked uploads
@@ -198,7 +440,11 @@ class AWS4SignerForChunkedUpload(AWS4SignerBase):
     CHUNK_STRING_TO_SIGN_PREFIX = "AWS4-HMAC-SHA256-PAYLOAD"
     CHUNK_SIGNATURE_HEADER = ";chunk-signature="
     SIGNATURE_LENGTH = 64
-    FINAL_CHUNK = None
+    FINAL_CHUNK = b''
+
+    # every chunk but the last one must be at least 8KB
+    MIN_CHUNK_SIZE = 8 * 1024
+    DEFAULT_CHUNK_SIZE = 64 * 1024
 
     def __init__(self, endpoint_url, http_method, service_name, region_name):
         super().__init__(
@@ -207,3 +453,199 @@ class AWS4SignerForChunkedUpload(AWS4SignerBase):
             service_name=service_name,
             region_name=region_name
         )
+
+        self.chunk_size = self.DEFAULT_CHUNK_SIZE
+        self.decoded_content_length = 0
+        self.signature_key = None
+        self.last_signature = None  # seed signature first, then the signature of the previous chunk
+
+    @classmethod
+    def calculate_chunk_length(cls, data_length):
+        """
+        Returns the length of one framed chunk holding data_length bytes.
+        """
+        return len(f"{data_length:x}") + len(cls.CHUNK_SIGNATURE_HEADER) + cls.SIGNATURE_LENGTH + \
+            len(cls.CLRF) + data_length + len(cls.CLRF)
+
+    @classmethod
+    def calculate_chunked_content_length(cls, original_length, chunk_size):
+        """
+        Returns the Content-Length of the aws-chunked body of original_length bytes,
+        including the final 0 byte chunk.
+        """
+        if original_length < 0:
+            raise ValueError("Nonnegative content length expected.")
+
+        full_chunks, remaining = divmod(original_length, chunk_size)
+        content_length = full_chunks * cls.calculate_chunk_length(chunk_size)
+        if remaining:
+            content_length += cls.calculate_chunk_length(remaining)
+
+        return content_length + cls.calculate_chunk_length(0)
+
+    def compute_signature_headers(self, headers: Dict, decoded_content_length, aws_access_key, aws_secret_key,
+                                  chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Computes the seed signature of a chunked upload, ready for inclusion as an
+        'Authorization' header, the chunks are signed later by chunked_body().
+
+        @param headers
+            The request headers; 'Host', 'X-Amz-Date', 'X-Amz-Content-Sha256', 'Content-Encoding',
+            'X-Amz-Decoded-Content-Length' and 'Content-Length' will be added to this set.
+        @param decoded_content_length
+            The length of the object, without the aws-chunked framing.
+        @param aws_access_key
+            The user's AWS Access Key.
+        @param aws_secret_key
+            The user's AWS Secret Key.
+        @param chunk_size
+            The size of the chunks, the last one may be shorter,
+            at least MIN_CHUNK_SIZE unless the object fits in a single chunk.
+        @return The headers, to be sent along with the chunked_body().
+        """
+        if chunk_size <= 0 or (chunk_size < self.MIN_CHUNK_SIZE and decoded_content_length > chunk_size):
+            raise ValueError(f"chunk_size must be at least {self.MIN_CHUNK_SIZE} bytes (except for the last chunk), "
+                             f"got {chunk_size}.")
+        self.chunk_size = chunk_size
+        self.decoded_content_length = decoded_content_length
+
+        headers['Host'] = self.parsed_endpoint.netloc
+        headers['X-Amz-Date'] = self.datetime_format
+        headers['X-Amz-Content-Sha256'] = self.STREAMING_BODY_SHA256
+        headers['Content-Encoding'] = 'aws-chunked'
+        headers['X-Amz-Decoded-Content-Length'] = str(decoded_content_length)
+        headers['Content-Length'] = str(self.calculate_chunked_content_length(decoded_content_length, chunk_size))
+
+        self.signature_key = get_signature_key(
+            aws_secret_key, self.datestamp_format, self.region_name, self.service_name)
+
+        canonical_request = self.get_canonical_request(headers, None, payload_hash=self.STREAMING_BODY_SHA256)
+        string_to_sign = self.get_string_to_sign(canonical_request)
+        self.last_signature = hmac.new(self.signature_key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+
+        headers['Authorization'] = \
+            self.SCHEME + '-' + self.ALGORITHM + ' ' + 'Credential=' + aws_access_key + '/' + \
+            self.get_canonical_scope() + ',' + ' ' + 'SignedHeaders=' + self.get_signed_header(headers) + ',' + \
+            ' ' + 'Signature=' + self.last_signature
+
+        return headers
+
+    def get_chunk_header(self, data):
+        """
+        Signs one chunk (chained to the previous signature) and returns its header:
+            hex(len(data));chunk-signature=<signature><CRLF>
+        """
+        if self.last_signature is None:
+            raise RuntimeError("compute_signature_headers() must be called before signing chunks.")
+
+        string_to_sign = \
+            self.CHUNK_STRING_TO_SIGN_PREFIX + '\n' + \
+            self.datetime_format + '\n' + \
+            self.get_canonical_scope() + '\n' + \
+            self.last_signature + '\n' + \
+            self.EMPTY_BODY_SHA256 + '\n' + \
+            hashlib.sha256(data).hexdigest()
+        self.last_signature = hmac.new(self.signature_key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+
+        return f"{len(data):x}{self.CHUNK_SIGNATURE_HEADER}{self.last_signature}{self.CLRF}".encode('utf-8')
+
+    def construct_signed_chunk(self, data):
+        """
+        Returns one framed chunk, FINAL_CHUNK is the terminating chunk.
+        """
+        return self.get_chunk_header(data) + bytes(data) + self.CLRF.encode('utf-8')
+
+    def chunked_body(self, source):
+        """
+        Returns the aws-chunked body reading the object from source,
+        see ChunkedUploadBody for the supported sources.
+        """
+        return ChunkedUploadBody(self, source)
+
+
+def _iter_fixed_chunks(source, chunk_size, length):
+    """
+    Yields exactly length bytes from source in chunk_size pieces (only the last one is shorter).
+    """
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        view = memoryview(source).cast('B')
+        if len(view) < length:
+            raise ValueError(f"The source holds {len(view)} bytes, {length} bytes expected.")
+        for offset in range(0, length, chunk_size):
+            yield view[offset:min(offset + chunk_size, length)]
+        return
+
+    total = 0
+    buf = bytearray()
+    if hasattr(source, 'read'):
+        pieces = iter(lambda: source.read(min(chunk_size, length - total)), b'')
+    else:
+        pieces = iter(source)
+
+    for piece in pieces:
+        piece = piece[:length - total]
+        total += len(piece)
+        if not buf and len(piece) == chunk_size:
+            yield piece  # no need to copy it
+        else:
+            buf += piece
+            while len(buf) >= chunk_size:
+                yield bytes(buf[:chunk_size])
+                del buf[:chunk_size]
+        if total == length:
+            break
+
+    if total < length:
+        raise ValueError(f"The source ended after {total} bytes, {length} bytes expected.")
+    if buf:
+        yield bytes(buf)
+
+
+class ChunkedUploadBody(object):
+    """
+    Streaming aws-chunked request body, the chunks are read from the source and signed one by one
+    when the body is consumed, so the memory used does not depend on the object size.
+
+    The source can be bytes-like (bytes, bytearray, memoryview, mmap), a file-like object with read()
+    (file, socket, FakeWriteFile) or an iterable of bytes (e.g.: a seeded generator),
+    it must provide at least decoded_content_length bytes.
+
+    The body can be consumed only once, by iterating over it or by read(), len() is the Content-Length.
+    """
+
+    def __init__(self, signer: AWS4SignerForChunkedUpload, source):
+        self.signer = signer
+        self.source = source
+        self.content_length = signer.calculate_chunked_content_length(
+            signer.decoded_content_length, signer.chunk_size)
+
+        self._chunks = self._iter_chunks()
+        self._buf = b''
+
+    def __len__(self):
+        return self.content_length
+
+    def __iter__(self):
+        return self._chunks
+
+    def _iter_chunks(self):
+        clrf = self.signer.CLRF.encode('utf-8')
+        for data in _iter_fixed_chunks(self.source, self.signer.chunk_size, self.signer.decoded_content_length):
+            yield self.signer.get_chunk_header(data)
+            yield data
+            yield clrf
+
+        yield self.signer.construct_signed_chunk(self.signer.FINAL_CHUNK)
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            return self._buf + b''.join(bytes(piece) for piece in self._chunks)
+
+        while len(self._buf) < size:
+            piece = next(self._chunks, None)
+            if piece is None:
+                break
+            self._buf += bytes(piece)
+
+        got, self._buf = self._buf[:size], self._buf[size:]
+        return got
@@ -0,0 +1,265 @@
+
+import time
+import bisect
+import random
+import logging
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+from botocore.exceptions import ClientError
+
+from s3tests.functional.s3_loadgen import (
+    ProcessLoadGenerator, gen_payload, parse_size, run_closed_loop, run_open_loop
+)
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ('get', 'put', 'head', 'delete', 'list')
+POPULARITY = ('uniform', 'zipf', 'sequential')
+
+
+def _cumulative(weights):
+    """
+    [70, 20, 10] -> [70, 90, 100], for bisect after random() * total.
+    """
+    if not weights or any(w < 0 for w in weights) or not sum(weights):
+        raise ValueError(f"Invalid weights: {weights}.")
+    return list(itertools.accumulate(weights))
+
+
+class KeySpace(object):
+    """
+    count keys (prefix + index) chosen by popularity:
+        uniform: every key is as likely;
+        zipf: key i weighs 1 / (i + 1) ** zipf_s, a few keys are hot;
+        sequential: the threads walk the keys in turn.
+    """
+
+    def __init__(self, count=1000, prefix='wl-', popularity='uniform', zipf_s=1.1):
+        if popularity not in POPULARITY:
+            raise ValueError(f"Unknown key popularity: {popularity}, one of {POPULARITY}.")
+        self.count = int(count)
+        self.prefix = prefix
+        self.popularity = popularity
+        self._cdf = _cumulative([1.0 / (i + 1) ** zipf_s for i in range(self.count)]) if popularity == 'zipf' \
+            else None
+
+    def key(self, index):
+        return f"{self.prefix}{index:010d}"
+
+    def keys(self):
+        return [self.key(i) for i in range(self.count)]
+
+    def choose(self, rng, worker_id, seq, concurrency):
+        if self.popularity == 'uniform':
+            index = rng.randrange(self.count)
+        elif self.popularity == 'zipf':
+            index = min(bisect.bisect(self._cdf, rng.random() * self._cdf[-1]), self.count - 1)
+        else:
+            index = (seq * concurrency + worker_id) % self.count
+        return self.key(index)
+
+
+class SizeDistribution(object):
+    """
+    Object sizes: one size ('4KB', 4096), or weighted sizes [{'size': '4KB', 'weight': 80}, ...].
+    """
+
+    def __init__(self, spec='4KB'):
+        if not isinstance(spec, list):
+            spec = [{'size': spec, 'weight': 1}]
+        self.sizes = [parse_size(s['size']) for s in spec]
+        self._cdf = _cumulative([s.get('weight', 1) for s in spec])
+
+    def choose(self, rng):
+        return self.sizes[bisect.bisect(self._cdf, rng.random() * self._cdf[-1])]
+
+
+class Workload(object):
+    """
+    A mixed S3 workload, declared in YAML:
+
+        name: read-heavy
+        duration: 60            # seconds, or ops: 1000 (per thread)
+        concurrency: 16
+        rate: 500               # ops/s of all the threads, optional, the threads are paced (still a closed loop)
+        arrival: poisson        # optional, fixed or poisson: an open loop at rate instead, see run_open_loop()
+        workers: 64             # threads of the open loop
+        seed: 1
+        bucket: null            # a new bucket, or a name formatted with S3CFG, e.g.: "{glacier_bucket}"
+        keys: {count: 10000, prefix: wl-, popularity: zipf, zipf_s: 1.1, preload: true}
+        sizes:
+          - {size: 4KB, weight: 80}
+          - {size: 1MB, weight: 20}
+        operations: {get: 70, put: 20, list: 5, delete: 5}
+        put_args: {StorageClass: STANDARD}    # passed to every put_object
+        list_max_keys: 1000
+
+    Operations are get, put, head, delete (of a key of the key space) and list (a page from a random key),
+    a get or head of a missing key (deleted, or not preloaded) is recorded as get_miss/head_miss.
+
+    Usage:
+        workload = Workload.load('bench/workloads/mixed.yaml')
+        workload.preload(get_client, config, bucket_name)
+        recorder = workload.run(get_client, config, bucket_name)  # LatencyRecorder, one op per operation
+        recorder, schedule = workload.run_open_loop(get_client, config, bucket_name)  # with arrival
+    """
+
+    def __init__(self, spec):
+        unknown = set(spec.get('operations', {})) - set(OPERATIONS)
+        if not spec.get('operations') or unknown:
+            raise ValueError(f"operations must weigh some of {OPERATIONS}, got {spec.get('operations')}.")
+        if spec.get('duration') is None and spec.get('ops') is None:
+            raise ValueError("duration or ops is required.")
+
+        self.spec = spec
+        self.name = spec.get('name', 'workload')
+        self.duration = spec.get('duration')
+        self.ops = spec.get('ops')
+        self.concurrency = int(spec.get('concurrency', 1))
+        self.rate = spec.get('rate')
+        self.arrival = spec.get('arrival')
+        self.workers = int(spec.get('workers', 64))
+        if self.arrival and not self.rate:
+            raise ValueError("rate is required with arrival (open loop).")
+        self.seed = spec.get('seed', 0)
+        self.bucket = spec.get('bucket')
+        self.operations = list(spec['operations'])
+        self._op_cdf = _cumulative([spec['operations'][op] for op in self.operations])
+
+        keys = dict(spec.get('keys') or {})
+        self.preload_keys = keys.pop('preload', True)
+        self.keys = KeySpace(**keys)
+        self.sizes = SizeDistribution(spec.get('sizes', '4KB'))
+        self.put_args = spec.get('put_args') or {}
+        self.list_max_keys = spec.get('list_max_keys', 1000)
+
+    @classmethod
+    def from_yaml(cls, text):
+        return cls(yaml.safe_load(text))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_yaml(f.read())
+
+    def bucket_name(self, config):
+        """
+        The bucket of the workload file formatted with config (S3CFG), None for a new bucket.
+        """
+        return self.bucket.format(**config) if self.bucket else None
+
+    def _payloads(self):
+        return {size: gen_payload(size, seed=self.seed) for size in set(self.sizes.sizes)}
+
+    def preload(self, client_factory, config, bucket, concurrency=32):
+        """
+        Uploads every key of the key space (sizes drawn from the distribution) if keys.preload is set,
+        returns how many were uploaded.
+        """
+        if not self.preload_keys:
+            return 0
+        payloads = self._payloads()
+        rng = random.Random(self.seed)
+        sizes = [self.sizes.choose(rng) for _ in range(self.keys.count)]
+        local = threading.local()
+
+        def _put(index):
+            if not hasattr(local, 'client'):
+                local.client = client_factory(config)
+            local.client.put_object(Bucket=bucket, Key=self.keys.key(index), Body=payloads[sizes[index]],
+                                    **self.put_args)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as _exec:
+            list(_exec.map(_put, range(self.keys.count)))
+        return self.keys.count
+
+    def execute(self, client, bucket, op, key, rng, payloads):
+        """
+        Runs one operation on key, returns (the op name recorded, bytes transferred).
+        """
+        if op == 'put':
+            size = self.sizes.choose(rng)
+            client.put_object(Bucket=bucket, Key=key, Body=payloads[size], **self.put_args)
+            return op, size
+        if op == 'delete':
+            client.delete_object(Bucket=bucket, Key=key)
+            return op, 0
+        if op == 'list':
+            client.list_objects_v2(Bucket=bucket, Prefix=self.keys.prefix, StartAfter=key,
+                                   MaxKeys=self.list_max_keys)
+            return op, 0
+
+        try:
+            if op == 'head':
+                client.head_object(Bucket=bucket, Key=key)
+                return op, 0
+            response = client.get_object(Bucket=bucket, Key=key)
+            return op, sum(len(data) for data in response['Body'].iter_chunks(1024 * 1024))
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                return f'{op}_miss', 0
+            raise
+
+    def run(self, client_factory, config, bucket, duration=None, ops=None, processes=1):
+        """
+        Runs the workload in concurrency threads (a client each), duration and ops override the file's,
+        returns the merged LatencyRecorder.
+
+        @param processes
+            over 1, each of processes processes runs concurrency threads (s3_loadgen.ProcessLoadGenerator),
+            rate is then shared by all of their threads.
+        """
+        if duration is None and ops is None:
+            duration, ops = self.duration, self.ops
+        payloads = self._payloads()
+        threads = self.concurrency * processes
+        rngs = [random.Random(self.seed * 1000003 + i) for i in range(threads)]
+        interval = threads / self.rate if self.rate else None
+        start = time.perf_counter()  # the forked processes share the clock of perf_counter.
+
+        def _pacing(worker_id, seq):
+            # the threads' slots are interleaved, a late thread goes at once.
+            delay = start + (seq + worker_id / threads) * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        def _operation(client, worker_id, seq):
+            rng = rngs[worker_id]
+            op = self.operations[bisect.bisect(self._op_cdf, rng.random() * self._op_cdf[-1])]
+            try:
+                key = self.keys.choose(rng, worker_id, seq, threads)
+                return self.execute(client, bucket, op, key, rng, payloads)
+            except Exception as e:
+                logger.debug(f"{self.name} {op} failed: {e}")
+                return op, 0, False
+
+        pacing = _pacing if interval else None
+        if processes > 1:
+            gen = ProcessLoadGenerator(config, client_factory, processes=processes, concurrency=self.concurrency)
+            return gen.run(_operation, ops=ops, duration=duration, name=self.name, pacing=pacing)
+        return run_closed_loop(_operation, client_factory, config, self.concurrency, ops=ops, duration=duration,
+                               name=self.name, pacing=pacing)
+
+    def run_open_loop(self, client_factory, config, bucket, duration=None, ops=None):
+        """
+        Runs the workload as an open loop (s3_loadgen.run_open_loop) at rate with the arrival of the file
+        (defaults to fixed), ops is the total here, returns (recorder, schedule).
+        """
+        if duration is None and ops is None:
+            duration, ops = self.duration, self.ops
+        if not self.rate:
+            raise ValueError("rate is required for an open loop.")
+        payloads = self._payloads()
+        rngs = [random.Random(self.seed * 1000003 + i) for i in range(self.workers)]
+
+        def _operation(client, worker_id, seq):
+            rng = rngs[worker_id]
+            op = self.operations[bisect.bisect(self._op_cdf, rng.random() * self._op_cdf[-1])]
+            # seq counts the requests of every worker, the sequential keys follow it.
+            return self.execute(client, bucket, op, self.keys.choose(rng, seq, 0, 1), rng, payloads)
+
+        return run_open_loop(_operation, client_factory, config, self.rate, duration=duration, ops=ops,
+                             arrival=self.arrival or 'fixed', workers=self.workers, name=self.name, seed=self.seed)
@@ -1,11 +1,24 @@
-
 import os
+import sys
 from pathlib2 import Path
 
 import pytest
 
 BASE_PATH = Path(os.path.abspath(__file__)).parent
 CASE_PATH = Path(BASE_PATH, "tests/*")
+BENCH_PATH = Path(BASE_PATH, "bench")
+
+
+def bench(args):
+    """
+    python main.py bench [pytest options, e.g.: --bench-sizes 4KB,1MB --bench-concurrency 1,16]
+    The benchmarks run one by one (no -n), the concurrency is inside each of them.
+    """
+    return pytest.main(['-m', 'bench', '--html=report/bench_pytest.html', str(BENCH_PATH)] + args)
+
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'bench':
+        sys.exit(bench(sys.argv[2:]))
+
     pytest.main(['-m ', 'sio and not need_speedup', '-n 10', '--reruns 3', CASE_PATH])
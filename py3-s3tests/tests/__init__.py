@@ -18,10 +18,14 @@ from concurrent.futures import ThreadPoolExecutor, wait
 from fabric import Connection
 
 import boto3
+import requests
+from requests.adapters import HTTPAdapter
 from botocore import UNSIGNED
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
+from s3tests.functional import s3_async, s3_delete, s3_enumerate, s3_multipart, s3_range
+
 logger = logging.getLogger(__name__)
 
 
@@ -102,6 +106,19 @@ def get_s3_resource_client(config):
     return client
 
 
+def get_http_session(config, pool_size=10):
+    """
+    A requests.Session for raw (e.g.: presigned) requests, its connections are kept alive and reused,
+    pool_size of them per host.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.verify = config.default_ssl_verify
+    return session
+
+
 def assert_raises(exc_class, callable_obj, *args, **kwargs):
     """
     Like unittest.TestCase.assertRaises, but returns the exception.
@@ -147,22 +164,7 @@ def list_versions(client, bucket, batch_size):
     generator function that returns object listings in batches, where each
     batch is a list of dicts compatible with delete_objects()
     """
-    key_marker = ''
-    version_marker = ''
-    truncated = True
-    while truncated:
-        listing = client.list_object_versions(
-            Bucket=bucket,
-            KeyMarker=key_marker,
-            VersionIdMarker=version_marker,
-            MaxKeys=batch_size)
-
-        key_marker = listing.get('NextKeyMarker')
-        version_marker = listing.get('NextVersionIdMarker')
-        truncated = listing['IsTruncated']
-
-        objs = listing.get('Versions', []) + listing.get('DeleteMarkers', [])
-
+    for objs in s3_enumerate.iter_entry_pages(client, bucket, versions=True, page_size=batch_size):
         if len(objs):
             yield [{'Key': o['Key'], 'VersionId': o['VersionId']} for o in objs]
 
@@ -376,18 +378,10 @@ class TestBaseClass(object):
 
     @staticmethod
     def get_objects_list(client, bucket, prefix=None):
-        if prefix is None:
-            response = client.list_objects(Bucket=bucket)
-        else:
-            response = client.list_objects(Bucket=bucket, Prefix=prefix)
-        objects_list = []
-
-        if 'Contents' in response:
-            contents = response['Contents']
-            for obj in contents:
-                objects_list.append(obj['Key'])
-
-        return objects_list
+        """
+        return the keys of every object in the bucket (or under prefix), all the pages of client.list_objects()
+        """
+        return [obj['Key'] for obj in s3_enumerate.iter_objects(client, bucket, prefix=prefix, api='v1')]
 
     @staticmethod
     def get_new_bucket_name(config):
@@ -407,7 +401,8 @@ class TestBaseClass(object):
     @staticmethod
     def get_keys(response):
         """
-        return lists of strings that are the keys from a client.list_objects() response
+        return lists of strings that are the keys from a client.list_objects() response,
+        of this page only, see get_objects_list() for every key of a bucket
         """
         keys = []
         if 'Contents' in response:
@@ -424,6 +419,14 @@ class TestBaseClass(object):
         objs_dict = {'Objects': objs_list}
         return objs_dict
 
+    @staticmethod
+    def delete_objects_batched(client, bucket_name, objects, batch_size=1000, quiet=True):
+        """
+        delete objects (keys, (key, version_id) tuples or dicts) by delete_objects requests of batch_size keys,
+        instead of a delete_object per key, return the Errors of the responses
+        """
+        return s3_delete.delete_keys(client, bucket_name, objects, batch_size=batch_size, quiet=quiet)
+
     @staticmethod
     def get_body(response):
         body = response['Body']
@@ -432,6 +435,38 @@ class TestBaseClass(object):
             got = got.decode()
         return got
 
+    @staticmethod
+    def get_body_into(response, buf=None):
+        """
+        Read the body of a get_object response into buf (a bytearray/mmap, allocated if None) with readinto,
+        no bytes object of the whole body is built nor decoded (urllib3 still copies each read into buf),
+        verify them in place.
+        return a memoryview of the bytes read.
+        """
+        size = response['ContentLength']
+        if buf is None:
+            buf = bytearray(size)
+        view = memoryview(buf).cast('B')
+        if len(view) < size:
+            raise ValueError(f"The body is {size} bytes, the buffer is only {len(view)} bytes.")
+
+        body = response['Body']
+        readinto = getattr(body, 'readinto', None)
+        if readinto is None:  # the StreamingBody of older botocore has no readinto.
+            def readinto(b):
+                data = body.read(len(b))
+                b[:len(data)] = data
+                return len(data)
+
+        got = 0
+        while got < size:
+            n = readinto(view[got:size])
+            if not n:
+                raise RuntimeError(f"The body ended after {got} of {size} bytes.")
+            got += n
+
+        return view[:size]
+
     @staticmethod
     def do_create_object(client, bucket_name, key, i):
         body = 'data {i}'.format(i=i)
@@ -466,6 +501,31 @@ class TestBaseClass(object):
         for thr in t:
             thr.join()
 
+    @staticmethod
+    def do_create_versioned_obj_async(config, bucket_name, key, num, max_connections=100):
+        """
+        Uploads num versions of key concurrently with the asyncio client (at most max_connections in flight),
+        returns their version ids.
+        """
+        return s3_async.run_with_client(config, s3_async.create_versioned_obj, bucket_name, key, num,
+                                        max_connections=max_connections)
+
+    @staticmethod
+    def do_clear_versioned_bucket_async(config, bucket_name, max_connections=100):
+        """
+        Deletes every version of the bucket concurrently with the asyncio client, returns how many were deleted.
+        """
+        return s3_async.run_with_client(config, s3_async.clear_versioned_bucket, bucket_name,
+                                        max_connections=max_connections)
+
+    @staticmethod
+    def do_set_bucket_canned_acl_async(config, bucket_name, canned_acl, num, max_connections=100):
+        """
+        Sets the canned acl num times concurrently with the asyncio client, returns the result of each request.
+        """
+        return s3_async.run_with_client(config, s3_async.set_bucket_canned_acl, bucket_name, canned_acl, num,
+                                        max_connections=max_connections)
+
     @staticmethod
     def get_post_url(config, bucket_name):
         endpoint = config.default_endpoint
@@ -567,6 +627,40 @@ class TestBaseClass(object):
 
         return upload_id, s, parts
 
+    def multipart_upload_parallel(self, config, bucket_name, key, size, part_size=5 * 1024 * 1024, concurrency=4,
+                                  content_type=None, metadata=None, resend_parts=[]):
+        """
+        multipart_upload with the parts uploaded concurrently, see s3_multipart.ParallelMultipartUploader.
+        return the upload descriptor
+        """
+        create_args = {}
+        if content_type is not None:
+            create_args['ContentType'] = content_type
+        if metadata is not None:
+            create_args['Metadata'] = metadata
+
+        data = []
+
+        def _parts():
+            for part in self.generate_random(size, part_size):
+                data.append(part)
+                yield part
+
+        uploader = s3_multipart.ParallelMultipartUploader(get_client, config, part_size=part_size,
+                                                          concurrency=concurrency)
+        upload_id, parts = uploader.upload(bucket_name, key, _parts(), resend_parts=resend_parts, **create_args)
+        return upload_id, ''.join(data), parts
+
+    @staticmethod
+    def check_content_using_range_parallel(config, bucket_name, key, content, step, concurrency=8,
+                                           alignment='aligned', get_args=None):
+        """
+        read the object by concurrent get_object(Range=...) of step bytes, compare every slice with content
+        (a s3_range.SeededContent), return the mismatches [(start, end, reason), ...]
+        """
+        reader = s3_range.RangeReader(get_client, config, concurrency=concurrency)
+        return reader.verify(bucket_name, key, content, step, alignment=alignment, get_args=get_args)
+
     def create_key_with_random_content(self, config, key_name, size=7 * 1024 * 1024, bucket_name=None, client=None):
         if client is None:
             client = get_client(config)
@@ -610,6 +704,16 @@ class TestBaseClass(object):
 
         return upload_id, parts
 
+    @staticmethod
+    def multipart_copy_parallel(config, src_bucket_name, src_key, dest_bucket_name, dest_key, size,
+                                part_size=5 * 1024 * 1024, concurrency=4, version_id=None):
+        """
+        multipart_copy with the upload_part_copy calls done concurrently,
+        see s3_multipart.ParallelMultipartCopier.
+        """
+        copier = s3_multipart.ParallelMultipartCopier(get_client, config, part_size=part_size, concurrency=concurrency)
+        return copier.copy(src_bucket_name, src_key, dest_bucket_name, dest_key, size=size, version_id=version_id)
+
     def check_key_content(self, client, src_key, src_bucket_name, dest_key, dest_bucket_name, version_id=None):
 
         if version_id is None:
@@ -620,7 +724,7 @@ class TestBaseClass(object):
 
         response = client.get_object(Bucket=dest_bucket_name, Key=dest_key)
         dest_size = response['ContentLength']
-        dest_data = self.get_body(response)
+        dest_data = self.get_body_into(response)
         assert (src_size >= dest_size)
 
         r = 'bytes={s}-{e}'.format(s=0, e=dest_size - 1)
@@ -628,8 +732,8 @@ class TestBaseClass(object):
             response = client.get_object(Bucket=src_bucket_name, Key=src_key, Range=r)
         else:
             response = client.get_object(Bucket=src_bucket_name, Key=src_key, Range=r, VersionId=version_id)
-        src_data = self.get_body(response)
-        self.eq(src_data, dest_data)
+        src_data = self.get_body_into(response)
+        assert src_data == dest_data, f"{src_bucket_name}/{src_key} and {dest_bucket_name}/{dest_key} differ"
 
     def check_versioning(self, client, bucket_name, status):
         try:
@@ -666,8 +770,7 @@ class TestBaseClass(object):
     @staticmethod
     def list_bucket_storage_class(client, bucket_name):
         result = defaultdict(list)
-        response = client.list_object_versions(Bucket=bucket_name)
-        for k in response['Versions']:
+        for k in s3_enumerate.iter_versions(client, bucket_name, delete_markers=False):
             result[k['StorageClass']].append(k)
 
         return result
@@ -675,9 +778,8 @@ class TestBaseClass(object):
     @staticmethod
     def list_bucket_versions(client, bucket_name):
         result = defaultdict(list)
-        response = client.list_object_versions(Bucket=bucket_name)
-        for k in response['Versions']:
-            result[response['Name']].append(k)
+        for k in s3_enumerate.iter_versions(client, bucket_name, delete_markers=False):
+            result[bucket_name].append(k)
 
         return result
 
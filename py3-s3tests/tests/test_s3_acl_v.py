@@ -356,6 +356,22 @@ class TestBucketAcl(TestAclBase):
         for r in results:
             self.eq(r, True)
 
+    def test_bucket_concurrent_set_canned_acl_high_fanout(self, s3cfg_global_unique):
+        """
+        测试-验证对同一个桶高并发（asyncio，1000个请求，最多200个连接）设置ACL
+        """
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+
+        results = self.do_set_bucket_canned_acl_async(
+            s3cfg_global_unique, bucket_name, 'public-read', 1000, max_connections=200)
+        self.eq(len(results), 1000)
+        self.eq(all(results), True)
+
+        response = client.get_bucket_acl(Bucket=bucket_name)
+        self.eq(any(g['Grantee'].get('URI') == 'http://acs.amazonaws.com/groups/global/AllUsers'
+                    for g in response['Grants']), True)
+
     def test_bucket_recreate_overwrite_acl(self, s3cfg_global_unique):
         """
         测试-验证多次创建同一个存储桶的表现（不同用户：409错误码，BucketAlreadyExists）；
@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 
 from s3tests.tests import (
@@ -10,6 +12,8 @@ from s3tests.tests import (
     get_client,
     get_alt_client
 )
+from s3tests.functional.s3_multipart import ParallelMultipartUploader
+from s3tests.functional.s3_range import SeededContent, plan_ranges
 
 
 class TestMultipartBase(TestBaseClass):
@@ -29,15 +33,22 @@ class TestMultipartBase(TestBaseClass):
             body = self.get_body(response)
             self.eq(body, data[ofs:end + 1])
 
-    def check_upload_multipart_resend(self, config, bucket_name, key, obj_len, resend_parts):
+    def check_upload_multipart_resend(self, config, bucket_name, key, obj_len, resend_parts, concurrency=None):
         client = get_client(config)
         content_type = 'text/bla'
         metadata = {'foo': 'bar'}
-        (upload_id, data, parts) = self.multipart_upload(
-            config=config,
-            bucket_name=bucket_name, key=key, size=obj_len,
-            content_type=content_type, metadata=metadata,
-            resend_parts=resend_parts)
+        if concurrency is None:
+            (upload_id, data, parts) = self.multipart_upload(
+                config=config,
+                bucket_name=bucket_name, key=key, size=obj_len,
+                content_type=content_type, metadata=metadata,
+                resend_parts=resend_parts)
+        else:
+            (upload_id, data, parts) = self.multipart_upload_parallel(
+                config=config,
+                bucket_name=bucket_name, key=key, size=obj_len,
+                content_type=content_type, metadata=metadata,
+                resend_parts=resend_parts, concurrency=concurrency)
 
         client.complete_multipart_upload(
             Bucket=bucket_name, Key=key, UploadId=upload_id, MultipartUpload={'Parts': parts})
@@ -288,6 +299,98 @@ class TestObjectMultipartUpload(TestMultipartBase):
         self.check_upload_multipart_resend(s3cfg_global_unique, bucket_name, key, obj_len, [1, 2])
         self.check_upload_multipart_resend(s3cfg_global_unique, bucket_name, key, obj_len, [0, 1, 2, 3, 4, 5])
 
+    def test_multipart_upload_parallel_resend_part(self, s3cfg_global_unique):
+        """
+        测试-验证并发上传分段（含重复上传的分段）时，结束分段上传是否成功，对象内容及分段顺序是否正确
+        """
+        client = get_client(s3cfg_global_unique)
+
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        key = "mymultipart"
+        obj_len = 30 * 1024 * 1024
+
+        self.check_upload_multipart_resend(s3cfg_global_unique, bucket_name, key, obj_len, [], concurrency=4)
+        self.check_upload_multipart_resend(s3cfg_global_unique, bucket_name, key, obj_len, [1, 2], concurrency=4)
+        self.check_upload_multipart_resend(s3cfg_global_unique, bucket_name, key, obj_len, [0, 1, 2, 3, 4, 5],
+                                           concurrency=6)
+
+    def test_multipart_upload_check_content_using_range_parallel(self, s3cfg_global_unique):
+        """
+        测试-验证并发范围读取分段上传的对象（对齐与非对齐的范围），每段内容与预期一致，内容不符时能发现
+        """
+        client = get_client(s3cfg_global_unique)
+
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        key = "mymultipart"
+        content = SeededContent(23 * 1024 * 1024 + 7, seed=key)
+
+        uploader = ParallelMultipartUploader(get_client, s3cfg_global_unique, part_size=5 * 1024 * 1024,
+                                             concurrency=4)
+        uploader.upload(bucket_name, key, content.iter_chunks(5 * 1024 * 1024), complete=True)
+
+        steps = ((1024 * 1024, 'aligned'), (10 * 1024 * 1024, 'unaligned'), (1024 * 1024 + 3, 'unaligned'))
+        for step, alignment in steps:
+            mismatches = self.check_content_using_range_parallel(
+                s3cfg_global_unique, bucket_name, key, content, step, concurrency=8, alignment=alignment)
+            self.eq(mismatches, [])
+
+        other = SeededContent(content.size, seed='other')
+        mismatches = self.check_content_using_range_parallel(
+            s3cfg_global_unique, bucket_name, key, other, 10 * 1024 * 1024)
+        self.eq(len(mismatches), 3)
+
+    def test_multipart_upload_parallel_bounded_read(self, s3cfg_global_unique):
+        """
+        测试-验证并发上传分段时，从数据源读出但尚未上传完成的分段数不超过max_in_flight，内存占用有上限
+        """
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        part_size = 5 * 1024 * 1024
+        content = SeededContent(6 * part_size, seed='bounded')
+
+        uploader = ParallelMultipartUploader(get_client, s3cfg_global_unique, part_size=part_size, concurrency=2,
+                                             max_in_flight_bytes=2 * part_size)
+        self.eq(uploader.max_in_flight, 2)
+        lock = threading.Lock()
+        counts = {'read': 0, 'done': 0, 'max_alive': 0}
+        upload_part = uploader.upload_part
+
+        def _upload_part(*args, **kwargs):
+            response = upload_part(*args, **kwargs)
+            with lock:
+                counts['done'] += 1
+            return response
+
+        def _source():
+            for data in content.iter_chunks(part_size):
+                with lock:
+                    counts['read'] += 1
+                    counts['max_alive'] = max(counts['max_alive'], counts['read'] - counts['done'])
+                yield data
+
+        uploader.upload_part = _upload_part
+        uploader.upload(bucket_name, 'bounded', _source(), complete=True)
+        self.eq(counts['read'], 6)
+        assert counts['max_alive'] <= uploader.max_in_flight, counts
+        self.eq(client.head_object(Bucket=bucket_name, Key='bounded')['ContentLength'], content.size)
+
+    def test_multipart_upload_plan_ranges_edge_sizes(self):
+        """
+        测试-验证范围读取的分段规划在极小对象与1字节范围下（对齐与非对齐）完整、不重叠地覆盖整个对象
+        """
+        for size in range(0, 6):
+            for range_size in range(1, 5):
+                for alignment in ('aligned', 'unaligned'):
+                    ranges = plan_ranges(size, range_size, alignment=alignment, seed=size)
+                    self.eq([b for start, end in ranges for b in range(start, end + 1)], list(range(size)))
+                    assert all(end - start + 1 <= range_size for start, end in ranges)
+                    if alignment == 'unaligned' and size > 1:
+                        assert ranges[1][0] % 2 == 1
+
+                    if size:
+                        ranges = plan_ranges(size, range_size, alignment=alignment, count=5, seed=size)
+                        assert all(0 <= start <= end < size for start, end in ranges)
+
     def test_multipart_upload_multiple_sizes(self, s3cfg_global_unique):
         """
         测试-验证不同文件大小下结束分段上传是否成功
@@ -387,6 +490,26 @@ class TestObjectMultipartUpload(TestMultipartBase):
                                          MultipartUpload={'Parts': parts})
         self.check_key_content(client, src_key, src_bucket_name, dest_key, dest_bucket_name)
 
+    def test_multipart_copy_parallel_multiple_sizes(self, s3cfg_global_unique):
+        """
+        测试-验证不同文件大小下并发upload_part_copy是否成功，分段顺序及对象内容是否正确
+        """
+        client = get_client(s3cfg_global_unique)
+
+        src_key = 'foo'
+        src_bucket_name = self.create_key_with_random_content(s3cfg_global_unique, src_key, 32 * 1024 * 1024)
+
+        dest_bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        dest_key = "mymultipart"
+
+        for size in (5 * 1024 * 1024, 10 * 1024 * 1024 + 100 * 1024, 32 * 1024 * 1024):
+            (upload_id, parts) = self.multipart_copy_parallel(
+                s3cfg_global_unique, src_bucket_name, src_key, dest_bucket_name, dest_key, size, concurrency=4)
+            self.eq([p['PartNumber'] for p in parts], list(range(1, len(parts) + 1)))
+            client.complete_multipart_upload(Bucket=dest_bucket_name, Key=dest_key, UploadId=upload_id,
+                                             MultipartUpload={'Parts': parts})
+            self.check_key_content(client, src_key, src_bucket_name, dest_key, dest_bucket_name)
+
     def test_multipart_upload_size_too_small(self, s3cfg_global_unique):
         """
         测试-验证分段小于5MiB时（除最后一段），进行合并会报错，
@@ -18,6 +18,9 @@ from s3tests.tests import (
     assert_raises, FakeWriteFile,
     FakeReadFile, get_client, get_alt_client, get_unauthenticated_client
 )
+from s3tests.functional import s3_async
+from s3tests.functional.s3_delete import BatchedDeleter
+from s3tests.functional.s3_sigv4 import AWS4SignerForQueryString
 
 
 class TestObjectBase(TestBaseClass):
@@ -386,6 +389,33 @@ class TestObjectOpts(TestObjectBase):
         status, error_code = self.get_status_and_error_code(e.response)
         self.eq(status, 400)
 
+    def test_multi_object_delete_batched(self, s3cfg_global_unique):
+        """
+        测试-验证BatchedDeleter把逐个key的删除合并为每批1000个key的delete_objects请求，退出时发送剩余的key，
+        以及delete_objects_batched
+        """
+        num = 2500
+        key_names = [f"key-{i:04d}" for i in range(num)]
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        self.eq(s3_async.run_with_client(s3cfg_global_unique, s3_async.put_objects, bucket_name, key_names), num)
+
+        with BatchedDeleter(client, bucket_name) as deleter:
+            for key in key_names:
+                deleter.delete(key)
+            self.eq(deleter.requests, 2)  # the last 500 keys are still queued
+            self.eq(deleter.deleted, 2000)
+        self.eq(deleter.requests, 3)
+        self.eq(deleter.deleted, num)
+        self.eq(deleter.errors, [])
+        response = client.list_objects_v2(Bucket=bucket_name)
+        assert 'Contents' not in response
+
+        self.eq(s3_async.run_with_client(s3cfg_global_unique, s3_async.put_objects, bucket_name, key_names), num)
+        self.eq(self.delete_objects_batched(client, bucket_name, key_names), [])
+        response = client.list_objects_v2(Bucket=bucket_name)
+        assert 'Contents' not in response
+
     # ------------------------- DeleteObjects End ------------------------------
 
     def test_object_head_zero_bytes(self, s3cfg_global_unique):
@@ -1284,6 +1314,29 @@ class TestPresignedURLs(TestObjectBase):
         res = requests.get(url, verify=s3cfg_global_unique.default_ssl_verify).__dict__
         self.eq(res['status_code'], 403)
 
+    def test_object_raw_put_get_presigned_by_query_string_signer(self, s3cfg_global_unique):
+        """
+        测试-验证AWS4SignerForQueryString批量生成的预签名URL可以通过HTTP的PUT和GET请求直接上传和下载
+        """
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        keys = ['foo', 'bar/baz', 'a b+c']
+
+        signer = AWS4SignerForQueryString(s3cfg_global_unique.main_access_key, s3cfg_global_unique.main_secret_key,
+                                          s3cfg_global_unique.default_endpoint)
+        put_urls = signer.presign_urls([('PUT', bucket_name, key, 3600) for key in keys])
+        get_urls = signer.presign_urls([('GET', bucket_name, key, 3600) for key in keys])
+
+        for key, put_url, get_url in zip(keys, put_urls, get_urls):
+            res = requests.put(put_url, data=key, verify=s3cfg_global_unique.default_ssl_verify)
+            self.eq(res.status_code, 200)
+
+            res = requests.get(get_url, verify=s3cfg_global_unique.default_ssl_verify)
+            self.eq(res.status_code, 200)
+            self.eq(res.text, key)
+
+        self.eq(sorted(self.get_objects_list(client, bucket_name)), sorted(keys))
+
 
 @pytest.mark.sio
 class TestGetObjectParameters(TestObjectBase):
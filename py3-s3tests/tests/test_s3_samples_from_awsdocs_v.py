@@ -1,11 +1,16 @@
 
+import io
+import os
 import datetime
+import tempfile
 
 import pytest
 import requests
+import urllib3
 
-from s3tests.tests import TestBaseClass, get_client
-from s3tests.functional.s3_sigv4 import AWS4SignerForAuthorizationHeader
+from s3tests.tests import TestBaseClass, get_client, assert_raises, FakeWriteFile
+from s3tests.functional.s3_sigv4 import AWS4SignerForAuthorizationHeader, AWS4SignerForChunkedUpload, AWS4Signer
+from s3tests.functional.s3_raw import RawResponse, S3RawEngine
 
 
 @pytest.mark.sio
@@ -127,6 +132,192 @@ class TestSamples(TestBaseClass):
         self.eq(res.status_code, 200)
         print(res.text)
 
+    def test_put_object_chunked_upload(self, s3cfg_global_unique):
+        """
+        测试-验证使用aws-chunked分块签名上传对象, 200OK
+        """
+        # https://docs.aws.amazon.com/AmazonS3/latest/API/sigv4-streaming.html
+
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        file_size = 1024 * 1024 + 17  # the last chunk is shorter.
+
+        url = self.get_post_url(s3cfg_global_unique, bucket_name) + '/chunked001'
+        ak = s3cfg_global_unique.main_access_key
+        sk = s3cfg_global_unique.main_secret_key
+
+        signer = AWS4SignerForChunkedUpload(url, 'PUT', 's3', 'us-east-1')
+        headers = signer.compute_signature_headers({}, file_size, ak, sk, chunk_size=64 * 1024)
+        res = requests.put(url,
+                           headers=headers,
+                           data=signer.chunked_body(FakeWriteFile(file_size, 'A')),
+                           verify=s3cfg_global_unique.default_ssl_verify)
+
+        self.eq(res.status_code, 200)
+        self.verify_atomic_key_data(client, bucket_name, 'chunked001', file_size, 'A')
+
+        # chunks below 8KB are only allowed for the last one, and the source must hold the signed length
+        signer = AWS4SignerForChunkedUpload(url, 'PUT', 's3', 'us-east-1')
+        assert_raises(ValueError, signer.compute_signature_headers, {}, file_size, ak, sk, chunk_size=1024)
+        signer.compute_signature_headers({}, 100, ak, sk, chunk_size=1024)
+        for source in (b'A' * 99, memoryview(b'A' * 50), io.BytesIO(b'A' * 99)):
+            assert_raises(ValueError, signer.chunked_body(source).read)
+
+    def test_put_object_binary_payload(self, s3cfg_global_unique):
+        """
+        测试-验证使用sigv4签名上传二进制文件对象(签名payload或UNSIGNED-PAYLOAD), 200OK
+        """
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        data = os.urandom(1024 * 1024)
+
+        url = self.get_post_url(s3cfg_global_unique, bucket_name)
+        signer = AWS4Signer(s3cfg_global_unique.main_access_key, s3cfg_global_unique.main_secret_key)
+
+        for key, unsigned_payload in (('binary001', False), ('binary002', True)):
+            fp = io.BytesIO(data)  # hashed in blocks, then sent from the same position.
+            headers = signer.sign_request('PUT', f'{url}/{key}', payload=fp, unsigned_payload=unsigned_payload)
+            res = requests.put(f'{url}/{key}', headers=headers, data=fp,
+                               verify=s3cfg_global_unique.default_ssl_verify)
+            self.eq(res.status_code, 200)
+
+            response = client.get_object(Bucket=bucket_name, Key=key)
+            self.eq(response['Body'].read(), data)
+
+    def test_raw_engine_object_ops(self, s3cfg_global_unique):
+        """
+        测试-验证S3RawEngine通过连接池发送PUT/HEAD/GET/DELETE请求(流式上传和下载)
+        """
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        data = os.urandom(3 * 1024 * 1024 + 5)
+        engine = S3RawEngine.from_config(s3cfg_global_unique, pool_maxsize=2)
+
+        res = engine.put_object(bucket_name, 'raw001', data)
+        self.eq(res.status, 200)
+        res.close()
+
+        # generators are sent as UNSIGNED-PAYLOAD with Transfer-Encoding: chunked
+        res = engine.put_object(bucket_name, 'raw002', (data[i:i + 65536] for i in range(0, len(data), 65536)))
+        self.eq(res.status, 200)
+        res.close()
+
+        res = engine.put_object_chunked(bucket_name, 'raw003', io.BytesIO(data), len(data))
+        self.eq(res.status, 200)
+        res.close()
+
+        for key in ('raw001', 'raw002', 'raw003'):
+            res = engine.head_object(bucket_name, key)
+            self.eq(res.status, 200)
+            self.eq(int(res.headers['Content-Length']), len(data))
+            res.close()
+
+            with engine.get_object(bucket_name, key) as res:
+                self.eq(res.status, 200)
+                self.eq(b''.join(res.stream(65536)), data)
+
+            res = engine.get_object(bucket_name, key, byte_range=(10, 19))
+            self.eq(res.status, 206)
+            self.eq(res.content, data[10:20])
+
+            res = engine.delete_object(bucket_name, key)
+            self.eq(res.status, 204)
+            res.close()
+
+        # a list of pieces is sent with their total length, str bodies utf-8 encoded
+        text = 'raw body ünïcödé 中文'
+        for key, body, expected in (('raw004', [data[:1000], memoryview(data[1000:3000]), b''], data[:3000]),
+                                    ('raw005', text, text.encode('utf-8'))):
+            res = engine.put_object(bucket_name, key, body)
+            self.eq(res.status, 200)
+            res.close()
+            self.eq(client.get_object(Bucket=bucket_name, Key=key)['Body'].read(), expected)
+            client.delete_object(Bucket=bucket_name, Key=key)
+
+        self.eq(self.get_objects_list(client, bucket_name), [])
+        engine.close()
+
+    def test_raw_engine_put_file(self, s3cfg_global_unique):
+        """
+        测试-验证S3RawEngine零拷贝上传本地文件(sendfile或mmap)，UNSIGNED-PAYLOAD和签名payload
+        """
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        data = os.urandom(8 * 1024 * 1024 + 3)
+        engine = S3RawEngine.from_config(s3cfg_global_unique)
+
+        with tempfile.NamedTemporaryFile() as fp:
+            fp.write(data)
+            fp.flush()
+
+            for key, unsigned_payload in (('file001', True), ('file002', False)):
+                with engine.put_file(bucket_name, key, fp.name, unsigned_payload=unsigned_payload) as res:
+                    self.eq(res.status, 200)
+                response = client.get_object(Bucket=bucket_name, Key=key)
+                self.eq(response['Body'].read(), data)
+
+            # a part of the file
+            with engine.put_file(bucket_name, 'file003', fp.name, offset=4097, length=5 * 1024 * 1024) as res:
+                self.eq(res.status, 200)
+            response = client.get_object(Bucket=bucket_name, Key='file003')
+            self.eq(response['Body'].read(), data[4097:4097 + 5 * 1024 * 1024])
+
+            # a file object, its position is left as it was
+            with open(fp.name, 'rb') as f:
+                f.seek(10)
+                with engine.put_file(bucket_name, 'file004', f, offset=1, length=100) as res:
+                    self.eq(res.status, 200)
+                self.eq(f.tell(), 10)
+            response = client.get_object(Bucket=bucket_name, Key='file004')
+            self.eq(response['Body'].read(), data[1:101])
+
+        # an empty file, with a signed payload
+        with tempfile.NamedTemporaryFile() as fp:
+            with engine.put_file(bucket_name, 'file005', fp.name, unsigned_payload=False) as res:
+                self.eq(res.status, 200)
+            response = client.get_object(Bucket=bucket_name, Key='file005')
+            self.eq(response['Body'].read(), b'')
+
+        engine.close()
+
+    def test_raw_engine_get_into_buffer(self, s3cfg_global_unique):
+        """
+        测试-验证S3RawEngine将对象读入预分配的缓冲区(整体读取和并发分段读取)
+        """
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+        data = os.urandom(10 * 1024 * 1024 + 3)
+        client.put_object(Bucket=bucket_name, Key='foo', Body=data)
+        engine = S3RawEngine.from_config(s3cfg_global_unique, pool_maxsize=4)
+
+        buf = bytearray(len(data))
+        self.eq(engine.get_object_into(bucket_name, 'foo', buf), len(data))
+        assert buf == data
+
+        buf = bytearray(len(data))
+        self.eq(engine.get_object_ranges_into(bucket_name, 'foo', buf, range_size=1024 * 1024 + 1), len(data))
+        assert buf == data
+
+        # a buffer smaller than the body is refused, nothing is truncated silently
+        assert_raises(ValueError, engine.get_object_into, bucket_name, 'foo', bytearray(len(data) - 1))
+        engine.close()
+
+        # without Content-Length (a chunked response) the body is checked to end with the buffer
+        for body, buf_size, ok in ((data[:100], 100, True), (data[:100], 200, True), (data[:101], 100, False)):
+            res = RawResponse(urllib3.HTTPResponse(body=io.BytesIO(body), preload_content=False),
+                              release=lambda: None)
+            buf = bytearray(buf_size)
+            if ok:
+                self.eq(res.read_all_into(buf), len(body))
+                self.eq(buf[:len(body)], body)
+            else:
+                assert_raises(ValueError, res.read_all_into, buf)
+
+        response = client.get_object(Bucket=bucket_name, Key='foo')
+        self.eq(bytes(self.get_body_into(response)), data)
+        response = client.get_object(Bucket=bucket_name, Key='foo')
+        assert_raises(ValueError, self.get_body_into, response, bytearray(len(data) - 1))
+
     @pytest.mark.skip(reason="not done.")
     def test_complete_multipart_upload_entity_too_small(self, s3cfg_global_unique):
         """
@@ -1326,6 +1326,32 @@ class TestVersioning(TestVersioningBase):
             response = client.list_object_versions(Bucket=bucket_name)
             self.eq(('Versions' in response), False)
 
+    def test_versioned_concurrent_object_create_concurrent_remove_high_fanout(self, s3cfg_global_unique):
+        """
+        测试-验证高并发（asyncio，1000个版本，最多200个连接）上传多版本对象和并发删除多版本对象
+        """
+        client = get_client(s3cfg_global_unique)
+        bucket_name = self.get_new_bucket(client, s3cfg_global_unique)
+
+        self.check_configure_versioning_retry(client, bucket_name, "Enabled", "Enabled")
+
+        key = 'myobj'
+        num_versions = 1000
+
+        version_ids = self.do_create_versioned_obj_async(
+            s3cfg_global_unique, bucket_name, key, num_versions, max_connections=200)
+        self.eq(len(set(version_ids)), num_versions)
+
+        paginator = client.get_paginator('list_object_versions')
+        versions = [v for page in paginator.paginate(Bucket=bucket_name) for v in page.get('Versions', [])]
+        self.eq(len(versions), num_versions)
+
+        deleted = self.do_clear_versioned_bucket_async(s3cfg_global_unique, bucket_name, max_connections=200)
+        self.eq(deleted, num_versions)
+
+        response = client.list_object_versions(Bucket=bucket_name)
+        self.eq(('Versions' in response), False)
+
     def test_versioned_concurrent_object_create_and_remove(self, s3cfg_global_unique):
         """
         测试-验证并发上传多版本对象后进行删除
@@ -23,6 +23,8 @@ setup(
         'isodate >=0.4.4',
         'pytest >= 7.1.1',
         'requests >= 2.22.0',
+        'urllib3 >=1.26, <2',
+        'PyYAML >=5.1',
     ],
 
     classifiers=[